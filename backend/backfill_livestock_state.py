@@ -0,0 +1,21 @@
+"""
+Recompute the livestock current-state columns from the event/movement logs.
+
+    python backfill_livestock_state.py
+
+The columns themselves are created by the migrations (alembic upgrade head);
+this is for repairing them after out-of-band writes. Safe to re-run: values
+are recomputed from scratch.
+"""
+from database import engine
+from routers.services.livestock_state import refresh_current_state
+
+
+def main():
+    with engine.begin() as conn:
+        touched = refresh_current_state(conn)
+    print(f"Refreshed current state for {touched} livestock")
+
+
+if __name__ == "__main__":
+    main()
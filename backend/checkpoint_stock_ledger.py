@@ -0,0 +1,30 @@
+"""
+Roll the stock ledger checkpoint forward (see routers/services/stock_ledger.py).
+
+    python checkpoint_stock_ledger.py            # keep the newest 3 checkpoints
+    python checkpoint_stock_ledger.py --keep 5
+    python checkpoint_stock_ledger.py --rebuild  # after movements were edited/deleted
+
+Meant for cron (e.g. hourly, or nightly for quiet ledgers). Writers to
+inventory_movements wait while it runs; it only sums the movements since the
+previous checkpoint, so that's short. Safe to run at any time.
+"""
+import argparse
+
+from database import SessionLocal
+from routers.services.stock_ledger import CHECKPOINTS_KEPT, create_checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll the stock ledger checkpoint forward")
+    parser.add_argument("--keep", type=int, default=CHECKPOINTS_KEPT, help="checkpoints to keep")
+    parser.add_argument("--rebuild", action="store_true", help="re-sum the whole ledger instead of rolling forward")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        checkpoint = create_checkpoint(db, keep=args.keep, rebuild=args.rebuild)
+    print(f"Checkpoint {checkpoint.id}: {checkpoint.balance_count} balances through movement {checkpoint.through_movement_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,263 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+import asyncio
+import threading
 import time
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://farmuser:farmsecret@db:5432/farmdb")
+# optional read replica; GET requests are served from it when set
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+
+def _asyncpg_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# async stack (asyncpg); derived from the sync URLs unless set explicitly
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _asyncpg_url(DATABASE_URL)
+ASYNC_DATABASE_REPLICA_URL = os.getenv("ASYNC_DATABASE_REPLICA_URL") or (
+    _asyncpg_url(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+)
+
+# --- Pool settings (per process) ---
+# Every uvicorn worker gets its own pool, so the server can open up to
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections; keep that below
+# Postgres' max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))        # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))        # seconds; -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 = no limit
+
+
+# --- Pool instrumentation ---
+class PoolStats:
+    """Counters for one engine's pool; read through pool_status()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.waits = 0            # checkouts that found the pool exhausted
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+# keyed by pool logging name, so counters survive pool.recreate()
+_pool_stats = {}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how often and how long checkouts wait."""
+
+    def __init__(self, *args, max_overflow=10, **kw):
+        super().__init__(*args, max_overflow=max_overflow, **kw)
+        self._overflow_limit = max_overflow
+
+    @property
+    def stats(self) -> PoolStats:
+        return _pool_stats.setdefault(self._orig_logging_name or "default", PoolStats())
+
+    def _do_get(self):
+        exhausted = (
+            self.checkedin() == 0
+            and self._overflow_limit > -1
+            and self.overflow() >= self._overflow_limit
+        )
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            if exhausted:
+                self.stats.add(timeouts=1)
+            raise
+        finally:
+            if exhausted:
+                self.stats.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool, InstrumentedQueuePool):
+    """Same instrumentation over the asyncio-aware queue."""
+
+
+def _pool_options(name: str, poolclass):
+    return dict(
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_logging_name=name,
+    )
+
+
+def make_engine(url: str = DATABASE_URL, name: str = "primary", **overrides):
+    """
+    Build an engine with the env-driven pool settings above.
+    statement_timeout is applied per connection through libpq options.
+    """
+    options = _pool_options(name, InstrumentedQueuePool)
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    options.update(overrides)
+
+    new_engine = create_engine(url, **options)
+    _instrument(new_engine, name)
+    return new_engine
+
+
+def make_async_engine(url: str = ASYNC_DATABASE_URL, name: str = "primary-async", **overrides):
+    """AsyncEngine (asyncpg) with the same pool settings and instrumentation."""
+    options = _pool_options(name, InstrumentedAsyncQueuePool)
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    options.update(overrides)
+
+    new_engine = create_async_engine(url, **options)
+    _instrument(new_engine.sync_engine, name)
+    return new_engine
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
-# Dependency for FastAPI
-for _ in range(10):  # retry 10 times
+def _instrument(new_engine, name: str):
+    stats = _pool_stats.setdefault(name, PoolStats())
+
+    @event.listens_for(new_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.add(connects=1)
+
+    @event.listens_for(new_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.add(checkouts=1)
+
+    @event.listens_for(new_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        stats.add(checkins=1)
+
+    @event.listens_for(new_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.add(invalidations=1)
+
+
+def pool_status(target_engine=None):
+    """Current pool gauges plus lifetime counters, for the metrics endpoint."""
+    target_engine = target_engine or engine
+    pool = getattr(target_engine, "sync_engine", target_engine).pool
+    status = {
+        "name": pool._orig_logging_name,
+        "pool_size": pool.size(),
+        "max_overflow": pool._overflow_limit,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    status.update(pool.stats.as_dict())
+    return status
+
+
+async def ping(target_engine=None, timeout: float = 2.0) -> bool:
+    """One SELECT 1 on the async engine, bounded by timeout; never raises."""
+    target_engine = target_engine or async_engine
     try:
-        engine = create_engine(DATABASE_URL)
-        connection = engine.connect()
-        connection.close()
-        break
+        async with asyncio.timeout(timeout):
+            async with target_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        return True
     except Exception:
-        time.sleep(2)
-def get_db():
-    db = SessionLocal()
+        return False
+
+
+engine = make_engine()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base = declarative_base()
+
+# async sessions for read-heavy `async def` handlers
+async_engine = make_async_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# read side: the replica if configured, otherwise the primary engines themselves
+if DATABASE_REPLICA_URL:
+    replica_engine = make_engine(DATABASE_REPLICA_URL, name="replica")
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+else:
+    replica_engine = engine
+    ReadSessionLocal = SessionLocal
+
+if ASYNC_DATABASE_REPLICA_URL:
+    async_replica_engine = make_async_engine(ASYNC_DATABASE_REPLICA_URL, name="replica-async")
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+else:
+    async_replica_engine = async_engine
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def engines():
+    """Every distinct engine in use (primary, async, replicas)."""
+    return list({id(e): e for e in (engine, async_engine, replica_engine, async_replica_engine)}.values())
+
+
+# Dependencies for FastAPI
+def get_db(request: Request):
+    """
+    The one request-scoped session dependency. Read-only requests (GET/HEAD/
+    OPTIONS) get a replica session, everything else the primary.
+    """
+    factory = ReadSessionLocal if request.method in READ_ONLY_METHODS else SessionLocal
+    db = factory()
     try:
         yield db
     finally:
         db.close()
 
 
+def get_primary_db():
+    """Always the primary, for reads that must see the latest commits."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 
-
-
+async def get_async_db(request: Request):
+    factory = AsyncReadSessionLocal if request.method in READ_ONLY_METHODS else AsyncSessionLocal
+    async with factory() as db:
+        yield db
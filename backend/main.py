@@ -1,9 +1,12 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List
-import models, schemas, database, auth
+import models, schemas, database, auth, pagination
 from auth import get_current_user, TokenData
 import crud_livestock
 from routers import reports
@@ -12,17 +15,46 @@ from routers.health import diseases, medications, vets, event_types, events, hea
 from routers import purchase
 from routers import births , sales  ,buyers,sale_items, livestock_events,exit_router, farm    
 from routers import inventory, livestock_history,inventory_setup,purchase_orders,inventory_receipts, stores
+from routers import jobs, livestock_report, exports
+from routers.services import livestock_state  # registers the current-state listeners
+from routers.services import report_render
+from routers.services import import_jobs
 from routers.livestock_history import router as livestock_history_router
 
-# --- Create tables ---
+# Schema is managed by migrations (alembic upgrade head), not at import time.
 
-from database import engine
-from models import Base
+from database import engine, get_db
 
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
+DB_STARTUP_ATTEMPTS = 10
+DB_STARTUP_DELAY = 2  # seconds
 
-app = FastAPI()
+
+async def _watch_db_ready(app: FastAPI):
+    """Background readiness probe; startup never blocks on the database."""
+    for attempt in range(DB_STARTUP_ATTEMPTS):
+        if await database.ping():
+            app.state.db_ready = True
+            # heartbeats for this process's import jobs, and sweeps of dead workers' ones
+            import_jobs.start_heartbeat()
+            return
+        await asyncio.sleep(DB_STARTUP_DELAY)
+    logger.warning("database not reachable after %s attempts", DB_STARTUP_ATTEMPTS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.db_ready = False
+    watcher = asyncio.create_task(_watch_db_ready(app))
+    yield
+    watcher.cancel()
+    report_render.shutdown()
+    import_jobs.shutdown()
+    await database.async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://192.168.2.20",
@@ -40,15 +72,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER],
 )
 
-# --- Database dependency ---
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# --- Ops endpoints ---
+@app.get("/health")
+async def health(response: Response):
+    """Liveness plus a bounded DB ping; 503 while the database is unreachable."""
+    db_ok = await database.ping()
+    app.state.db_ready = db_ok
+    if not db_ok:
+        response.status_code = 503
+    return {"status": "ok" if db_ok else "degraded", "database": "ok" if db_ok else "unavailable"}
+
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    """Connection pool gauges and counters for this worker process, per pool."""
+    pools = [database.pool_status(e) for e in database.engines()]
+    return {p["name"]: p for p in pools}
 
 # --- User endpoints ---
 @app.get("/me")
@@ -90,10 +131,6 @@ def add_livestock(livestock: schemas.LivestockCreate, db: Session = Depends(get_
         else:
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
-@app.get("/livestock", response_model=List[schemas.LivestockResponse])
-def get_livestock(db: Session = Depends(get_db)):
-    return db.query(models.Livestock).all()
-
 
 app.include_router(locations.router, prefix="/locations", tags=["Locations"])
 # Include the router
@@ -131,6 +168,9 @@ app.include_router(inventory.router)
 app.include_router(inventory_receipts.router)
 app.include_router(inventory_receipts.router)
 app.include_router(stores.router)
+app.include_router(jobs.router)
+app.include_router(exports.router)
 
 # --- Include routers ---
 app.include_router(reports.router)
+app.include_router(livestock_report.router)
@@ -0,0 +1,595 @@
+"""baseline schema
+
+Every table as of the switch from create_all() to migrations. Tables and
+indexes are created IF NOT EXISTS so databases that were built by the old
+import-time create_all() can be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 03:30:54.359174
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(*args, **kw):
+    return op.create_table(*args, if_not_exists=True, **kw)
+
+
+def _create_index(*args, **kw):
+    return op.create_index(*args, if_not_exists=True, **kw)
+
+
+def upgrade():
+    # purchases.reference defaults to nextval() on this sequence
+    op.execute("CREATE SEQUENCE IF NOT EXISTS purchase_reference_seq")
+    # Postgres has no CREATE TYPE IF NOT EXISTS
+    op.execute("""
+        DO $$ BEGIN
+            CREATE TYPE purchaseorderstatus AS ENUM ('draft', 'ordered', 'partial', 'received');
+        EXCEPTION WHEN duplicate_object THEN NULL;
+        END $$
+    """)
+    _create_table('buyers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_buyers_id'), 'buyers', ['id'], unique=False)
+    _create_table('diseases',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_diseases_id'), 'diseases', ['id'], unique=False)
+    _create_index(op.f('ix_diseases_name'), 'diseases', ['name'], unique=True)
+    _create_table('farm',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('owner_name', sa.String(length=255), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('contact', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_farm_id'), 'farm', ['id'], unique=False)
+    _create_table('health_event_types',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_health_event_types_id'), 'health_event_types', ['id'], unique=False)
+    _create_index(op.f('ix_health_event_types_name'), 'health_event_types', ['name'], unique=True)
+    _create_table('import_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('rows_total', sa.Integer(), nullable=True),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('rows_failed', sa.Integer(), nullable=False),
+    sa.Column('rows_skipped', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('error_report', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_import_jobs_id'), 'import_jobs', ['id'], unique=False)
+    _create_table('inventory_locations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    _create_index(op.f('ix_inventory_locations_id'), 'inventory_locations', ['id'], unique=False)
+    _create_table('inventory_types',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    _create_index(op.f('ix_inventory_types_id'), 'inventory_types', ['id'], unique=False)
+    _create_table('locations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_locations_id'), 'locations', ['id'], unique=False)
+    _create_table('medications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('dosage', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_medications_id'), 'medications', ['id'], unique=False)
+    _create_index(op.f('ix_medications_name'), 'medications', ['name'], unique=True)
+    _create_table('owners',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_owners_id'), 'owners', ['id'], unique=False)
+    _create_table('species',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    _create_index(op.f('ix_species_id'), 'species', ['id'], unique=False)
+    _create_table('stores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    _create_index(op.f('ix_stores_id'), 'stores', ['id'], unique=False)
+    _create_table('units',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('abbreviation', sa.String(length=20), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    _create_index(op.f('ix_units_id'), 'units', ['id'], unique=False)
+    _create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password_hash', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    _create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    _create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    _create_table('vendors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('contact_person', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_vendors_id'), 'vendors', ['id'], unique=False)
+    _create_table('vets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_vets_id'), 'vets', ['id'], unique=False)
+    _create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('species_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['species_id'], ['species.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
+    _create_table('inventory_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=240), nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('unit_id', sa.Integer(), nullable=False),
+    sa.Column('cost_price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('reorder_level', sa.Numeric(precision=12, scale=3), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('quantity_on_hand', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['type_id'], ['inventory_types.id'], ),
+    sa.ForeignKeyConstraint(['unit_id'], ['units.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_inventory_items_id'), 'inventory_items', ['id'], unique=False)
+    _create_table('issue_receipts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_store_id', sa.Integer(), nullable=False),
+    sa.Column('destination_store_id', sa.Integer(), nullable=False),
+    sa.Column('issued_by', sa.String(), nullable=True),
+    sa.Column('received_by', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['destination_store_id'], ['stores.id'], ),
+    sa.ForeignKeyConstraint(['source_store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_table('purchase_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=True),
+    sa.Column('order_date', sa.Date(), nullable=False),
+    sa.Column('expected_delivery_date', sa.Date(), nullable=True),
+    sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('status', postgresql.ENUM('draft', 'ordered', 'partial', 'received', name='purchaseorderstatus', create_type=False), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_purchase_orders_id'), 'purchase_orders', ['id'], unique=False)
+    _create_table('purchases',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reference', sa.String(length=255), server_default=sa.text("concat('PUR-', lpad(CAST(nextval('purchase_reference_seq') AS VARCHAR), 6, '0'))"), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('purchase_date', sa.Date(), nullable=False),
+    sa.Column('total_cost', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_purchases_id'), 'purchases', ['id'], unique=False)
+    _create_index(op.f('ix_purchases_purchase_date'), 'purchases', ['purchase_date'], unique=False)
+    _create_index(op.f('ix_purchases_vendor_id'), 'purchases', ['vendor_id'], unique=False)
+    _create_table('sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('buyer_id', sa.Integer(), nullable=False),
+    sa.Column('sale_date', sa.Date(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['buyer_id'], ['buyers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_sales_id'), 'sales', ['id'], unique=False)
+    _create_table('goods_receipts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('purchase_order_id', sa.Integer(), nullable=True),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('received_date', sa.Date(), server_default=sa.text('CURRENT_DATE'), nullable=False),
+    sa.Column('received_by', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['purchase_order_id'], ['purchase_orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_goods_receipts_id'), 'goods_receipts', ['id'], unique=False)
+    _create_table('inventory_movements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('movement_type', sa.String(), nullable=False),
+    sa.Column('reference_type', sa.String(), nullable=True),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.Date(), server_default=sa.text('CURRENT_DATE'), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_inventory_movements_id'), 'inventory_movements', ['id'], unique=False)
+    _create_table('inventory_transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('movement', sa.String(length=10), nullable=False),
+    sa.Column('quantity', sa.Numeric(precision=12, scale=3), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('reference_type', sa.String(length=80), nullable=True),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("movement IN ('IN','OUT')", name='check_movement_in_out'),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['location_id'], ['inventory_locations.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_inventory_transactions_id'), 'inventory_transactions', ['id'], unique=False)
+    _create_table('livestock',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tag_number', sa.String(), nullable=False),
+    sa.Column('species_id', sa.Integer(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('sex', sa.String(), nullable=True),
+    sa.Column('dob', sa.Date(), nullable=True),
+    sa.Column('castrated', sa.Boolean(), nullable=True),
+    sa.Column('lifecycle_event', sa.String(), nullable=True),
+    sa.Column('event_date', sa.Date(), nullable=True),
+    sa.Column('origin', sa.String(length=50), nullable=True),
+    sa.Column('availability', sa.String(length=20), nullable=False),
+    sa.Column('purchase_id', sa.Integer(), nullable=True),
+    sa.Column('purchase_price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('last_event_type', sa.String(length=50), nullable=True),
+    sa.Column('last_event_date', sa.Date(), nullable=True),
+    sa.Column('last_movement_type', sa.String(), nullable=True),
+    sa.Column('last_movement_date', sa.Date(), nullable=True),
+    sa.Column('current_location', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['owner_id'], ['owners.id'], ),
+    sa.ForeignKeyConstraint(['purchase_id'], ['purchases.id'], ),
+    sa.ForeignKeyConstraint(['species_id'], ['species.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tag_number')
+    )
+    _create_index(op.f('ix_livestock_availability'), 'livestock', ['availability'], unique=False)
+    _create_index(op.f('ix_livestock_category_id'), 'livestock', ['category_id'], unique=False)
+    _create_index(op.f('ix_livestock_id'), 'livestock', ['id'], unique=False)
+    _create_index(op.f('ix_livestock_last_movement_type'), 'livestock', ['last_movement_type'], unique=False)
+    _create_index(op.f('ix_livestock_location_id'), 'livestock', ['location_id'], unique=False)
+    _create_index(op.f('ix_livestock_owner_id'), 'livestock', ['owner_id'], unique=False)
+    _create_index(op.f('ix_livestock_species_id'), 'livestock', ['species_id'], unique=False)
+    _create_table('purchase_order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('item_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('subtotal', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('quantity_received', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['purchase_orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_purchase_order_items_id'), 'purchase_order_items', ['id'], unique=False)
+    _create_table('store_inventories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Numeric(), nullable=False),
+    sa.Column('avg_cost', sa.Numeric(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('store_id', 'item_id', name='uix_store_item')
+    )
+    _create_index(op.f('ix_store_inventories_id'), 'store_inventories', ['id'], unique=False)
+    _create_table('births',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tag_number', sa.String(), nullable=False),
+    sa.Column('dob', sa.Date(), nullable=False),
+    sa.Column('sex', sa.String(), nullable=False),
+    sa.Column('sire_id', sa.Integer(), nullable=True),
+    sa.Column('dam_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['dam_id'], ['livestock.id'], ),
+    sa.ForeignKeyConstraint(['sire_id'], ['livestock.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tag_number')
+    )
+    _create_index(op.f('ix_births_dob'), 'births', ['dob'], unique=False)
+    _create_index(op.f('ix_births_id'), 'births', ['id'], unique=False)
+    _create_table('exits',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('livestock_id', sa.Integer(), nullable=False),
+    sa.Column('exit_type', sa.String(length=20), nullable=False),
+    sa.Column('reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['livestock_id'], ['livestock.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_exits_created_at'), 'exits', ['created_at'], unique=False)
+    _create_index(op.f('ix_exits_id'), 'exits', ['id'], unique=False)
+    _create_table('goods_receipt_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('receipt_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('quantity_received', sa.Integer(), nullable=False),
+    sa.Column('cost_price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ),
+    sa.ForeignKeyConstraint(['receipt_id'], ['goods_receipts.id'], ),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_goods_receipt_items_id'), 'goods_receipt_items', ['id'], unique=False)
+    _create_table('health_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('livestock_id', sa.Integer(), nullable=False),
+    sa.Column('event_type_id', sa.Integer(), nullable=False),
+    sa.Column('disease_id', sa.Integer(), nullable=True),
+    sa.Column('medication_id', sa.Integer(), nullable=True),
+    sa.Column('vet_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['disease_id'], ['diseases.id'], ),
+    sa.ForeignKeyConstraint(['event_type_id'], ['health_event_types.id'], ),
+    sa.ForeignKeyConstraint(['livestock_id'], ['livestock.id'], ),
+    sa.ForeignKeyConstraint(['medication_id'], ['medications.id'], ),
+    sa.ForeignKeyConstraint(['vet_id'], ['vets.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_health_events_date'), 'health_events', ['date'], unique=False)
+    _create_index(op.f('ix_health_events_id'), 'health_events', ['id'], unique=False)
+    _create_index(op.f('ix_health_events_livestock_id'), 'health_events', ['livestock_id'], unique=False)
+    _create_table('livestock_movements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('livestock_id', sa.Integer(), nullable=False),
+    sa.Column('movement_type', sa.String(), nullable=False),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('destination', sa.String(), nullable=True),
+    sa.Column('movement_date', sa.Date(), nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['livestock_id'], ['livestock.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_livestock_movements_id'), 'livestock_movements', ['id'], unique=False)
+    _create_index(op.f('ix_livestock_movements_livestock_id'), 'livestock_movements', ['livestock_id'], unique=False)
+    _create_table('parentage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('calf_id', sa.Integer(), nullable=True),
+    sa.Column('sire_id', sa.Integer(), nullable=True),
+    sa.Column('dam_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['calf_id'], ['livestock.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['dam_id'], ['livestock.id'], ),
+    sa.ForeignKeyConstraint(['sire_id'], ['livestock.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_parentage_id'), 'parentage', ['id'], unique=False)
+    _create_table('purchase_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('purchase_id', sa.Integer(), nullable=False),
+    sa.Column('livestock_id', sa.Integer(), nullable=True),
+    sa.Column('tag_number', sa.String(length=255), nullable=True),
+    sa.Column('species_id', sa.Integer(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('sex', sa.String(length=50), nullable=True),
+    sa.Column('dob', sa.Date(), nullable=True),
+    sa.Column('price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['livestock_id'], ['livestock.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['purchase_id'], ['purchases.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_purchase_items_id'), 'purchase_items', ['id'], unique=False)
+    _create_index(op.f('ix_purchase_items_purchase_id'), 'purchase_items', ['purchase_id'], unique=False)
+    _create_table('sale_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sale_id', sa.Integer(), nullable=False),
+    sa.Column('livestock_id', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['livestock_id'], ['livestock.id'], ),
+    sa.ForeignKeyConstraint(['sale_id'], ['sales.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_sale_items_id'), 'sale_items', ['id'], unique=False)
+    _create_table('livestock_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('livestock_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('event_date', sa.Date(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('purchase_id', sa.Integer(), nullable=True),
+    sa.Column('sale_id', sa.Integer(), nullable=True),
+    sa.Column('health_event_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('exit_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['exit_id'], ['exits.id'], ),
+    sa.ForeignKeyConstraint(['health_event_id'], ['health_events.id'], ),
+    sa.ForeignKeyConstraint(['livestock_id'], ['livestock.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['purchase_id'], ['purchases.id'], ),
+    sa.ForeignKeyConstraint(['sale_id'], ['sales.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_livestock_events_exit_id'), 'livestock_events', ['exit_id'], unique=False)
+    _create_index(op.f('ix_livestock_events_id'), 'livestock_events', ['id'], unique=False)
+    _create_index(op.f('ix_livestock_events_livestock_id'), 'livestock_events', ['livestock_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_livestock_events_livestock_id'), table_name='livestock_events')
+    op.drop_index(op.f('ix_livestock_events_id'), table_name='livestock_events')
+    op.drop_index(op.f('ix_livestock_events_exit_id'), table_name='livestock_events')
+    op.drop_table('livestock_events')
+    op.drop_index(op.f('ix_sale_items_id'), table_name='sale_items')
+    op.drop_table('sale_items')
+    op.drop_index(op.f('ix_purchase_items_purchase_id'), table_name='purchase_items')
+    op.drop_index(op.f('ix_purchase_items_id'), table_name='purchase_items')
+    op.drop_table('purchase_items')
+    op.drop_index(op.f('ix_parentage_id'), table_name='parentage')
+    op.drop_table('parentage')
+    op.drop_index(op.f('ix_livestock_movements_livestock_id'), table_name='livestock_movements')
+    op.drop_index(op.f('ix_livestock_movements_id'), table_name='livestock_movements')
+    op.drop_table('livestock_movements')
+    op.drop_index(op.f('ix_health_events_livestock_id'), table_name='health_events')
+    op.drop_index(op.f('ix_health_events_id'), table_name='health_events')
+    op.drop_index(op.f('ix_health_events_date'), table_name='health_events')
+    op.drop_table('health_events')
+    op.drop_index(op.f('ix_goods_receipt_items_id'), table_name='goods_receipt_items')
+    op.drop_table('goods_receipt_items')
+    op.drop_index(op.f('ix_exits_id'), table_name='exits')
+    op.drop_index(op.f('ix_exits_created_at'), table_name='exits')
+    op.drop_table('exits')
+    op.drop_index(op.f('ix_births_id'), table_name='births')
+    op.drop_index(op.f('ix_births_dob'), table_name='births')
+    op.drop_table('births')
+    op.drop_index(op.f('ix_store_inventories_id'), table_name='store_inventories')
+    op.drop_table('store_inventories')
+    op.drop_index(op.f('ix_purchase_order_items_id'), table_name='purchase_order_items')
+    op.drop_table('purchase_order_items')
+    op.drop_index(op.f('ix_livestock_species_id'), table_name='livestock')
+    op.drop_index(op.f('ix_livestock_owner_id'), table_name='livestock')
+    op.drop_index(op.f('ix_livestock_location_id'), table_name='livestock')
+    op.drop_index(op.f('ix_livestock_last_movement_type'), table_name='livestock')
+    op.drop_index(op.f('ix_livestock_id'), table_name='livestock')
+    op.drop_index(op.f('ix_livestock_category_id'), table_name='livestock')
+    op.drop_index(op.f('ix_livestock_availability'), table_name='livestock')
+    op.drop_table('livestock')
+    op.drop_index(op.f('ix_inventory_transactions_id'), table_name='inventory_transactions')
+    op.drop_table('inventory_transactions')
+    op.drop_index(op.f('ix_inventory_movements_id'), table_name='inventory_movements')
+    op.drop_table('inventory_movements')
+    op.drop_index(op.f('ix_goods_receipts_id'), table_name='goods_receipts')
+    op.drop_table('goods_receipts')
+    op.drop_index(op.f('ix_sales_id'), table_name='sales')
+    op.drop_table('sales')
+    op.drop_index(op.f('ix_purchases_vendor_id'), table_name='purchases')
+    op.drop_index(op.f('ix_purchases_purchase_date'), table_name='purchases')
+    op.drop_index(op.f('ix_purchases_id'), table_name='purchases')
+    op.drop_table('purchases')
+    op.drop_index(op.f('ix_purchase_orders_id'), table_name='purchase_orders')
+    op.drop_table('purchase_orders')
+    op.drop_table('issue_receipts')
+    op.drop_index(op.f('ix_inventory_items_id'), table_name='inventory_items')
+    op.drop_table('inventory_items')
+    op.drop_index(op.f('ix_categories_id'), table_name='categories')
+    op.drop_table('categories')
+    op.drop_index(op.f('ix_vets_id'), table_name='vets')
+    op.drop_table('vets')
+    op.drop_index(op.f('ix_vendors_id'), table_name='vendors')
+    op.drop_table('vendors')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_units_id'), table_name='units')
+    op.drop_table('units')
+    op.drop_index(op.f('ix_stores_id'), table_name='stores')
+    op.drop_table('stores')
+    op.drop_index(op.f('ix_species_id'), table_name='species')
+    op.drop_table('species')
+    op.drop_index(op.f('ix_owners_id'), table_name='owners')
+    op.drop_table('owners')
+    op.drop_index(op.f('ix_medications_name'), table_name='medications')
+    op.drop_index(op.f('ix_medications_id'), table_name='medications')
+    op.drop_table('medications')
+    op.drop_index(op.f('ix_locations_id'), table_name='locations')
+    op.drop_table('locations')
+    op.drop_index(op.f('ix_inventory_types_id'), table_name='inventory_types')
+    op.drop_table('inventory_types')
+    op.drop_index(op.f('ix_inventory_locations_id'), table_name='inventory_locations')
+    op.drop_table('inventory_locations')
+    op.drop_index(op.f('ix_import_jobs_id'), table_name='import_jobs')
+    op.drop_table('import_jobs')
+    op.drop_index(op.f('ix_health_event_types_name'), table_name='health_event_types')
+    op.drop_index(op.f('ix_health_event_types_id'), table_name='health_event_types')
+    op.drop_table('health_event_types')
+    op.drop_index(op.f('ix_farm_id'), table_name='farm')
+    op.drop_table('farm')
+    op.drop_index(op.f('ix_diseases_name'), table_name='diseases')
+    op.drop_index(op.f('ix_diseases_id'), table_name='diseases')
+    op.drop_table('diseases')
+    op.drop_index(op.f('ix_buyers_id'), table_name='buyers')
+    op.drop_table('buyers')
+    op.execute("DROP TYPE IF EXISTS purchaseorderstatus")
+    op.execute("DROP SEQUENCE IF EXISTS purchase_reference_seq")
@@ -0,0 +1,76 @@
+"""catch up create_all() databases
+
+create_all() never alters existing tables, so databases created before the
+livestock current-state columns and the list/report indexes were added are
+missing them. On a database built by 0001 every statement here is a no-op.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 03:45:12.000000
+"""
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+STATE_COLUMNS = [
+    ("last_event_type", "VARCHAR(50)"),
+    ("last_event_date", "DATE"),
+    ("last_movement_type", "VARCHAR"),
+    ("last_movement_date", "DATE"),
+    ("current_location", "VARCHAR"),
+]
+
+INDEXES = [
+    ("ix_livestock_last_movement_type", "livestock", "last_movement_type"),
+    ("ix_livestock_events_livestock_id", "livestock_events", "livestock_id"),
+    ("ix_livestock_events_exit_id", "livestock_events", "exit_id"),
+    ("ix_livestock_movements_livestock_id", "livestock_movements", "livestock_id"),
+    ("ix_births_dob", "births", "dob"),
+    ("ix_exits_created_at", "exits", "created_at"),
+    ("ix_purchases_vendor_id", "purchases", "vendor_id"),
+    ("ix_purchases_purchase_date", "purchases", "purchase_date"),
+    ("ix_purchase_items_purchase_id", "purchase_items", "purchase_id"),
+    ("ix_health_events_date", "health_events", "date"),
+    ("ix_health_events_livestock_id", "health_events", "livestock_id"),
+]
+
+
+def upgrade():
+    for name, type_ in STATE_COLUMNS:
+        op.execute(f"ALTER TABLE livestock ADD COLUMN IF NOT EXISTS {name} {type_}")
+    for name, table, column in INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+
+    # fill the state columns for animals that predate them
+    op.execute("""
+        UPDATE livestock l
+        SET last_event_type = e.event_type, last_event_date = e.event_date
+        FROM (
+            SELECT DISTINCT ON (livestock_id) livestock_id, event_type, event_date
+            FROM livestock_events
+            ORDER BY livestock_id, event_date DESC, id DESC
+        ) e
+        WHERE l.id = e.livestock_id AND l.last_event_date IS NULL
+    """)
+    op.execute("""
+        UPDATE livestock l
+        SET last_movement_type = m.movement_type,
+            last_movement_date = m.movement_date,
+            current_location = m.destination
+        FROM (
+            SELECT DISTINCT ON (livestock_id) livestock_id, movement_type, movement_date, destination
+            FROM livestock_movements
+            ORDER BY livestock_id, movement_date DESC, id DESC
+        ) m
+        WHERE l.id = m.livestock_id AND l.last_movement_date IS NULL
+    """)
+
+
+def downgrade():
+    # the columns and indexes belong to the baseline; nothing to undo
+    pass
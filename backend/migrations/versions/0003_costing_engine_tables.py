@@ -0,0 +1,100 @@
+"""costing engine tables
+
+StockOnHand / CostHistory / JournalEntry / JournalLine for the WAVG engine in
+routers/services/inventory_service.py. Existing store_inventories balances are
+carried over as opening stock, each with one opening cost layer, so outflows
+have layers to draw from.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 03:40:30.823178
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cost_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('reference_type', sa.String(length=80), nullable=True),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Numeric(precision=14, scale=3), nullable=False),
+    sa.Column('unit_cost', sa.Numeric(precision=14, scale=4), nullable=False),
+    sa.Column('total_cost', sa.Numeric(precision=16, scale=4), nullable=False),
+    sa.Column('remaining_qty', sa.Numeric(precision=14, scale=3), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cost_history_id'), 'cost_history', ['id'], unique=False)
+    op.create_index('ix_cost_history_item_location', 'cost_history', ['item_type', 'item_id', 'location_id', 'id'], unique=False)
+    op.create_table('journal_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('journal_date', sa.Date(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('reference_type', sa.String(length=80), nullable=True),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_journal_entries_id'), 'journal_entries', ['id'], unique=False)
+    op.create_table('stock_on_hand',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Numeric(precision=14, scale=3), nullable=False),
+    sa.Column('avg_cost', sa.Numeric(precision=14, scale=4), nullable=False),
+    sa.Column('last_updated', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('item_type', 'item_id', 'location_id', name='uix_stock_on_hand_item_location', postgresql_nulls_not_distinct=True)
+    )
+    op.create_index(op.f('ix_stock_on_hand_id'), 'stock_on_hand', ['id'], unique=False)
+    op.create_table('journal_lines',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('journal_entry_id', sa.Integer(), nullable=False),
+    sa.Column('account_code', sa.String(length=50), nullable=False),
+    sa.Column('debit', sa.Numeric(precision=16, scale=4), nullable=False),
+    sa.Column('credit', sa.Numeric(precision=16, scale=4), nullable=False),
+    sa.Column('narration', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['journal_entry_id'], ['journal_entries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_journal_lines_id'), 'journal_lines', ['id'], unique=False)
+    op.create_index(op.f('ix_journal_lines_journal_entry_id'), 'journal_lines', ['journal_entry_id'], unique=False)
+
+    op.execute("""
+        INSERT INTO stock_on_hand (item_type, item_id, location_id, quantity, avg_cost, last_updated)
+        SELECT 'inventory_item', item_id, store_id, quantity, COALESCE(avg_cost, 0), now()
+        FROM store_inventories
+    """)
+    op.execute("""
+        INSERT INTO cost_history
+            (item_type, item_id, location_id, reference_type, quantity, unit_cost, total_cost, remaining_qty, created_at)
+        SELECT 'inventory_item', item_id, location_id, 'opening_balance',
+               quantity, avg_cost, round(quantity * avg_cost, 4), quantity, now()
+        FROM stock_on_hand
+        WHERE quantity > 0
+    """)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_journal_lines_journal_entry_id'), table_name='journal_lines')
+    op.drop_index(op.f('ix_journal_lines_id'), table_name='journal_lines')
+    op.drop_table('journal_lines')
+    op.drop_index(op.f('ix_stock_on_hand_id'), table_name='stock_on_hand')
+    op.drop_table('stock_on_hand')
+    op.drop_index(op.f('ix_journal_entries_id'), table_name='journal_entries')
+    op.drop_table('journal_entries')
+    op.drop_index('ix_cost_history_item_location', table_name='cost_history')
+    op.drop_index(op.f('ix_cost_history_id'), table_name='cost_history')
+    op.drop_table('cost_history')
@@ -0,0 +1,27 @@
+"""partial index on open cost layers
+
+FIFO consumption only reads layers with remaining_qty > 0; indexing just
+those keeps the scan short however many consumed layers an item piles up.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 03:41:39.279939
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_cost_history_item_location', table_name='cost_history')
+    op.create_index('ix_cost_history_open_layers', 'cost_history', ['item_type', 'item_id', 'location_id', 'id'], unique=False, postgresql_where=sa.text('remaining_qty > 0'))
+
+
+def downgrade():
+    op.drop_index('ix_cost_history_open_layers', table_name='cost_history')
+    op.create_index('ix_cost_history_item_location', 'cost_history', ['item_type', 'item_id', 'location_id', 'id'], unique=False)
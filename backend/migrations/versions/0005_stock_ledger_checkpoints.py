@@ -0,0 +1,61 @@
+"""stock ledger checkpoints
+
+Snapshots of quantity per (store, item) up to a movement id, so stock levels
+are read as checkpoint + tail instead of summing the whole inventory_movements
+ledger. The first checkpoint is taken here; routers/services/stock_ledger.py
+rolls it forward.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 03:48:04.816392
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('through_movement_id', sa.Integer(), nullable=False),
+    sa.Column('balance_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stock_checkpoints_id'), 'stock_checkpoints', ['id'], unique=False)
+    op.create_table('stock_checkpoint_balances',
+    sa.Column('checkpoint_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Numeric(precision=14, scale=3), nullable=False),
+    sa.ForeignKeyConstraint(['checkpoint_id'], ['stock_checkpoints.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('checkpoint_id', 'location_id', 'item_id')
+    )
+
+    # writers wait until the first checkpoint is in; nothing in flight can be missed
+    op.execute("LOCK TABLE inventory_movements IN SHARE MODE")
+    op.execute("""
+        INSERT INTO stock_checkpoints (through_movement_id, balance_count, created_at)
+        SELECT COALESCE(MAX(id), 0), 0, now() FROM inventory_movements
+    """)
+    op.execute("""
+        INSERT INTO stock_checkpoint_balances (checkpoint_id, location_id, item_id, quantity)
+        SELECT (SELECT MAX(id) FROM stock_checkpoints), location_id, item_id, SUM(quantity)
+        FROM inventory_movements
+        GROUP BY location_id, item_id
+    """)
+    op.execute("""
+        UPDATE stock_checkpoints
+        SET balance_count = (SELECT COUNT(*) FROM stock_checkpoint_balances)
+    """)
+
+
+def downgrade():
+    op.drop_table('stock_checkpoint_balances')
+    op.drop_index(op.f('ix_stock_checkpoints_id'), table_name='stock_checkpoints')
+    op.drop_table('stock_checkpoints')
@@ -0,0 +1,88 @@
+"""movement timestamps and costs for as-of stock
+
+inventory_movements.created_at becomes a timestamp stamped by the database
+(clock_timestamp() in UTC) instead of a date, gains a unit_cost so movements
+carry value, and an index on (location_id, item_id, created_at). Checkpoint
+balances gain a value; the existing checkpoints are replaced by one rebuilt
+with values.
+
+Movements written before this have no recorded cost; they're given the
+current average of their (item, store), or the item's cost price, the same
+way 0003 valued opening stock. Their created_at is midnight of the old date.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 03:52:38.183315
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+LEDGER_CLOCK = "(clock_timestamp() AT TIME ZONE 'utc')"
+
+
+def upgrade():
+    op.alter_column('inventory_movements', 'created_at',
+               existing_type=sa.DATE(),
+               type_=sa.DateTime(),
+               existing_nullable=True,
+               server_default=sa.text(LEDGER_CLOCK),
+               postgresql_using='created_at::timestamp')
+    op.add_column('inventory_movements', sa.Column('unit_cost', sa.Numeric(precision=14, scale=4), nullable=True))
+    op.execute("""
+        UPDATE inventory_movements m
+        SET unit_cost = s.avg_cost
+        FROM stock_on_hand s
+        WHERE s.item_type = 'inventory_item' AND s.item_id = m.item_id AND s.location_id = m.location_id
+    """)
+    op.execute("""
+        UPDATE inventory_movements m
+        SET unit_cost = COALESCE(i.cost_price, 0)
+        FROM inventory_items i
+        WHERE i.id = m.item_id AND m.unit_cost IS NULL
+    """)
+    op.create_index('ix_inventory_movements_location_item_created', 'inventory_movements', ['location_id', 'item_id', 'created_at'], unique=False)
+
+    op.add_column('stock_checkpoint_balances', sa.Column('value', sa.Numeric(precision=18, scale=4), nullable=False, server_default='0'))
+    op.alter_column('stock_checkpoint_balances', 'value', server_default=None)
+    op.execute("LOCK TABLE inventory_movements IN SHARE MODE")
+    op.execute("DELETE FROM stock_checkpoints")
+    op.execute(f"""
+        INSERT INTO stock_checkpoints (through_movement_id, balance_count, created_at)
+        SELECT COALESCE(MAX(id), 0), 0, {LEDGER_CLOCK} FROM inventory_movements
+    """)
+    op.execute("""
+        INSERT INTO stock_checkpoint_balances (checkpoint_id, location_id, item_id, quantity, value)
+        SELECT (SELECT MAX(id) FROM stock_checkpoints), location_id, item_id,
+               SUM(quantity), SUM(quantity * COALESCE(unit_cost, 0))
+        FROM inventory_movements
+        GROUP BY location_id, item_id
+    """)
+    op.execute("""
+        UPDATE stock_checkpoints
+        SET balance_count = (SELECT COUNT(*) FROM stock_checkpoint_balances)
+    """)
+    op.alter_column('stock_checkpoints', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               nullable=False)
+
+
+def downgrade():
+    op.alter_column('stock_checkpoints', 'created_at',
+               existing_type=postgresql.TIMESTAMP(),
+               nullable=True)
+    op.drop_column('stock_checkpoint_balances', 'value')
+    op.drop_index('ix_inventory_movements_location_item_created', table_name='inventory_movements')
+    op.drop_column('inventory_movements', 'unit_cost')
+    op.alter_column('inventory_movements', 'created_at',
+               existing_type=sa.DateTime(),
+               type_=sa.DATE(),
+               existing_nullable=True,
+               server_default=sa.text('CURRENT_DATE'),
+               postgresql_using='created_at::date')
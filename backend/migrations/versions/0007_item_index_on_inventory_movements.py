@@ -0,0 +1,26 @@
+"""item index on inventory movements
+
+(item_id, location_id) INCLUDE (quantity, unit_cost): the stock reconciliation job sums
+the ledger per item-id partition, which this turns into index-only range
+scans instead of a full table scan per partition.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 03:56:21.702403
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_inventory_movements_item_location', 'inventory_movements', ['item_id', 'location_id'], unique=False, postgresql_include=['quantity', 'unit_cost'])
+
+
+def downgrade():
+    op.drop_index('ix_inventory_movements_item_location', table_name='inventory_movements')
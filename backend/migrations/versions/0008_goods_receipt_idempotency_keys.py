@@ -0,0 +1,30 @@
+"""goods receipt idempotency keys
+
+Receipts posted with an Idempotency-Key header store it (unique) with a hash
+of the request, so a client retrying the same post gets the original receipt
+back instead of receiving the stock twice. Existing receipts have no key.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 04:00:00.408632
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('goods_receipts', sa.Column('idempotency_key', sa.String(length=255), nullable=True))
+    op.add_column('goods_receipts', sa.Column('request_hash', sa.String(length=64), nullable=True))
+    op.create_unique_constraint('uix_goods_receipts_idempotency_key', 'goods_receipts', ['idempotency_key'])
+
+
+def downgrade():
+    op.drop_constraint('uix_goods_receipts_idempotency_key', 'goods_receipts', type_='unique')
+    op.drop_column('goods_receipts', 'request_hash')
+    op.drop_column('goods_receipts', 'idempotency_key')
@@ -0,0 +1,27 @@
+"""open purchase order lines index
+
+Goods receipts against a PO now keep purchase_order_items.quantity_received
+up to date, so lines with quantity_received < quantity are the ones still
+expected. A partial index over just those, by item, serves the open-lines
+and inbound-stock queries without reading received history.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 04:02:04.450122
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_purchase_order_items_open', 'purchase_order_items', ['item_id'], unique=False, postgresql_include=['order_id', 'quantity', 'quantity_received'], postgresql_where=sa.text('quantity_received < quantity'))
+
+
+def downgrade():
+    op.drop_index('ix_purchase_order_items_open', table_name='purchase_order_items')
@@ -0,0 +1,45 @@
+"""fractional ledger quantities
+
+inventory_movements.quantity and inventory_items.quantity_on_hand become
+Numeric(14, 3), like stock_on_hand and the checkpoint balances. Transfers
+and issues take fractional quantities, and as Integer columns the ledger
+and item totals were rounding them while stock_on_hand kept the exact
+figure.
+
+Movements already rounded can't be recovered from the ledger itself;
+reconcile_stock.py reports the (item, store) keys they put out of step.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 04:09:34.114061
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('inventory_items', 'quantity_on_hand',
+               existing_type=sa.INTEGER(),
+               type_=sa.Numeric(precision=14, scale=3),
+               existing_nullable=False)
+    op.alter_column('inventory_movements', 'quantity',
+               existing_type=sa.INTEGER(),
+               type_=sa.Numeric(precision=14, scale=3),
+               existing_nullable=False)
+
+
+def downgrade():
+    op.alter_column('inventory_movements', 'quantity',
+               existing_type=sa.Numeric(precision=14, scale=3),
+               type_=sa.INTEGER(),
+               existing_nullable=False)
+    op.alter_column('inventory_items', 'quantity_on_hand',
+               existing_type=sa.Numeric(precision=14, scale=3),
+               type_=sa.INTEGER(),
+               existing_nullable=False)
@@ -0,0 +1,30 @@
+"""livestock updated_at
+
+livestock.updated_at is set on insert and bumped on update by the ORM.
+count(*) plus max(updated_at), both answered from indexes, versions the
+herd for the livestock PDF cache, so a cache hit no longer needs the whole
+herd read first. Existing rows start at the migration time.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 04:17:28.865638
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('livestock', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE livestock SET updated_at = timezone('utc', now())")
+    op.create_index(op.f('ix_livestock_updated_at'), 'livestock', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_livestock_updated_at'), table_name='livestock')
+    op.drop_column('livestock', 'updated_at')
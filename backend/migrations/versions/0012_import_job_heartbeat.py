@@ -0,0 +1,30 @@
+"""import job heartbeat
+
+import_jobs.worker records the API process that owns a job, and
+heartbeat_at is refreshed by that process while the job is queued or
+running. A sweep fails only jobs whose heartbeat went stale, so one
+worker restarting no longer fails jobs that its live siblings are still
+running.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 04:28:23.536166
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('import_jobs', sa.Column('worker', sa.String(length=100), nullable=True))
+    op.add_column('import_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('import_jobs', 'heartbeat_at')
+    op.drop_column('import_jobs', 'worker')
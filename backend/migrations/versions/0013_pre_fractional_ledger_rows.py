@@ -0,0 +1,38 @@
+"""pre-fractional ledger rows
+
+inventory_movements.pre_fractional marks the rows written before 0010,
+while the ledger held whole units and may have rounded them. Stock
+reconciliation allows its under-one-unit tolerance only for (item, store)
+keys that have such rows; anything else has to match exactly. The column
+is added with DEFAULT true, which flags every existing row without
+rewriting the table, and new rows then default to false. Rows written
+between 0010 and this migration are flagged too.
+
+The reconciliation index includes the flag so partition sums stay
+index-only scans.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 04:35:16.769920
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('inventory_movements', sa.Column('pre_fractional', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+    op.alter_column('inventory_movements', 'pre_fractional', server_default=sa.text('false'))
+    op.drop_index('ix_inventory_movements_item_location', table_name='inventory_movements')
+    op.create_index('ix_inventory_movements_item_location', 'inventory_movements', ['item_id', 'location_id'], unique=False, postgresql_include=['quantity', 'unit_cost', 'pre_fractional'])
+
+
+def downgrade():
+    op.drop_index('ix_inventory_movements_item_location', table_name='inventory_movements')
+    op.create_index('ix_inventory_movements_item_location', 'inventory_movements', ['item_id', 'location_id'], unique=False, postgresql_include=['quantity', 'unit_cost'])
+    op.drop_column('inventory_movements', 'pre_fractional')
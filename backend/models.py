@@ -1,10 +1,10 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, Text, Boolean, Numeric,UniqueConstraint, TIMESTAMP,CheckConstraint,Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, Text, Boolean, Numeric,UniqueConstraint, TIMESTAMP,CheckConstraint,Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime  # <-- This is needed for datetime.utcnow
 from database import Base
 import enum
 from sqlalchemy import Enum
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 # ----------------------------
 # User model
 # ----------------------------
@@ -84,10 +84,10 @@ class Livestock(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     tag_number = Column(String, unique=True, nullable=False)
-    species_id = Column(Integer, ForeignKey("species.id"))
-    category_id = Column(Integer, ForeignKey("categories.id"))
-    owner_id = Column(Integer, ForeignKey("owners.id"))
-    location_id = Column(Integer, ForeignKey("locations.id"))
+    species_id = Column(Integer, ForeignKey("species.id"), index=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
+    owner_id = Column(Integer, ForeignKey("owners.id"), index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), index=True)
     sex = Column(String, nullable=True)
     dob = Column(Date, nullable=True)
     castrated = Column(Boolean, default=False)
@@ -96,10 +96,21 @@ class Livestock(Base):
     lifecycle_event = Column(String, nullable=True)   # e.g., "sold", "death", "slaughter"
     event_date = Column(Date, nullable=True)
     origin = Column(String(50))
-    availability = Column(String(20), nullable=False, default="active") 
+    availability = Column(String(20), nullable=False, default="active", index=True)
 
     purchase_id = Column(Integer, ForeignKey("purchases.id"))
     purchase_price = Column(Numeric(12, 2), nullable=True)
+
+    # ✅ current state, denormalized from the event/movement logs
+    # (kept in step by routers/services/livestock_state.py)
+    last_event_type = Column(String(50), nullable=True)
+    last_event_date = Column(Date, nullable=True)
+    last_movement_type = Column(String, nullable=True, index=True)
+    last_movement_date = Column(Date, nullable=True)
+    current_location = Column(String, nullable=True)
+
+    # bumped on every ORM/Core write; with count(*) it versions the herd for the report cache
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
    
     # Relationships
     movements = relationship("LivestockMovement", back_populates="livestock")
@@ -125,7 +136,7 @@ class LivestockEvent(Base):
     __tablename__ = "livestock_events"
 
     id = Column(Integer, primary_key=True, index=True)
-    livestock_id = Column(Integer, ForeignKey("livestock.id", ondelete="CASCADE"), nullable=False)
+    livestock_id = Column(Integer, ForeignKey("livestock.id", ondelete="CASCADE"), nullable=False, index=True)
     event_type = Column(String(50), nullable=False)  # e.g. 'registered', 'purchase', 'sale', 'death'
     event_date = Column(Date, nullable=False, default=datetime.utcnow)
     notes = Column(Text, nullable=True)
@@ -133,7 +144,7 @@ class LivestockEvent(Base):
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=True)
     health_event_id = Column(Integer, ForeignKey("health_events.id"), nullable=True)  # <-- new field
     created_at = Column(DateTime, default=datetime.utcnow)
-    exit_id = Column(Integer, ForeignKey("exits.id"), nullable=True)
+    exit_id = Column(Integer, ForeignKey("exits.id"), nullable=True, index=True)
 
     # Relationships
     livestock = relationship("Livestock", back_populates="events")
@@ -185,9 +196,9 @@ class HealthEvent(Base):
     __tablename__ = "health_events"
 
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, nullable=False)
+    date = Column(Date, nullable=False, index=True)
 
-    livestock_id = Column(Integer, ForeignKey("livestock.id"), nullable=False)
+    livestock_id = Column(Integer, ForeignKey("livestock.id"), nullable=False, index=True)
     event_type_id = Column(Integer, ForeignKey("health_event_types.id"), nullable=False)
     disease_id = Column(Integer, ForeignKey("diseases.id"), nullable=True)
     medication_id = Column(Integer, ForeignKey("medications.id"), nullable=True)
@@ -225,8 +236,8 @@ class Purchase(Base):
     reference = Column(String(255), nullable=False, server_default=func.concat(
         "PUR-", func.lpad(func.nextval("purchase_reference_seq").cast(String), 6, "0")
     ))
-    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
-    purchase_date = Column(Date, nullable=False)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False, index=True)
+    purchase_date = Column(Date, nullable=False, index=True)
     total_cost = Column(Numeric(12, 2))
     notes = Column(Text)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
@@ -240,7 +251,7 @@ class PurchaseItem(Base):
     __tablename__ = "purchase_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    purchase_id = Column(Integer, ForeignKey("purchases.id", ondelete="CASCADE"), nullable=False)
+    purchase_id = Column(Integer, ForeignKey("purchases.id", ondelete="CASCADE"), nullable=False, index=True)
     livestock_id = Column(Integer, ForeignKey("livestock.id", ondelete="SET NULL"))
     tag_number = Column(String(255))
     species_id = Column(Integer)
@@ -264,7 +275,7 @@ class Birth(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     tag_number = Column(String, unique=True, nullable=False)
-    dob = Column(Date, nullable=False)
+    dob = Column(Date, nullable=False, index=True)
     sex = Column(String, nullable=False)
 
     sire_id = Column(Integer, ForeignKey("livestock.id"), nullable=True)
@@ -338,7 +349,7 @@ class Exit(Base):
     livestock_id = Column(Integer, ForeignKey("livestock.id"), nullable=False)
     exit_type = Column(String(20), nullable=False)  # "death" or "slaughter"
     reason = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     livestock = relationship("Livestock", back_populates="exits")
     events = relationship("LivestockEvent", back_populates="exit")
@@ -360,7 +371,7 @@ class LivestockMovement(Base):
     __tablename__ = "livestock_movements"
 
     id = Column(Integer, primary_key=True, index=True)
-    livestock_id = Column(Integer, ForeignKey("livestock.id"), nullable=False)
+    livestock_id = Column(Integer, ForeignKey("livestock.id"), nullable=False, index=True)
     movement_type = Column(String, nullable=False)  # "IN" or "OUT"
     source = Column(String)
     destination = Column(String)
@@ -407,7 +418,7 @@ class InventoryItem(Base):
     reorder_level = Column(Numeric(12,3), nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    quantity_on_hand = Column(Integer, nullable=False, default=0)
+    quantity_on_hand = Column(Numeric(14, 3), nullable=False, default=0)
 
     type = relationship("InventoryType", back_populates="items")
     unit = relationship("Unit", back_populates="items")
@@ -479,6 +490,15 @@ class PurchaseOrderItem(Base):
     order = relationship("PurchaseOrder", back_populates="items")
     item = relationship("InventoryItem")
 
+    __table_args__ = (
+        # open lines only (expected inbound stock); fully received lines drop out of the index
+        Index(
+            "ix_purchase_order_items_open", "item_id",
+            postgresql_include=["order_id", "quantity", "quantity_received"],
+            postgresql_where=quantity_received < quantity,
+        ),
+    )
+
 
 # Goods Receipt (GRN)
 class GoodsReceipt(Base):
@@ -489,10 +509,15 @@ class GoodsReceipt(Base):
     received_date = Column(Date, nullable=False, server_default=func.current_date())
     received_by = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
+    # Idempotency-Key of the posting request; a retry with it returns this receipt
+    idempotency_key = Column(String(255), nullable=True)
+    request_hash = Column(String(64), nullable=True)   # sha256 of the request, to refuse a reused key
 
     purchase_order = relationship("PurchaseOrder")
     items = relationship("GoodsReceiptItem", back_populates="receipt", cascade="all, delete-orphan")
 
+    __table_args__ = (UniqueConstraint("idempotency_key", name="uix_goods_receipts_idempotency_key"),)
+
 class GoodsReceiptItem(Base):
     __tablename__ = "goods_receipt_items"
     id = Column(Integer, primary_key=True, index=True)
@@ -510,14 +535,25 @@ class InventoryMovement(Base):
     id = Column(Integer, primary_key=True, index=True)
     item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
     location_id = Column(Integer, nullable=False)   # store or boma id
-    quantity = Column(Integer, nullable=False)      # + for receive, - for issue
+    quantity = Column(Numeric(14, 3), nullable=False)  # + for receive, - for issue
+    unit_cost = Column(Numeric(14, 4), nullable=True)  # cost in/out: receipt cost, or the WAVG for outflows
     movement_type = Column(String, nullable=False)  # "RECEIPT", "ISSUE", "ADJUSTMENT"
     reference_type = Column(String, nullable=True)  # "goods_receipt", "purchase_order", etc.
     reference_id = Column(Integer, nullable=True)
-    created_at = Column(Date, server_default=func.current_date())
+    # stamped by the database when the row is written (not at transaction start), see stock_ledger
+    created_at = Column(DateTime, server_default=text("(clock_timestamp() AT TIME ZONE 'utc')"))
+    # written while the ledger held whole units (before 0010), so possibly rounded
+    pre_fractional = Column(Boolean, nullable=False, server_default=text("false"))
 
     item = relationship("InventoryItem")    
 
+    __table_args__ = (
+        Index("ix_inventory_movements_location_item_created", "location_id", "item_id", "created_at"),
+        # per-item ledger sums and values (reconciliation) as index-only scans
+        Index("ix_inventory_movements_item_location", "item_id", "location_id",
+              postgresql_include=["quantity", "unit_cost", "pre_fractional"]),
+    )
+
 # --- Stores (warehouses) ---
 class Store(Base):
     __tablename__ = "stores"
@@ -528,6 +564,7 @@ class Store(Base):
 
 
 
+# superseded by StockOnHand (migration 0003 copies balances across); no longer written
 class StoreInventory(Base):
     __tablename__ = "store_inventories"
     id = Column(Integer, primary_key=True, index=True)
@@ -552,4 +589,129 @@ class IssueReceipt(Base):
     received_by = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-   
\ No newline at end of file
+
+
+# ----------------------------
+# Costing (weighted average), kept by routers/services/inventory_service.py
+# ----------------------------
+class StockOnHand(Base):
+    """Running quantity and WAVG unit cost per (item, location); the row that gets locked."""
+    __tablename__ = "stock_on_hand"
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_type = Column(String(20), nullable=False)      # "inventory_item" or "livestock"
+    item_id = Column(Integer, nullable=False)
+    location_id = Column(Integer, nullable=True)        # store id for inventory items
+    quantity = Column(Numeric(14, 3), nullable=False, default=0)
+    avg_cost = Column(Numeric(14, 4), nullable=False, default=0)
+    last_updated = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "item_type", "item_id", "location_id",
+            name="uix_stock_on_hand_item_location",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+
+class CostHistory(Base):
+    """Immutable inflow cost layers; remaining_qty is drawn down oldest-first by outflows."""
+    __tablename__ = "cost_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_type = Column(String(20), nullable=False)
+    item_id = Column(Integer, nullable=False)
+    location_id = Column(Integer, nullable=True)
+    reference_type = Column(String(80), nullable=True)
+    reference_id = Column(Integer, nullable=True)
+    quantity = Column(Numeric(14, 3), nullable=False)
+    unit_cost = Column(Numeric(14, 4), nullable=False)
+    total_cost = Column(Numeric(16, 4), nullable=False)
+    remaining_qty = Column(Numeric(14, 3), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # only layers with stock left are ever read; consumed ones drop out of the index
+        Index(
+            "ix_cost_history_open_layers", "item_type", "item_id", "location_id", "id",
+            postgresql_where=remaining_qty > 0,
+        ),
+    )
+
+
+class JournalEntry(Base):
+    __tablename__ = "journal_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    journal_date = Column(Date, nullable=False)
+    description = Column(Text, nullable=True)
+    reference_type = Column(String(80), nullable=True)
+    reference_id = Column(Integer, nullable=True)
+    created_by = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    lines = relationship("JournalLine", back_populates="entry", cascade="all, delete-orphan")
+
+
+class JournalLine(Base):
+    __tablename__ = "journal_lines"
+
+    id = Column(Integer, primary_key=True, index=True)
+    journal_entry_id = Column(Integer, ForeignKey("journal_entries.id", ondelete="CASCADE"), nullable=False, index=True)
+    account_code = Column(String(50), nullable=False)
+    debit = Column(Numeric(16, 4), nullable=False, default=0)
+    credit = Column(Numeric(16, 4), nullable=False, default=0)
+    narration = Column(Text, nullable=True)
+
+    entry = relationship("JournalEntry", back_populates="lines")
+
+
+# ----------------------------
+# Stock ledger checkpoints, kept by routers/services/stock_ledger.py
+# ----------------------------
+class StockCheckpoint(Base):
+    """Quantity and value per (store, item) summed over inventory_movements with id <= through_movement_id."""
+    __tablename__ = "stock_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    through_movement_id = Column(Integer, nullable=False)
+    balance_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)   # database clock once the ledger lock is held
+
+    balances = relationship("StockCheckpointBalance", back_populates="checkpoint", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class StockCheckpointBalance(Base):
+    __tablename__ = "stock_checkpoint_balances"
+
+    checkpoint_id = Column(Integer, ForeignKey("stock_checkpoints.id", ondelete="CASCADE"), primary_key=True)
+    location_id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    quantity = Column(Numeric(14, 3), nullable=False)
+    value = Column(Numeric(18, 4), nullable=False, default=0)
+
+    checkpoint = relationship("StockCheckpoint", back_populates="balances")
+
+
+# ----------------------------
+# Background import jobs
+# ----------------------------
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)          # "livestock" or "inventory_items"
+    filename = Column(String, nullable=True)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    rows_total = Column(Integer, nullable=True)        # estimate taken when the file is queued
+    rows_done = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    rows_skipped = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    error_report = Column(Text, nullable=True)         # CSV of skipped/error rows
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    worker = Column(String(100), nullable=True)        # import_jobs.WORKER_ID of the owning process
+    heartbeat_at = Column(DateTime, nullable=True)     # refreshed by the owner while queued/running
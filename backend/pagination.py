@@ -0,0 +1,48 @@
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# list endpoints keep returning a plain JSON array; the cursor for the next page
+# (if there is one) travels in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque, URL-safe cursor holding the sort key of the last row on a page."""
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int, types: Optional[Sequence[Callable[[Any], Any]]] = None) -> List[Any]:
+    """
+    The values encode_cursor packed, checked to be size of them. With types,
+    each value is passed through its converter (e.g. date.fromisoformat, int);
+    a value that doesn't convert is a 400 like any other tampered cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if types is not None:
+        try:
+            values = [convert(value) for convert, value in zip(types, values)]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def page_size(limit: Optional[int]) -> int:
+    """
+    Effective page size: limit capped at MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE when
+    none is given. List endpoints always page, so a response never grows with
+    the table; clients that want more follow the NEXT_CURSOR_HEADER cursor.
+    """
+    return min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
@@ -1,10 +1,12 @@
 # routers/births.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, true, tuple_
 from sqlalchemy.orm import Session
-import models, schemas
+import models, schemas, pagination
 from database import get_db 
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/births", tags=["Births"])
 
@@ -117,36 +119,68 @@ def record_birth(birth: schemas.BirthCreate, db: Session = Depends(get_db)):
 # 🔍 GET ALL BIRTHS
 # -----------------------------------------------------------
 @router.get("/", response_model=List[schemas.BirthResponse])
-def get_all_births(db: Session = Depends(get_db)):
-    births = db.query(models.Birth).order_by(models.Birth.dob.desc()).all()
-    response = []
-
-    for b in births:
-        calf = (
-            db.query(models.Livestock)
-            .filter(models.Livestock.tag_number == b.tag_number)
-            .first()
-        )
-
-        latest_event = (
-            db.query(models.LivestockEvent)
-            .filter(models.LivestockEvent.livestock_id == calf.id)
-            .order_by(models.LivestockEvent.event_date.desc())
-            .first()
-            if calf else None
-        )
-
+def get_all_births(
+    response: Response,
+    date_from: Optional[date] = Query(None, description="Only births on or after this date"),
+    date_to: Optional[date] = Query(None, description="Only births on or before this date"),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {pagination.NEXT_CURSOR_HEADER} header"),
+    db: Session = Depends(get_db)
+):
+    """
+    Birth register, newest first, in a single query: each calf is joined by tag
+    and its latest event comes from a LATERAL subquery. Paged on (dob, id),
+    limit rows at a time (100 by default, never the whole register); the next
+    cursor is sent in X-Next-Cursor, and a cursor that doesn't decode is a 400.
+    """
+    B = models.Birth
+    E = models.LivestockEvent
+
+    latest = (
+        select(E.id, E.livestock_id, E.event_type, E.event_date, E.notes)
+        .where(E.livestock_id == models.Livestock.id)
+        .order_by(E.event_date.desc(), E.id.desc())
+        .limit(1)
+        .lateral("latest_event")
+    )
+
+    query = (
+        db.query(B, latest)
+        .outerjoin(models.Livestock, models.Livestock.tag_number == B.tag_number)
+        .outerjoin(latest, true())
+    )
+    if date_from:
+        query = query.filter(B.dob >= date_from)
+    if date_to:
+        query = query.filter(B.dob <= date_to)
+    if cursor:
+        last_dob, last_id = pagination.decode_cursor(cursor, 2, types=(date.fromisoformat, int))
+        query = query.filter(tuple_(B.dob, B.id) < tuple_(last_dob, last_id))
+    query = query.order_by(B.dob.desc(), B.id.desc())
+
+    size = pagination.page_size(limit)
+    query = query.limit(size + 1)
+    rows = query.all()
+
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1].Birth
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(last.dob, last.id)
+
+    result = []
+    for row in rows:
+        b = row.Birth
         event_data = None
-        if latest_event:
+        if row.id is not None:
             event_data = {
-                "id": latest_event.id,
-                "livestock_id": latest_event.livestock_id,
-                "event_type": latest_event.event_type,
-                "event_date": latest_event.event_date,
-                "notes": latest_event.notes,
+                "id": row.id,
+                "livestock_id": row.livestock_id,
+                "event_type": row.event_type,
+                "event_date": row.event_date,
+                "notes": row.notes,
             }
 
-        response.append(
+        result.append(
             schemas.BirthResponse(
                 id=b.id,
                 tag_number=b.tag_number,
@@ -159,4 +193,4 @@ def get_all_births(db: Session = Depends(get_db)):
             )
         )
 
-    return response
+    return result
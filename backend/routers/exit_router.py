@@ -1,9 +1,10 @@
 # routers/exit.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, true
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import date
-import models, schemas
+from typing import List, Optional
+from datetime import date, timedelta
+import models, schemas, pagination
 from database import get_db
 from datetime import datetime 
 
@@ -96,31 +97,67 @@ def record_exit(exit: schemas.ExitCreate, db: Session = Depends(database.get_db)
         raise HTTPException(status_code=500, detail=f"Error recording exit: {str(e)}")
 
 
-
-
-
-@router.get("/", response_model=List[schemas.ExitResponse])
-def get_all_exits(db: Session = Depends(get_db)):
-    exits = db.query(models.Exit).all()
-    response = []
-
-    for e in exits:
-        animal = db.query(models.Livestock).filter(models.Livestock.id == e.livestock_id).first()
-        event = db.query(models.LivestockEvent).filter(
-            models.LivestockEvent.livestock_id == e.livestock_id,
-            models.LivestockEvent.event_type == e.exit_type
-        ).order_by(models.LivestockEvent.event_date.desc()).first()
-
-        response.append({
-            "id": e.id,
-            "livestock_id": e.livestock_id,
-            "livestock_tag": animal.tag_number if animal else None,
-            "exit_type": e.exit_type,
-            "event_date": event.event_date if event else None,
-            "notes": event.notes if event else None,
-            "reason": getattr(e, "reason", e.exit_type),  # or hardcode e.exit_type
-            "created_at": getattr(e, "created_at", event.event_date if event else None)
-        })
-
-    return response
-
+# -----------------------------------------------------------
+# 🔍 GET ALL EXITS
+# -----------------------------------------------------------
+@router.get("/", response_model=List[schemas.ExitListResponse])
+def get_all_exits(
+    response: Response,
+    date_from: Optional[date] = Query(None, description="Only exits recorded on or after this date"),
+    date_to: Optional[date] = Query(None, description="Only exits recorded on or before this date"),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {pagination.NEXT_CURSOR_HEADER} header"),
+    db: Session = Depends(get_db)
+):
+    """
+    Exit register, newest first, in a single statement: the animal is joined for
+    its tag and the exit's own event is picked through LivestockEvent.exit_id.
+    Paged on id, limit rows at a time (100 by default); the next cursor is sent in X-Next-Cursor.
+    """
+    X = models.Exit
+    E = models.LivestockEvent
+
+    event = (
+        select(E.event_date, E.notes)
+        .where(E.exit_id == X.id, E.event_type == X.exit_type)
+        .order_by(E.event_date.desc(), E.id.desc())
+        .limit(1)
+        .lateral("exit_event")
+    )
+
+    query = (
+        db.query(X.id, X.livestock_id, X.exit_type, X.reason, X.created_at,
+                 models.Livestock.tag_number, event.c.event_date, event.c.notes)
+        .outerjoin(models.Livestock, models.Livestock.id == X.livestock_id)
+        .outerjoin(event, true())
+    )
+    if date_from:
+        query = query.filter(X.created_at >= date_from)
+    if date_to:
+        query = query.filter(X.created_at < date_to + timedelta(days=1))
+    if cursor:
+        (last_id,) = pagination.decode_cursor(cursor, 1, types=(int,))
+        query = query.filter(X.id < last_id)
+    query = query.order_by(X.id.desc())
+
+    size = pagination.page_size(limit)
+    query = query.limit(size + 1)
+    rows = query.all()
+
+    if len(rows) > size:
+        rows = rows[:size]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(rows[-1].id)
+
+    return [
+        {
+            "id": r.id,
+            "livestock_id": r.livestock_id,
+            "livestock_tag": r.tag_number,
+            "exit_type": r.exit_type,
+            "event_date": r.event_date,
+            "notes": r.notes,
+            "reason": r.reason,
+            "created_at": r.created_at or r.event_date,
+        }
+        for r in rows
+    ]
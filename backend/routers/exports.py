@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+import models
+from routers.services import exports
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+
+
+def _stream(stmt, fmt: str, name: str):
+    if fmt == "parquet" and not exports.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed on the server")
+    media_type, extension = exports.FORMATS[fmt]
+    return StreamingResponse(
+        exports.ENCODERS[fmt](stmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={name}.{extension}"},
+    )
+
+
+# ----------------------------------------------
+# 🐄 Herd
+# ----------------------------------------------
+@router.get("/livestock")
+def export_livestock(
+    format: ExportFormat = Query("csv"),
+    available: Optional[str] = Query(None, description="Filter on availability, e.g. 'active'"),
+):
+    """Every animal with its current state, in id order."""
+    L = models.Livestock
+    stmt = (
+        select(
+            L.id, L.tag_number,
+            L.species_id, models.Species.name.label("species"),
+            L.category_id, models.Category.name.label("category"),
+            L.owner_id, models.Owner.name.label("owner"),
+            L.location_id, L.sex, L.dob, L.castrated, L.origin, L.availability, L.purchase_price,
+            L.last_event_type, L.last_event_date,
+            L.last_movement_type, L.last_movement_date, L.current_location,
+        )
+        .outerjoin(models.Species, models.Species.id == L.species_id)
+        .outerjoin(models.Category, models.Category.id == L.category_id)
+        .outerjoin(models.Owner, models.Owner.id == L.owner_id)
+        .order_by(L.id)
+    )
+    if available:
+        stmt = stmt.where(L.availability == available)
+    return _stream(stmt, format, "livestock")
+
+
+# ----------------------------------------------
+# 📅 Livestock events
+# ----------------------------------------------
+@router.get("/livestock-events")
+def export_livestock_events(
+    format: ExportFormat = Query("csv"),
+    event_type: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+):
+    E = models.LivestockEvent
+    stmt = (
+        select(
+            E.id, E.livestock_id, models.Livestock.tag_number,
+            E.event_type, E.event_date, E.notes,
+            E.purchase_id, E.sale_id, E.exit_id, E.health_event_id, E.created_at,
+        )
+        .join(models.Livestock, models.Livestock.id == E.livestock_id)
+        .order_by(E.id)
+    )
+    if event_type:
+        stmt = stmt.where(E.event_type == event_type)
+    if date_from:
+        stmt = stmt.where(E.event_date >= date_from)
+    if date_to:
+        stmt = stmt.where(E.event_date <= date_to)
+    return _stream(stmt, format, "livestock_events")
+
+
+# ----------------------------------------------
+# 📦 Stock ledger
+# ----------------------------------------------
+@router.get("/stock-movements")
+def export_stock_movements(
+    format: ExportFormat = Query("csv"),
+    location_id: Optional[int] = Query(None),
+    item_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+):
+    """The inventory movement ledger, same columns as /reports/stock-movements."""
+    M = models.InventoryMovement
+    stmt = (
+        select(
+            M.id.label("movement_id"), M.item_id, models.InventoryItem.name.label("item_name"),
+            M.location_id, M.quantity, M.movement_type, M.reference_type, M.reference_id, M.created_at,
+        )
+        .join(models.InventoryItem, models.InventoryItem.id == M.item_id)
+        .order_by(M.id)
+    )
+    if location_id:
+        stmt = stmt.where(M.location_id == location_id)
+    if item_id:
+        stmt = stmt.where(M.item_id == item_id)
+    if date_from:
+        stmt = stmt.where(M.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(M.created_at < date_to + timedelta(days=1))
+    return _stream(stmt, format, "stock_movements")
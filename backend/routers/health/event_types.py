@@ -1,16 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 import models, schemas, database
+from database import get_db
 
 router = APIRouter(prefix="/eventtypes", tags=["Health Event Types"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/", response_model=list[schemas.HealthEventType])
 def get_event_types(db: Session = Depends(get_db)):
     return db.query(models.HealthEventType).all()
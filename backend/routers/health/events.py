@@ -5,16 +5,10 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
 import models, schemas, database
+from database import get_db
 
 router = APIRouter(prefix="/events", tags=["Health Events"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # -------------------------------------------------------
 # GET ALL HEALTH EVENTS
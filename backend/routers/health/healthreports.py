@@ -1,92 +1,132 @@
 # routers/healthreports.py
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
-import models, database
+import json
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select, true
+import models, database, pagination
 
 router = APIRouter(prefix="/healthreports", tags=["Health Reports"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+STREAM_BATCH_SIZE = 1000  # history rows fetched per round trip
+
+
 @router.get("/event-types")
-def get_event_types(db: Session = Depends(get_db)):
-    event_types = db.query(models.HealthEventType).all()
+async def get_event_types(db: AsyncSession = Depends(database.get_async_db)):
+    event_types = (await db.execute(select(models.HealthEventType.id, models.HealthEventType.name))).all()
     return [{"id": et.id, "name": et.name} for et in event_types]
 
 @router.get("")
-def health_report(
-    date_from: str = Query(None),
-    date_to: str = Query(None),
+async def health_report(
+    response: Response,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
     event_type_id: int = Query(None),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE, description="Animals per page"),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {pagination.NEXT_CURSOR_HEADER} header"),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    # Build query for events
-    q = (
-        db.query(models.HealthEvent)
-        .options(
-            joinedload(models.HealthEvent.livestock).joinedload(models.Livestock.species),
-            joinedload(models.HealthEvent.livestock).joinedload(models.Livestock.owner),
-            joinedload(models.HealthEvent.event_type),
-            joinedload(models.HealthEvent.disease),
-            joinedload(models.HealthEvent.medication),
-            joinedload(models.HealthEvent.vet),
-        )
-    )
+    """
+    One entry per matching health event, each carrying the animal's full health
+    history. Paged by animal: limit counts animals (100 by default), and one
+    small query picks the page's ids so X-Next-Cursor is known before the body.
+    The histories then come off a server-side cursor (yield_per) on the body's
+    own read session, ordered by animal, and each animal's entries are written
+    as soon as its rows are in, so only one history is held at a time.
+    """
+    HE = models.HealthEvent
 
     filters = []
     if date_from:
-        filters.append(models.HealthEvent.date >= date_from)
+        filters.append(HE.date >= date_from)
     if date_to:
-        filters.append(models.HealthEvent.date <= date_to)
+        filters.append(HE.date <= date_to)
     if event_type_id:
-        filters.append(models.HealthEvent.event_type_id == event_type_id)
+        filters.append(HE.event_type_id == event_type_id)
+    matches = and_(*filters) if filters else true()
 
-    if filters:
-        q = q.filter(and_(*filters))
+    # animals with at least one matching event, in id order
+    size = pagination.page_size(limit)
+    animal_filters = list(filters)
+    if cursor:
+        (last_id,) = pagination.decode_cursor(cursor, 1, types=(int,))
+        animal_filters.append(HE.livestock_id > last_id)
+    page_ids = (await db.execute(
+        select(HE.livestock_id).where(*animal_filters).distinct().order_by(HE.livestock_id).limit(size + 1)
+    )).scalars().all()
+    if len(page_ids) > size:
+        page_ids = page_ids[:size]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(page_ids[-1])
 
-    events = q.all()
-
-    results = []
-    for ev in events:
-        livestock = ev.livestock
-
-        # Build animal history (all health events for this animal)
-        history_events = (
-            db.query(models.HealthEvent)
-            .filter(models.HealthEvent.livestock_id == livestock.id)
-            .options(
-                joinedload(models.HealthEvent.event_type),
-                joinedload(models.HealthEvent.disease),
-                joinedload(models.HealthEvent.medication),
-                joinedload(models.HealthEvent.vet),
-            )
-            .all()
+    stmt = (
+        select(
+            HE.id, HE.livestock_id, HE.date, HE.notes, matches.label("matches"),
+            models.Livestock.tag_number,
+            models.Species.name.label("species_name"),
+            models.Owner.name.label("owner_name"),
+            models.HealthEventType.name.label("event_type_name"),
+            models.Disease.name.label("disease_name"),
+            models.Medication.name.label("medication_name"),
+            models.Vet.name.label("vet_name"),
         )
+        .join(models.Livestock, models.Livestock.id == HE.livestock_id)
+        .outerjoin(models.Species, models.Species.id == models.Livestock.species_id)
+        .outerjoin(models.Owner, models.Owner.id == models.Livestock.owner_id)
+        .outerjoin(models.HealthEventType, models.HealthEventType.id == HE.event_type_id)
+        .outerjoin(models.Disease, models.Disease.id == HE.disease_id)
+        .outerjoin(models.Medication, models.Medication.id == HE.medication_id)
+        .outerjoin(models.Vet, models.Vet.id == HE.vet_id)
+        .where(HE.livestock_id.in_(page_ids))
+        .order_by(HE.livestock_id, HE.date, HE.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
 
+    def entries(history_rows):
         history = [
             {
                 "date": h.date,
-                "event_type_name": h.event_type.name if h.event_type else None,
-                "disease_name": h.disease.name if h.disease else None,
-                "medication_name": h.medication.name if h.medication else None,
-                "vet_name": h.vet.name if h.vet else None,
+                "event_type_name": h.event_type_name,
+                "disease_name": h.disease_name,
+                "medication_name": h.medication_name,
+                "vet_name": h.vet_name,
                 "notes": h.notes,
             }
-            for h in history_events
+            for h in history_rows
         ]
+        for ev in history_rows:
+            if ev.matches:
+                yield json.dumps(jsonable_encoder({
+                    "id": ev.livestock_id,
+                    "tag_number": ev.tag_number,
+                    "species_name": ev.species_name,
+                    "owner_name": ev.owner_name,
+                    "event_type_name": ev.event_type_name,
+                    "date": ev.date,
+                    "history": history,
+                }))
 
-        results.append({
-            "id": livestock.id,
-            "tag_number": livestock.tag_number,
-            "species_name": livestock.species.name if livestock.species else None,
-            "owner_name": livestock.owner.name if livestock.owner else None,
-            "event_type_name": ev.event_type.name if ev.event_type else None,
-            "date": ev.date,
-            "history": history,
-        })
+    async def stream():
+        yield "["
+        first = True
+        if page_ids:
+            # the request's session is closed before a StreamingResponse body has finished
+            async with database.AsyncReadSessionLocal() as stream_db:
+                result = await stream_db.stream(stmt)
+                animal_rows = []
+                async for partition in result.partitions():
+                    for row in partition:
+                        if animal_rows and row.livestock_id != animal_rows[0].livestock_id:
+                            for entry in entries(animal_rows):
+                                yield ("" if first else ",") + entry
+                                first = False
+                            animal_rows = []
+                        animal_rows.append(row)
+                for entry in entries(animal_rows):
+                    yield ("" if first else ",") + entry
+                    first = False
+        yield "]"
 
-    return results
+    return StreamingResponse(stream(), media_type="application/json", headers=dict(response.headers))
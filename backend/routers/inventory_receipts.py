@@ -1,13 +1,18 @@
 # routers/inventory_receipts.py
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 from typing import Dict, Optional,List
 from decimal import Decimal
-from sqlalchemy import func
+from collections import defaultdict
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from schemas import IssueStockRequest, IssueStockResponse
 import models
 from models import InventoryMovement, StoreInventory, InventoryItem, IssueReceipt
 from datetime import datetime
+from routers.services import inventory_service, purchase_order_state, stock_ledger
 
 
 
@@ -17,122 +22,196 @@ import models, schemas
 
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
+
+
+def _request_hash(reference_type: str, rcv_in: schemas.GoodsReceiptCreate) -> str:
+    body = json.dumps([reference_type, rcv_in.model_dump(mode="json")], sort_keys=True)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _lock_order(db: Session, purchase_order_id: int) -> models.PurchaseOrder:
+    """The PO row FOR UPDATE: receipts (and edits) of one PO apply one after another."""
+    order = purchase_order_state.lock_order(db, purchase_order_id)
+    if order is None:
+        raise HTTPException(status_code=404, detail="Purchase order not found")
+    return order
+
+
+def _receive_against_order(db: Session, order: models.PurchaseOrder, items):
+    """
+    Add a receipt's quantities to its (locked) PO's lines and roll the PO
+    status up to partial/received, in the receipt's transaction. An item
+    fills its PO lines in line order; a short over-delivery goes on the last
+    of them. Draft and fully received orders, and items whose lines are all
+    received, are refused with 400.
+    """
+    if order.status == models.PurchaseOrderStatus.draft:
+        raise HTTPException(status_code=400, detail=f"Purchase order {order.id} is a draft; place the order before receiving")
+    if order.status == models.PurchaseOrderStatus.received:
+        raise HTTPException(status_code=400, detail=f"Purchase order {order.id} is already fully received")
+
+    POI = models.PurchaseOrderItem
+    lines = db.execute(
+        select(POI.id, POI.item_id, POI.quantity, POI.quantity_received).where(POI.order_id == order.id).order_by(POI.id)
+    ).all()
+    incoming: Dict[int, int] = defaultdict(int)
+    for row in items:
+        incoming[row.item_id] += int(row.quantity_received)
+    not_ordered = sorted(set(incoming) - {line.item_id for line in lines})
+    if not_ordered:
+        raise HTTPException(status_code=400, detail=f"Item {not_ordered[0]} is not on purchase order {order.id}")
+
+    received = {line.id: line.quantity_received or 0 for line in lines}
+    for item_id, qty in incoming.items():
+        item_lines = [line for line in lines if line.item_id == item_id]
+        if qty and all(received[line.id] >= line.quantity for line in item_lines):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Item {item_id} is already fully received on purchase order {order.id}",
+            )
+        for line in item_lines[:-1]:
+            take = min(qty, max(line.quantity - received[line.id], 0))
+            received[line.id] += take
+            qty -= take
+        received[item_lines[-1].id] += qty
+
+    changed = [{"b_id": line.id, "b_qty": received[line.id]} for line in lines if received[line.id] != (line.quantity_received or 0)]
+    if changed:
+        db.execute(
+            update(POI.__table__).where(POI.__table__.c.id == bindparam("b_id")).values(quantity_received=bindparam("b_qty")),
+            changed,
+        )
+    purchase_order_state.roll_up_status(order, [(line.quantity, received[line.id]) for line in lines])
+
+
+def _post_receipt(
+    db: Session,
+    rcv_in: schemas.GoodsReceiptCreate,
+    store_id: int,
+    purchase_order_id: Optional[int],
+    received_by: Optional[str],
+    reference_type: str,
+    idempotency_key: Optional[str],
+):
+    """
+    The receipt engine behind /receipts and /direct-receipt: header, lines and
+    costing in one transaction, committed here.
+
+    The header insert claims the Idempotency-Key (ON CONFLICT DO NOTHING on
+    its unique constraint). A retry, even one racing the original, waits for
+    it and gets the original receipt back without posting again; the same
+    key on a different request is a 409.
+
+    Lines take a fixed number of statements: one query checks the items
+    exist, then receive_lines locks every StockOnHand row at once and bulk
+    writes balances, layers and movements. Against a PO, its received
+    quantities and status are updated too.
+    """
+    for row in rcv_in.items:
+        if int(row.quantity_received) <= 0:
+            raise HTTPException(status_code=400, detail="quantity_received must be > 0")
+
+    order = _lock_order(db, purchase_order_id) if purchase_order_id is not None else None
+    request_hash = _request_hash(reference_type, rcv_in) if idempotency_key else None
+    receipt_id = db.execute(
+        insert(models.GoodsReceipt)
+        .values(
+            purchase_order_id=purchase_order_id,
+            store_id=store_id,
+            received_by=received_by,
+            notes=rcv_in.notes,
+            idempotency_key=idempotency_key,
+            request_hash=request_hash,
+        )
+        .on_conflict_do_nothing(constraint="uix_goods_receipts_idempotency_key")
+        .returning(models.GoodsReceipt.id)
+    ).scalar()
+    if receipt_id is None:
+        original = db.query(models.GoodsReceipt).filter(models.GoodsReceipt.idempotency_key == idempotency_key).one()
+        if original.request_hash != request_hash:
+            raise HTTPException(status_code=409, detail="Idempotency-Key was already used for a different receipt")
+        return original
+
+    item_ids = {row.item_id for row in rcv_in.items}
+    found = {i for (i,) in db.query(models.InventoryItem.id).filter(models.InventoryItem.id.in_(item_ids))}
+    missing = sorted(item_ids - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Inventory item {missing[0]} not found")
+
+    if order is not None:
+        _receive_against_order(db, order, rcv_in.items)
+
+    if rcv_in.items:
+        db.execute(insert(models.GoodsReceiptItem), [
+            {
+                "receipt_id": receipt_id,
+                "item_id": row.item_id,
+                "store_id": store_id,
+                "quantity_received": int(row.quantity_received),
+                "cost_price": row.cost_price,
+            }
+            for row in rcv_in.items
+        ])
+        inventory_service.receive_lines(
+            db,
+            store_id,
+            [(row.item_id, int(row.quantity_received), row.cost_price) for row in rcv_in.items],
+            movement_type="RECEIPT",
+            ref_table=reference_type,
+            ref_id=receipt_id,
+        )
+
+    db.commit()
+    return db.get(models.GoodsReceipt, receipt_id)
+
+
 @router.post("/receipts", response_model=schemas.GoodsReceiptResponse)
-def create_goods_receipt(rcv_in: schemas.GoodsReceiptCreate, db: Session = Depends(get_db)):
+def create_goods_receipt(
+    rcv_in: schemas.GoodsReceiptCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db),
+):
     """
-    Create GRN: write GoodsReceiptItem(s), add InventoryMovement IN entries for MAIN_STORE_ID (or provided store),
-    update StoreInventory and InventoryItem.quantity_on_hand.
+    Create GRN: write GoodsReceiptItem(s) and post the lines through the costing
+    engine (InventoryMovement IN, StockOnHand WAVG, InventoryItem.quantity_on_hand).
+    Send an Idempotency-Key header to make retries safe.
     """
     MAIN_STORE_ID = 1
     try:
-        # --- Step 1: Determine store ---
         store_id = getattr(rcv_in, "store_id", None) or MAIN_STORE_ID
         store_obj = db.query(models.Store).filter(models.Store.id == store_id).first()
         if not store_obj:
             raise HTTPException(status_code=404, detail="Store not found")
 
-        # --- Step 2: Create GoodsReceipt header ---
-        receipt = models.GoodsReceipt(
-            purchase_order_id=rcv_in.purchase_order_id,
-            store_id=store_id,
-            received_by=rcv_in.received_by,
-            notes=rcv_in.notes
-        )
-        db.add(receipt)
-        db.flush()  # populate receipt.id
-
-        # --- Step 3: Process each item ---
-        for row in rcv_in.items:
-            qty = int(row.quantity_received)
-            if qty <= 0:
-                raise HTTPException(status_code=400, detail="quantity_received must be > 0")
-
-            inv_item = db.query(models.InventoryItem).filter(models.InventoryItem.id == row.item_id).first()
-            if not inv_item:
-                raise HTTPException(status_code=404, detail=f"Inventory item {row.item_id} not found")
-
-            # --- GoodsReceiptItem ---
-            gr_item = models.GoodsReceiptItem(
-                receipt_id=receipt.id,
-                item_id=row.item_id,
-                store_id=store_id,  # ✅ set store_id
-                quantity_received=qty,
-                cost_price=row.cost_price
-            )
-            db.add(gr_item)
-
-            # --- InventoryMovement ---
-            mv = models.InventoryMovement(
-                item_id=row.item_id,
-                location_id=store_id,
-                quantity=qty,
-                movement_type="RECEIPT",
-                reference_type="goods_receipt",
-                reference_id=receipt.id,
-                created_at=datetime.utcnow()
-            )
-            db.add(mv)
-
-            # --- Update or create StoreInventory ---
-            si = db.query(models.StoreInventory).filter(
-                models.StoreInventory.store_id == store_id,
-                models.StoreInventory.item_id == row.item_id
-            ).with_for_update(nowait=False).first()
-
-            if not si:
-                si = models.StoreInventory(
-                    store_id=store_id,
-                    item_id=row.item_id,
-                    quantity=qty,
-                    avg_cost=row.cost_price
-                )
-                db.add(si)
-            else:
-                prev_qty = float(si.quantity or 0)
-                prev_cost = float(si.avg_cost or 0)
-                si.quantity = prev_qty + qty
-                # weighted average
-                if row.cost_price is not None:
-                    si.avg_cost = (prev_cost * prev_qty + float(row.cost_price) * qty) / si.quantity
-                db.add(si)
-
-            # --- Update global inventory quantity ---
-            inv_item.quantity_on_hand = (inv_item.quantity_on_hand or 0) + qty
-            db.add(inv_item)
-
-        # --- Step 4: Commit all changes ---
-        db.commit()
-        db.refresh(receipt)
-        return receipt
+        return _post_receipt(db, rcv_in, store_id, rcv_in.purchase_order_id, rcv_in.received_by,
+                             "goods_receipt", idempotency_key)
 
     except HTTPException:
         db.rollback()
         raise
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating goods receipt: {str(e)}")
 
 @router.get("/stock", response_model=List[schemas.StockResponse])
 def get_stock(db: Session = Depends(get_db)):
-    stock_summary = (
-        db.query(
-            models.InventoryMovement.item_id,
-            func.sum(models.InventoryMovement.quantity).label("quantity_on_hand")
-        )
-        .group_by(models.InventoryMovement.item_id)
-        .all()
-    )
-
-    stock_data = []
-    for row in stock_summary:
-        item = db.query(models.InventoryItem).filter(models.InventoryItem.id == row.item_id).first()
-        stock_data.append({
-            "item_id": row.item_id,
-            "item_name": item.name,
-            "quantity_on_hand": row.quantity_on_hand or 0
-        })
-
-    return stock_data
+    """Quantity per item over all stores: latest ledger checkpoint plus the movements since."""
+    return stock_ledger.stock_levels(db)
+
+
+@router.post("/stock/checkpoints")
+def create_stock_checkpoint(db: Session = Depends(get_db)):
+    """Roll the stock ledger checkpoint forward (checkpoint_stock_ledger.py does the same from cron)."""
+    checkpoint = stock_ledger.create_checkpoint(db)
+    return {
+        "id": checkpoint.id,
+        "through_movement_id": checkpoint.through_movement_id,
+        "balance_count": checkpoint.balance_count,
+        "created_at": checkpoint.created_at,
+    }
 def ensure_main_store(db: Session):
     """
     Safe helper: return the 'Main Store' record, creating it if missing.
@@ -149,11 +228,13 @@ def ensure_main_store(db: Session):
 @router.post("/direct-receipt", response_model=schemas.GoodsReceiptResponse)
 def create_direct_receipt(
     rcv_in: schemas.GoodsReceiptCreate, 
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db)
 ):
     """
     Directly receive stock without a Purchase Order.
-    Works exactly like /receipts but skips PO validation.
+    Works exactly like /receipts (same engine, same Idempotency-Key handling)
+    but skips PO validation.
     """
 
     try:
@@ -188,104 +269,16 @@ def create_direct_receipt(
             if not store_obj:
                 raise HTTPException(status_code=404, detail="Store not found")
 
-        # --- Create receipt header ---
-        receipt = models.GoodsReceipt(
-            purchase_order_id=None,   # direct receipt has no PO
-            store_id=store_id,
-            received_by=rcv_in.received_by or "System",
-            notes=rcv_in.notes,
-        )
-        db.add(receipt)
-        db.flush()  # populate receipt.id
-
-        # --- Process each item ---
-        for row in rcv_in.items:
-            qty = int(row.quantity_received)
-            if qty <= 0:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="quantity_received must be > 0"
-                )
-
-            inv_item = (
-                db.query(models.InventoryItem)
-                .filter(models.InventoryItem.id == row.item_id)
-                .first()
-            )
-            if not inv_item:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Inventory item {row.item_id} not found",
-                )
-
-            # --- Create GoodsReceiptItem ---
-            gr_item = models.GoodsReceiptItem(
-                receipt_id=receipt.id,
-                item_id=row.item_id,
-                store_id=store_id,        # MUST be included
-                quantity_received=qty,
-                cost_price=row.cost_price,
-            )
-            db.add(gr_item)
-
-            # --- Inventory Movement (Ledger) ---
-            movement = models.InventoryMovement(
-                item_id=row.item_id,
-                location_id=store_id,
-                quantity=qty,
-                movement_type="RECEIPT",
-                reference_type="direct_receipt",
-                reference_id=receipt.id,
-                created_at=datetime.utcnow(),
-            )
-            db.add(movement)
-
-            # --- Update or create StoreInventory ---
-            si = (
-                db.query(models.StoreInventory)
-                .filter(
-                    models.StoreInventory.store_id == store_id,
-                    models.StoreInventory.item_id == row.item_id
-                )
-                .with_for_update(nowait=False)
-                .first()
-            )
-
-            if not si:
-                si = models.StoreInventory(
-                    store_id=store_id,
-                    item_id=row.item_id,
-                    quantity=qty,
-                    avg_cost=row.cost_price,
-                )
-                db.add(si)
-            else:
-                prev_qty = float(si.quantity or 0)
-                prev_cost = float(si.avg_cost or 0)
-
-                si.quantity = prev_qty + qty
-
-                # Weighted average cost
-                if row.cost_price is not None:
-                    si.avg_cost = (
-                        (prev_cost * prev_qty) 
-                        + (float(row.cost_price) * qty)
-                    ) / si.quantity
-
-                db.add(si)
-
-            # --- Update global inventory quantity ---
-            inv_item.quantity_on_hand = (inv_item.quantity_on_hand or 0) + qty
-            db.add(inv_item)
-
-        # --- Commit all changes ---
-        db.commit()
-        db.refresh(receipt)
-        return receipt
+        # direct receipt has no PO
+        return _post_receipt(db, rcv_in, store_id, None, rcv_in.received_by or "System",
+                             "direct_receipt", idempotency_key)
 
     except HTTPException:
         db.rollback()
         raise
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -327,43 +320,22 @@ def get_last_cost(item_id: int, db: Session = Depends(get_db)):
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching last cost: {str(e)}")
-@router.get("/stock/{store_id}", response_model=List[schemas.StockResponse])
-def get_store_stock(store_id: int, db: Session = Depends(get_db)):
-    stock_summary = (
-        db.query(
-            models.InventoryMovement.item_id,
-            func.sum(models.InventoryMovement.quantity).label("quantity_on_hand")
-        )
-        .filter(models.InventoryMovement.location_id == store_id)
-        .group_by(models.InventoryMovement.item_id)
-        .all()
-    )
 
-    stock_data = []
-    for row in stock_summary:
-        item = db.query(models.InventoryItem).filter(models.InventoryItem.id == row.item_id).first()
-        stock_data.append({
-            "item_id": row.item_id,
-            "item_name": item.name,
-            "quantity_on_hand": row.quantity_on_hand or 0
-        })
 
-    return stock_data
+@router.get("/stock/{store_id}", response_model=List[schemas.StockResponse])
+def get_store_stock(store_id: int, db: Session = Depends(get_db)):
+    """Quantity per item at one store: latest ledger checkpoint plus the movements since."""
+    return stock_ledger.stock_levels(db, store_id)
 
 
 @router.post("/transfer", response_model=schemas.IssueReceiptResponse)
 def transfer_stock(payload: schemas.IssueCreate, db: Session = Depends(get_db)):
     """
-    Transfer items from one store to another (multi-item).
-    - Validates source != destination
-    - Validates source has enough qty per item
-    - Creates two InventoryMovement entries per item (OUT and IN)
-    - Updates StoreInventory rows (create dst row if missing)
-    - Updates InventoryItem.quantity_on_hand as sum of store_inventories
-    - Transfers cost: uses payload.cost_price if given, else tries:
-        1) source store avg_cost
-        2) last GRN cost (GoodsReceiptItem)
-        3) 0.0 fallback
+    Transfer items from one store to another (multi-item), through the costing engine.
+    - Validates source != destination and that the source has enough qty per item
+    - Writes ISSUE_OUT / ISSUE_IN movements and updates StockOnHand at both stores
+    - Transfers cost: payload cost_price if given, else the source store's WAVG cost
+    All lines commit together or not at all.
     """
     if payload.source_store_id == payload.destination_store_id:
         raise HTTPException(status_code=400, detail="Source and destination stores must be different")
@@ -373,137 +345,38 @@ def transfer_stock(payload: schemas.IssueCreate, db: Session = Depends(get_db)):
     if not src or not dst:
         raise HTTPException(status_code=404, detail="Source or destination store not found")
 
-    StoreInv = getattr(models, "StoreInventory", None)
-    Movement = getattr(models, "InventoryMovement", None)
-    if StoreInv is None or Movement is None:
-        raise HTTPException(status_code=500, detail="Required models missing (StoreInventory/InventoryMovement)")
-
-    # helper: last GRN cost
-    def get_last_grn_cost(item_id: int):
-        GRItem = getattr(models, "GoodsReceiptItem", None)
-        if GRItem is None:
-            return None
-        last = (
-            db.query(GRItem.cost_price)
-            .filter(GRItem.item_id == item_id)
-            .order_by(getattr(GRItem, "id").desc())
-            .first()
-        )
-        return float(last[0]) if last and last[0] is not None else None
+    for line in payload.items:
+        if float(line.quantity) <= 0:
+            raise HTTPException(status_code=400, detail="Quantity must be > 0")
 
-    response_items = []
     try:
-        with db.begin():
-            # optional IssueReceipt record (best-effort)
-            IssueModel = getattr(models, "IssueReceipt", None)
-            issue_obj = None
-            if IssueModel is not None:
-                issue_obj = IssueModel(
-                    source_store_id=payload.source_store_id,
-                    destination_store_id=payload.destination_store_id,
-                    issued_by=payload.issued_by,
-                    received_by=payload.received_by,
-                    notes=payload.notes,
-                    created_at=datetime.utcnow() if hasattr(IssueModel, "created_at") else None
-                )
-                db.add(issue_obj)
-                db.flush()
-                issue_id = getattr(issue_obj, "id", None)
-            else:
-                issue_id = None
-
-            for line in payload.items:
-                item_id = int(line.item_id)
-                qty = float(line.quantity)
-                if qty <= 0:
-                    raise HTTPException(status_code=400, detail="Quantity must be > 0")
-
-                # lock and read source inventory
-                src_inv = (
-                    db.query(StoreInv)
-                    .filter(StoreInv.store_id == payload.source_store_id, StoreInv.item_id == item_id)
-                    .with_for_update(nowait=False)
-                    .first()
-                )
-                if not src_inv or float(src_inv.quantity or 0) < qty:
-                    raise HTTPException(status_code=400, detail=f"Insufficient stock in source store for item {item_id}")
-
-                # determine cost to transfer
-                # priority: payload.cost_price -> src_inv.avg_cost -> last GRN cost -> 0.0
-                cost = None
-                if getattr(line, "cost_price", None) is not None:
-                    cost = float(line.cost_price)
-                elif getattr(src_inv, "avg_cost", None) is not None:
-                    cost = float(src_inv.avg_cost)
-                else:
-                    last = get_last_grn_cost(item_id)
-                    cost = float(last) if last is not None else 0.0
-
-                # create OUT movement (negative quantity)
-                out_m = Movement(
-                    item_id=item_id,
-                    location_id=payload.source_store_id,
-                    quantity=-abs(qty),
-                    movement_type="ISSUE_OUT",
-                    reference_type="stock_transfer",
-                    reference_id=issue_id
-                )
-                db.add(out_m)
-
-                # deduct source store inventory
-                src_inv.quantity = float(src_inv.quantity) - qty
-                db.add(src_inv)
-
-                # create IN movement (positive quantity)
-                in_m = Movement(
-                    item_id=item_id,
-                    location_id=payload.destination_store_id,
-                    quantity=abs(qty),
-                    movement_type="ISSUE_IN",
-                    reference_type="stock_transfer",
-                    reference_id=issue_id
-                )
-                db.add(in_m)
-
-                # update destination store inventory (create if missing)
-                dst_inv = (
-                    db.query(StoreInv)
-                    .filter(StoreInv.store_id == payload.destination_store_id, StoreInv.item_id == item_id)
-                    .with_for_update(nowait=False)
-                    .first()
-                )
-                if not dst_inv:
-                    dst_inv = StoreInv(store_id=payload.destination_store_id, item_id=item_id, quantity=0, avg_cost=cost)
-                    db.add(dst_inv)
-                    db.flush()
-
-                # weighted average cost at destination
-                prev_qty = float(dst_inv.quantity or 0)
-                prev_cost = float(dst_inv.avg_cost or 0) if dst_inv.avg_cost is not None else 0.0
-                new_total_qty = prev_qty + qty
-                if new_total_qty > 0:
-                    new_avg_cost = ((prev_qty * prev_cost) + (qty * cost)) / new_total_qty
-                else:
-                    new_avg_cost = cost
-                dst_inv.avg_cost = new_avg_cost
-                dst_inv.quantity = prev_qty + qty
-                db.add(dst_inv)
-
-                # recalc global inventory item quantity_on_hand (sum across stores)
-                item = db.query(models.InventoryItem).filter(models.InventoryItem.id == item_id).first()
-                total = (
-                    db.query(func.coalesce(func.sum(StoreInv.quantity), 0))
-                    .filter(StoreInv.item_id == item_id)
-                    .scalar()
-                )
-                item.quantity_on_hand = float(total or 0)
-                db.add(item)
-
-                response_items.append({"item_id": item_id, "quantity": qty, "cost_price": cost})
+        issue_obj = models.IssueReceipt(
+            source_store_id=payload.source_store_id,
+            destination_store_id=payload.destination_store_id,
+            issued_by=payload.issued_by,
+            received_by=payload.received_by,
+            notes=payload.notes,
+            created_at=datetime.utcnow(),
+        )
+        db.add(issue_obj)
+        db.flush()
+
+        moved = inventory_service.transfer_lines(
+            db,
+            payload.source_store_id,
+            payload.destination_store_id,
+            [(line.item_id, line.quantity, line.cost_price) for line in payload.items],
+            ref_table="stock_transfer",
+            ref_id=issue_obj.id,
+        )
+        response_items = [
+            {"item_id": m["item_id"], "quantity": float(m["quantity"]), "cost_price": float(m["unit_cost"])}
+            for m in moved
+        ]
 
-        # commit happens at exit
-        resp = {
-            "id": issue_id,
+        db.commit()
+        return {
+            "id": issue_obj.id,
             "source_store_id": payload.source_store_id,
             "destination_store_id": payload.destination_store_id,
             "issued_by": payload.issued_by,
@@ -511,10 +384,10 @@ def transfer_stock(payload: schemas.IssueCreate, db: Session = Depends(get_db)):
             "notes": payload.notes,
             "items": response_items,
         }
-        return resp
 
-    except HTTPException:
-        raise
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error transferring stock: {str(e)}")
@@ -522,95 +395,11 @@ def transfer_stock(payload: schemas.IssueCreate, db: Session = Depends(get_db)):
 
 
 
-MAIN_STORE_ID = 1  # enforced main store
-
-@router.get("/stock", response_model=List[schemas.StockResponse])
-def get_main_store_stock(db: Session = Depends(get_db)):
-    """
-    Return stock list for MAIN_STORE only: item_id, item_name, main_qty.
-    This uses InventoryMovement sums for MAIN_STORE so it reflects receipts/transfers/movements.
-    """
-    Movement = getattr(models, "InventoryMovement", None)
-    Item = getattr(models, "InventoryItem", None)
-    if Movement is None or Item is None:
-        raise HTTPException(status_code=500, detail="Required models missing (InventoryMovement/InventoryItem)")
-
-    rows = (
-        db.query(
-            Movement.item_id,
-            func.coalesce(func.sum(Movement.quantity), 0).label("main_qty")
-        )
-        .filter(Movement.location_id == MAIN_STORE_ID)
-        .group_by(Movement.item_id)
-        .all()
-    )
-
-    stock_data = []
-    for r in rows:
-        item = db.query(Item).filter(Item.id == r.item_id).first()
-        stock_data.append({
-            "item_id": int(r.item_id),
-            "item_name": item.name if item else "",
-            "quantity_on_hand": float(r.main_qty or 0)
-        })
-
-    return stock_data
-
-@router.get("/stock", response_model=List[schemas.StockResponse])
-def get_main_stock(db: Session = Depends(get_db)):
-    Movement = models.InventoryMovement
-    Item = models.InventoryItem
-    rows = (
-        db.query(Movement.item_id, func.coalesce(func.sum(Movement.quantity), 0).label("qty"))
-        .filter(Movement.location_id == MAIN_STORE_ID)
-        .group_by(Movement.item_id)
-        .all()
-    )
-    out = []
-    for r in rows:
-        item = db.query(Item).filter(Item.id == r.item_id).first()
-        out.append({"item_id": int(r.item_id), "item_name": item.name if item else "", "quantity_on_hand": float(r.qty)})
-    return out
-
-@router.get("/stock/{store_id}", response_model=List[schemas.StockResponse])
-def get_store_stock(store_id: int, db: Session = Depends(get_db)):
-    Movement = models.InventoryMovement
-    Item = models.InventoryItem
-    rows = (
-        db.query(Movement.item_id, func.coalesce(func.sum(Movement.quantity), 0).label("qty"))
-        .filter(Movement.location_id == store_id)
-        .group_by(Movement.item_id)
-        .all()
-    )
-    out = []
-    for r in rows:
-        item = db.query(Item).filter(Item.id == r.item_id).first()
-        out.append({"item_id": int(r.item_id), "item_name": item.name if item else "", "quantity_on_hand": float(r.qty)})
-    return out
-
-
-@router.get("/stock/{store_id}", response_model=List[schemas.StockResponse])
-def get_store_stock(store_id: int, db: Session = Depends(get_db)):
-    Movement = models.InventoryMovement
-    Item = models.InventoryItem
-    rows = (
-        db.query(Movement.item_id, func.coalesce(func.sum(Movement.quantity), 0).label("qty"))
-        .filter(Movement.location_id == store_id)
-        .group_by(Movement.item_id)
-        .all()
-    )
-    out = []
-    for r in rows:
-        item = db.query(Item).filter(Item.id == r.item_id).first()
-        out.append({"item_id": int(r.item_id), "item_name": item.name if item else "", "quantity_on_hand": float(r.qty)})
-    return out
-
-
 @router.post("/issue", response_model=IssueStockResponse)
 def issue_stock(payload: IssueStockRequest, db: Session = Depends(get_db)):
     """
     Issue stock from main store to another store.
-    Updates InventoryMovement and StoreInventory.
+    Deducts the source and credits the destination through the costing engine.
     """
     source_id = payload.source_store_id
     dest_id = payload.destination_store_id
@@ -618,48 +407,18 @@ def issue_stock(payload: IssueStockRequest, db: Session = Depends(get_db)):
     if source_id == dest_id:
         raise HTTPException(status_code=400, detail="Source and destination cannot be the same")
 
-    # Loop through each item and update InventoryMovement
-    for item in payload.items:
-        # 1️⃣ Record outgoing movement from main store
-        movement_out = InventoryMovement(
-            item_id=item.item_id,
-            location_id=source_id,
-            quantity=-item.quantity,
-            movement_type="issue",
-            reference_type="transfer",
-            reference_id=None,
-            created_at=datetime.utcnow().date()
-        )
-        db.add(movement_out)
-
-        # 2️⃣ Record incoming movement to destination store
-        movement_in = InventoryMovement(
-            item_id=item.item_id,
-            location_id=dest_id,
-            quantity=item.quantity,
-            movement_type="receive",
-            reference_type="transfer",
-            reference_id=None,
-            created_at=datetime.utcnow().date()
-        )
-        db.add(movement_in)
-
-        # 3️⃣ Update or create StoreInventory at destination
-        store_inv = (
-            db.query(StoreInventory)
-            .filter(StoreInventory.store_id == dest_id, StoreInventory.item_id == item.item_id)
-            .first()
+    try:
+        inventory_service.transfer_lines(
+            db,
+            source_id,
+            dest_id,
+            [(item.item_id, item.quantity, item.cost_price) for item in payload.items],
+            out_movement_type="issue",
+            in_movement_type="receive",
+            ref_table="transfer",
         )
-        if store_inv:
-            store_inv.quantity += item.quantity
-        else:
-            store_inv = StoreInventory(
-                store_id=dest_id,
-                item_id=item.item_id,
-                quantity=item.quantity,
-                avg_cost=item.cost_price,
-            )
-            db.add(store_inv)
-
-    db.commit()
-    return {"success": True, "message": "Stock issued successfully"}
\ No newline at end of file
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "message": "Stock issued successfully"}
@@ -0,0 +1,61 @@
+# routers/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from database import get_db, get_primary_db
+import models, schemas
+from routers.services import import_jobs
+
+router = APIRouter(prefix="/jobs", tags=["Import Jobs"])
+
+
+def _submit(kind: str, file: UploadFile, db: Session):
+    try:
+        job = import_jobs.submit_job(db, kind, file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return import_jobs.job_to_dict(job)
+
+
+# ----------------------------------------------
+# 🧩 Queue uploads (returns immediately with a job id)
+# ----------------------------------------------
+@router.post("/livestock", response_model=schemas.ImportJobResponse, status_code=202)
+def queue_livestock_upload(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Queue a herd CSV/Excel (same columns as /livestock/bulk-upload)."""
+    return _submit("livestock", file, db)
+
+
+@router.post("/inventory-items", response_model=schemas.ImportJobResponse, status_code=202)
+def queue_inventory_item_upload(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Queue an inventory item CSV/Excel: name, type_id, unit_id[, cost_price, reorder_level, notes]."""
+    return _submit("inventory_items", file, db)
+
+
+# ----------------------------------------------
+# 🔍 Progress and error report
+# ----------------------------------------------
+# progress is committed on the primary; a lagging replica would show stale counts
+@router.get("/{job_id}", response_model=schemas.ImportJobResponse)
+def get_job(job_id: int, db: Session = Depends(get_primary_db)):
+    job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return import_jobs.job_to_dict(job)
+
+
+@router.get("/{job_id}/errors")
+def download_job_errors(job_id: int, db: Session = Depends(get_primary_db)):
+    job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status not in ("completed", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    if not job.error_report:
+        raise HTTPException(status_code=404, detail="Job has no skipped or failed rows")
+
+    return Response(
+        content=job.error_report,
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=import_job_{job.id}_errors.csv"},
+    )
@@ -1,22 +1,17 @@
-from typing import Optional, List
-from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File
+from typing import Optional, List, Literal
+from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
-import pandas as pd
-import io
 
-import models, schemas, database
+import models, schemas, database, pagination
+from database import get_db
 
 router = APIRouter(prefix="/livestock", tags=["Livestock"])
 
-# --- Database dependency ---
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # ----------------------------------------------
 # 🐄 Register single livestock
@@ -87,27 +82,105 @@ def create_livestock(livestock: schemas.LivestockCreate, db: Session = Depends(g
 # ----------------------------------------------
 # 🐄 Get all livestock (dashboard)
 # ----------------------------------------------
+# columns a client may ask for with ?fields=
+LIVESTOCK_FIELDS = [f for f in schemas.LivestockResponse.model_fields if f != "latest_event"]
+
+
 @router.get("/", response_model=List[schemas.LivestockResponse])
-def get_all_livestock(
+@router.get("", response_model=List[schemas.LivestockResponse], include_in_schema=False)
+async def get_all_livestock(
+    response: Response,
     available: Optional[bool] = Query(None, description="Filter only active livestock if true"),
     category: Optional[str] = Query(None, description="Filter by category name"),
-    db: Session = Depends(get_db)
+    species_id: Optional[int] = Query(None),
+    owner_id: Optional[int] = Query(None),
+    location_id: Optional[int] = Query(None),
+    order_by: Literal["id", "tag_number"] = Query("id", description="Keyset used for paging"),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {pagination.NEXT_CURSOR_HEADER} header"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,tag_number,availability"),
+    db: AsyncSession = Depends(database.get_async_db)
 ):
-    query = db.query(models.Livestock)
+    """
+    Keyset-paged herd listing, limit animals at a time (100 by default); the
+    next page's cursor is sent in the X-Next-Cursor header. fields= returns
+    only the requested columns. Use /livestock/counts for herd totals.
+    """
+    L = models.Livestock
+
+    selected = LIVESTOCK_FIELDS
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in LIVESTOCK_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # the keyset columns are always needed to build the next cursor
+    columns = list(dict.fromkeys(["id", order_by, *selected]))
+    query = select(*[getattr(L, c) for c in columns])
 
     if available is True:
-        query = query.filter(models.Livestock.availability == "active")
+        query = query.where(L.availability == "active")
     elif available is False:
-        query = query.filter(models.Livestock.availability != "active")
-
+        query = query.where(L.availability != "active")
     if category:
-        category_obj = db.query(models.Category).filter(models.Category.name.ilike(category)).first()
-        if category_obj:
-            query = query.filter(models.Livestock.category_id == category_obj.id)
-        else:
-            return []  # no such category
+        query = query.where(
+            L.category_id.in_(select(models.Category.id).where(models.Category.name.ilike(category)))
+        )
+    if species_id is not None:
+        query = query.where(L.species_id == species_id)
+    if owner_id is not None:
+        query = query.where(L.owner_id == owner_id)
+    if location_id is not None:
+        query = query.where(L.location_id == location_id)
+
+    if order_by == "tag_number":
+        if cursor:
+            last_tag, last_id = pagination.decode_cursor(cursor, 2, types=(str, int))
+            query = query.where(tuple_(L.tag_number, L.id) > tuple_(last_tag, last_id))
+        query = query.order_by(L.tag_number, L.id)
+    else:
+        if cursor:
+            (last_id,) = pagination.decode_cursor(cursor, 1, types=(int,))
+            query = query.where(L.id > last_id)
+        query = query.order_by(L.id)
+
+    size = pagination.page_size(limit)
+    query = query.limit(size + 1)
+    rows = [dict(r._mapping) for r in (await db.execute(query)).all()]
+
+    headers = {}
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        key = (last["tag_number"], last["id"]) if order_by == "tag_number" else (last["id"],)
+        headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(*key)
+
+    if fields:
+        return JSONResponse(content=jsonable_encoder([{f: r[f] for f in selected} for r in rows]), headers=headers)
+
+    response.headers.update(headers)
+    return rows
 
-    return query.all()
+
+# ----------------------------------------------
+# 🐄 Herd counts (dashboard)
+# ----------------------------------------------
+@router.get("/counts", response_model=List[schemas.LivestockCount])
+async def get_livestock_counts(db: AsyncSession = Depends(database.get_async_db)):
+    """
+    Active animals counted per (species, category, owner, location) in one
+    GROUP BY: one row per combination in use, however big the herd. Clients
+    filter and sum these rows for their totals and charts.
+    """
+    L = models.Livestock
+    keys = (L.species_id, L.category_id, L.owner_id, L.location_id)
+    rows = await db.execute(
+        select(*keys, func.count().label("count"))
+        .where(L.availability == "active")
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    return [dict(r._mapping) for r in rows]
 
 
 # ----------------------------------------------
@@ -115,34 +188,16 @@ def get_all_livestock(
 # ----------------------------------------------
 @router.get("/sires", response_model=List[schemas.LivestockResponse])
 def get_sires(db: Session = Depends(get_db)):
-    from sqlalchemy import func
-
-    latest_movement = (
-        db.query(
-            models.LivestockMovement.livestock_id,
-            func.max(models.LivestockMovement.movement_date).label("latest_date")
-        )
-        .group_by(models.LivestockMovement.livestock_id)
-        .subquery()
-    )
-
+    # current state lives on the livestock row (see services/livestock_state)
     sires = (
         db.query(models.Livestock)
-        .join(models.Category, models.Livestock.category_id == models.Category.id)
-        .join(
-            latest_movement,
-            models.Livestock.id == latest_movement.c.livestock_id
-        )
-        .join(
-            models.LivestockMovement,
-            (models.LivestockMovement.livestock_id == models.Livestock.id)
-            & (models.LivestockMovement.movement_date == latest_movement.c.latest_date)
-        )
         .filter(
             models.Livestock.sex == "Male",
             models.Livestock.availability == "active",
-            models.Category.name.ilike("%bull%"),
-            models.LivestockMovement.movement_type == "IN"
+            models.Livestock.last_movement_type == "IN",
+            models.Livestock.category_id.in_(
+                db.query(models.Category.id).filter(models.Category.name.ilike("%bull%"))
+            ),
         )
         .all()
     )
@@ -157,13 +212,13 @@ def get_sires(db: Session = Depends(get_db)):
 def get_dams(db: Session = Depends(get_db)):
     dams = (
         db.query(models.Livestock)
-        .join(models.LivestockMovement, models.Livestock.id == models.LivestockMovement.livestock_id)
-        .join(models.Category)
         .filter(
             models.Livestock.sex == "Female",
             models.Livestock.availability == "active",
-            models.LivestockMovement.movement_type == "IN",
-            models.Category.name.in_(["Cow", "Heifer"])
+            models.Livestock.last_movement_type == "IN",
+            models.Livestock.category_id.in_(
+                db.query(models.Category.id).filter(models.Category.name.in_(["Cow", "Heifer"]))
+            ),
         )
         .all()
     )
@@ -177,9 +232,10 @@ def get_dams(db: Session = Depends(get_db)):
 def get_active_livestock_in_movements(db: Session = Depends(get_db)):
     livestock = (
         db.query(models.Livestock)
-        .join(models.LivestockMovement, models.Livestock.id == models.LivestockMovement.livestock_id)
-        .filter(models.Livestock.availability == "active")
-        .distinct()
+        .filter(
+            models.Livestock.availability == "active",
+            models.Livestock.last_movement_type.isnot(None),
+        )
         .all()
     )
 
@@ -193,94 +249,41 @@ def get_active_livestock_in_movements(db: Session = Depends(get_db)):
 # 🧩 Bulk upload livestock (CSV / Excel) with duplicate skip
 # ----------------------------------------------
 @router.post("/bulk-upload")
-def bulk_upload_livestock(file: UploadFile = File(...), db: Session = Depends(get_db)):
+def bulk_upload_livestock(
+    file: UploadFile = File(...),
+    include_accepted: bool = Query(False, description="List accepted rows in results, not just skips and errors"),
+    db: Session = Depends(get_db),
+):
+    """
+    Streamed, set-based import: the file is parsed in chunks, each chunk gets one
+    tag probe and batched inserts, and everything is committed once at the end.
+    Returns counts plus the skipped and error rows (accepted rows too with
+    include_accepted=true).
+    """
+    # pandas is only loaded by workers that actually receive an upload
+    from routers.services import livestock_import
+
     try:
-        content = file.file.read()
-        if file.filename.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content))
-        elif file.filename.endswith((".xls", ".xlsx")):
-            df = pd.read_excel(io.BytesIO(content))
-        else:
-            raise HTTPException(status_code=400, detail="Invalid file type. Upload CSV or Excel.")
-
-        required_columns = ["tag_number", "species_id", "category_id", "owner_id", "location_id", "sex", "dob", "castrated"]
-        missing = [col for col in required_columns if col not in df.columns]
-        if missing:
-            raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(missing)}")
-
-        df.dropna(how="all", inplace=True)
-        df.fillna({
-            "tag_number": "",
-            "species_id": 0,
-            "category_id": 0,
-            "owner_id": 0,
-            "location_id": 0,
-            "sex": "",
-            "castrated": False
-        }, inplace=True)
-
-        numeric_cols = ["species_id", "category_id", "owner_id", "location_id"]
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
-
-        created = 0
-        skipped = []
-
-        for _, row in df.iterrows():
-            tag = str(row["tag_number"]).strip()
-            if not tag:
-                continue
-
-            existing = db.query(models.Livestock).filter(models.Livestock.tag_number == tag).first()
-            if existing:
-                skipped.append(tag)
-                continue
-
-            dob_value = pd.to_datetime(row["dob"], errors="coerce").date() if not pd.isna(row["dob"]) else None
-
-            livestock = models.Livestock(
-                tag_number=tag,
-                species_id=int(row["species_id"]),
-                category_id=int(row["category_id"]),
-                owner_id=int(row["owner_id"]),
-                location_id=int(row["location_id"]),
-                sex=str(row["sex"]).capitalize(),
-                dob=dob_value,
-                castrated=bool(row["castrated"]),
-                availability="active",
-            )
-            db.add(livestock)
-            db.commit()
-            db.refresh(livestock)
-
-            event = models.LivestockEvent(
-                livestock_id=livestock.id,
-                event_type="registered",
-                event_date=datetime.utcnow().date(),
-                notes="Bulk registration",
+        try:
+            summary = livestock_import.import_livestock_upload(
+                db, file.file, file.filename, include_accepted=include_accepted
             )
-            db.add(event)
-            db.commit()
-
-            move = models.LivestockMovement(
-                livestock_id=livestock.id,
-                movement_type="IN",
-                source="bulk-upload",
-                destination=str(livestock.location_id),
-                movement_date=datetime.utcnow().date(),
-                notes=f"Bulk registered {livestock.tag_number}",
-            )
-            db.add(move)
-            db.commit()
-
-            created += 1
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        db.commit()
 
-        message = f"Successfully registered {created} livestock."
+        message = f"Successfully registered {summary['created']} livestock."
+        skipped = [r["tag_number"] for r in summary["results"] if r["status"] == "skipped"]
         if skipped:
-            message += f" Skipped duplicates: {', '.join(skipped)}"
+            message += f" Skipped duplicates: {', '.join(skipped[:20])}"
+            if len(skipped) > 20:
+                message += f" and {len(skipped) - 20} more"
 
-        return {"message": message}
+        return {"message": message, **summary}
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
@@ -2,16 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 import models, schemas, database
+from database import get_db
 
 router = APIRouter(prefix="/livestock-events", tags=["Livestock Events"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- Create Event ---
 @router.post("/", response_model=schemas.LivestockEventResponse)
 def create_event(event: schemas.LivestockEventCreate, db: Session = Depends(get_db)):
@@ -1,101 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 from database import get_db
-import models, schemas
+import models, schemas, pagination
 
 router = APIRouter(
     prefix="/livestock-history",
     tags=["Livestock History"]
 )
 
-@router.get("/", response_model=list[schemas.LivestockHistoryResponse])
-def get_all_livestock_history(db: Session = Depends(get_db)):
-    """
-    Return all livestock with their events, movements, and status.
-    """
-    livestock_list = (
-        db.query(models.Livestock)
-        .options(
-            joinedload(models.Livestock.events),
-            joinedload(models.Livestock.movements),
-        )
-        .all()
-    )
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
-    result = []
-    for animal in livestock_list:
-        events = sorted(animal.events, key=lambda e: e.event_date)
-        moves = sorted(animal.movements, key=lambda m: m.movement_date)
-
-        last_move = moves[-1] if moves else None
-        last_event = events[-1] if events else None
-
-        result.append({
-            "id": animal.id,
-            "tag_number": animal.tag_number,
-            "species_id": animal.species_id,
-            "category_id": animal.category_id,
-            "owner_id": animal.owner_id,
-            "availability": animal.availability,
-            "status": animal.availability,
-            "last_movement": {
-                "movement_type": last_move.movement_type if last_move else None,
-                "movement_date": last_move.movement_date if last_move else None,
-                "source": last_move.source if last_move else None,
-                "destination": last_move.destination if last_move else None,
-            } if last_move else None,
-            "last_event": {
-                "event_type": last_event.event_type if last_event else None,
-                "event_date": last_event.event_date if last_event else None,
-                "notes": last_event.notes if last_event else None,
-            } if last_event else None,
-            "events": [
-                {
-                    "event_type": ev.event_type,
-                    "event_date": ev.event_date,
-                    "notes": ev.notes,
-                }
-                for ev in events
-            ],
-            "movements": [
-                {
-                    "movement_type": mv.movement_type,
-                    "movement_date": mv.movement_date,
-                    "source": mv.source,
-                    "destination": mv.destination,
-                    "notes": mv.notes,
-                }
-                for mv in moves
-            ],
-        })
-
-    return result
 
+def _last_movement(mv):
+    return {
+        "movement_type": mv.movement_type,
+        "movement_date": mv.movement_date,
+        "source": mv.source,
+        "destination": mv.destination,
+    } if mv else None
 
-@router.get("/{tag_number}", response_model=schemas.LivestockHistoryResponse)
-def get_livestock_history_by_tag(tag_number: str, db: Session = Depends(get_db)):
-    """
-    Return full history for a specific tag number.
-    """
-    animal = (
-        db.query(models.Livestock)
-        .filter(models.Livestock.tag_number == tag_number)
-        .options(
-            joinedload(models.Livestock.events),
-            joinedload(models.Livestock.movements),
-        )
-        .first()
-    )
 
-    if not animal:
-        raise HTTPException(status_code=404, detail=f"Livestock {tag_number} not found")
+def _last_event(ev):
+    return {
+        "event_type": ev.event_type,
+        "event_date": ev.event_date,
+        "notes": ev.notes,
+    } if ev else None
+
 
+def _full_history(animal):
     events = sorted(animal.events, key=lambda e: e.event_date)
     moves = sorted(animal.movements, key=lambda m: m.movement_date)
 
-    last_move = moves[-1] if moves else None
-    last_event = events[-1] if events else None
-
     return {
         "id": animal.id,
         "tag_number": animal.tag_number,
@@ -104,17 +43,8 @@ def get_livestock_history_by_tag(tag_number: str, db: Session = Depends(get_db))
         "owner_id": animal.owner_id,
         "availability": animal.availability,
         "status": animal.availability,
-        "last_movement": {
-            "movement_type": last_move.movement_type if last_move else None,
-            "movement_date": last_move.movement_date if last_move else None,
-            "source": last_move.source if last_move else None,
-            "destination": last_move.destination if last_move else None,
-        } if last_move else None,
-        "last_event": {
-            "event_type": last_event.event_type if last_event else None,
-            "event_date": last_event.event_date if last_event else None,
-            "notes": last_event.notes if last_event else None,
-        } if last_event else None,
+        "last_movement": _last_movement(moves[-1] if moves else None),
+        "last_event": _last_event(events[-1] if events else None),
         "events": [
             {
                 "event_type": ev.event_type,
@@ -134,6 +64,107 @@ def get_livestock_history_by_tag(tag_number: str, db: Session = Depends(get_db))
             for mv in moves
         ],
     }
+
+
+@router.get("/", response_model=list[schemas.LivestockHistoryResponse])
+def get_all_livestock_history(
+    response: Response,
+    mode: Literal["full", "summary"] = Query("summary", description="full also returns every event and movement"),
+    tag: Optional[str] = Query(None, description="Tag number prefix"),
+    available: Optional[bool] = Query(None, description="Only active (true) or inactive (false) animals"),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {pagination.NEXT_CURSOR_HEADER} header"),
+    db: Session = Depends(get_db)
+):
+    """
+    Livestock with their status, last event and last movement.
+
+    By default (mode=summary) last_event / last_movement are computed in SQL
+    (DISTINCT ON per animal, restricted to the page) and events/movements are
+    left out; full timelines are loaded per tag from /livestock-history/{tag_number}.
+    mode=full also returns the timelines, loaded for the page with selectinload.
+    Paged on id, limit animals at a time (100 by default); the next cursor is sent in X-Next-Cursor.
+    """
+    L = models.Livestock
+    E = models.LivestockEvent
+    M = models.LivestockMovement
+
+    page = select(L.id)
+    if tag:
+        page = page.where(L.tag_number.ilike(f"{_escape_like(tag)}%", escape="\\"))
+    if available is True:
+        page = page.where(L.availability == "active")
+    elif available is False:
+        page = page.where(L.availability != "active")
+    if cursor:
+        (last_id,) = pagination.decode_cursor(cursor, 1, types=(int,))
+        page = page.where(L.id > last_id)
+    page = page.order_by(L.id)
+
+    size = pagination.page_size(limit)
+    page = page.limit(size + 1)
+    page = page.cte("page")
+
+    if mode == "full":
+        animals = (
+            db.query(L)
+            .join(page, page.c.id == L.id)
+            .options(selectinload(L.events), selectinload(L.movements))
+            .order_by(L.id)
+            .all()
+        )
+        if len(animals) > size:
+            animals = animals[:size]
+            response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(animals[-1].id)
+        return [_full_history(animal) for animal in animals]
+
+    last_event = (
+        select(E.livestock_id, E.event_type, E.event_date, E.notes)
+        .where(E.livestock_id.in_(select(page.c.id)))
+        .distinct(E.livestock_id)
+        .order_by(E.livestock_id, E.event_date.desc(), E.id.desc())
+        .subquery("last_event")
+    )
+    last_move = (
+        select(M.livestock_id, M.movement_type, M.movement_date, M.source, M.destination)
+        .where(M.livestock_id.in_(select(page.c.id)))
+        .distinct(M.livestock_id)
+        .order_by(M.livestock_id, M.movement_date.desc(), M.id.desc())
+        .subquery("last_move")
+    )
+
+    rows = (
+        db.query(
+            L.id, L.tag_number, L.species_id, L.category_id, L.owner_id, L.availability,
+            last_event.c.event_type, last_event.c.event_date, last_event.c.notes,
+            last_move.c.movement_type, last_move.c.movement_date, last_move.c.source, last_move.c.destination,
+        )
+        .join(page, page.c.id == L.id)
+        .outerjoin(last_event, last_event.c.livestock_id == L.id)
+        .outerjoin(last_move, last_move.c.livestock_id == L.id)
+        .order_by(L.id)
+        .all()
+    )
+    if len(rows) > size:
+        rows = rows[:size]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(rows[-1].id)
+
+    return [
+        {
+            "id": r.id,
+            "tag_number": r.tag_number,
+            "species_id": r.species_id,
+            "category_id": r.category_id,
+            "owner_id": r.owner_id,
+            "availability": r.availability,
+            "status": r.availability,
+            "last_movement": _last_movement(r) if r.movement_type else None,
+            "last_event": _last_event(r) if r.event_type else None,
+        }
+        for r in rows
+    ]
+
+
 @router.get("/summary")
 def livestock_summary(db: Session = Depends(get_db)):
     """
@@ -182,3 +213,24 @@ def livestock_summary(db: Session = Depends(get_db)):
         "categories": categories,
         "owners": owners,
     }
+
+
+@router.get("/{tag_number}", response_model=schemas.LivestockHistoryResponse)
+def get_livestock_history_by_tag(tag_number: str, db: Session = Depends(get_db)):
+    """
+    Return full history for a specific tag number.
+    """
+    animal = (
+        db.query(models.Livestock)
+        .filter(models.Livestock.tag_number == tag_number)
+        .options(
+            selectinload(models.Livestock.events),
+            selectinload(models.Livestock.movements),
+        )
+        .first()
+    )
+
+    if not animal:
+        raise HTTPException(status_code=404, detail=f"Livestock {tag_number} not found")
+
+    return _full_history(animal)
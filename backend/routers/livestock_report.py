@@ -1,126 +1,138 @@
-# backend/reports/livestock_report.py
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from weasyprint import HTML
-import io
-import base64
+# backend/routers/livestock_report.py
+import asyncio
 import datetime
-import os
 
-from database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+import database
 import models
+from routers.services import report_render
 
 router = APIRouter(
     prefix="/reports",
     tags=["Reports"]
 )
 
-# adjust this path if your templates live elsewhere
-BASE_DIR = os.path.dirname(__file__)
-TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
-
-env = Environment(
-    loader=FileSystemLoader(TEMPLATES_DIR),
-    autoescape=select_autoescape(["html", "xml"])
-)
+PDF_HEADERS = {"Content-Disposition": "attachment; filename=livestock_report.pdf"}
 
 
-def build_livestock_payload(db: Session):
+async def build_livestock_payload(db: AsyncSession):
     """
-    Query DB for livestock and their relationships (species, owner, category).
-    Adapt the attribute names if your relationships use different property names.
+    Rows for the report table: one flat query with species, owner and category
+    names joined in. Events and movements aren't rendered, so aren't loaded.
     """
-    q = (
-        db.query(models.Livestock)
-        .options(
-            joinedload(models.Livestock.species),   # -> models.Species
-            joinedload(models.Livestock.owner),     # -> models.Owner
-            joinedload(models.Livestock.category),  # -> models.Category
-            joinedload(models.Livestock.events),
-            joinedload(models.Livestock.movements),
+    L = models.Livestock
+    rows = await db.execute(
+        select(
+            L.id, L.tag_number, L.sex, L.dob, L.availability,
+            models.Species.name.label("species"),
+            models.Category.name.label("category"),
+            models.Owner.name.label("owner"),
         )
-        .order_by(models.Livestock.tag_number)
+        .outerjoin(models.Species, models.Species.id == L.species_id)
+        .outerjoin(models.Category, models.Category.id == L.category_id)
+        .outerjoin(models.Owner, models.Owner.id == L.owner_id)
+        .order_by(L.tag_number, L.id)
     )
+    return [
+        {
+            "id": r.id,
+            "tag_number": r.tag_number or "",
+            "species": r.species or "",
+            "sex": r.sex or "",
+            "category": r.category or "",
+            "dob": r.dob.isoformat() if r.dob else "",
+            "owner": r.owner or "",
+            "status": r.availability or "",
+            "notes": "",  # Livestock has no notes column; the template prints "-"
+        }
+        for r in rows
+    ]
+
+
+async def report_version(db: AsyncSession):
+    """
+    What the report depends on, without reading the herd: livestock count and
+    latest updated_at (index lookups), the small species/category/owner name
+    tables, the farm name and the date. Its cache_key names the PDF.
+    """
+    L = models.Livestock
+    count, last_change = (await db.execute(select(func.count(L.id), func.max(L.updated_at)))).one()
+    lookups = {}
+    for name, model in (("species", models.Species), ("categories", models.Category), ("owners", models.Owner)):
+        rows = await db.execute(select(model.id, model.name).order_by(model.id))
+        lookups[name] = [list(r) for r in rows]
+    farm_name = (await db.execute(select(models.Farm.name).order_by(models.Farm.id).limit(1))).scalar()
+    return {
+        "livestock": [count, last_change],
+        **lookups,
+        "farm": farm_name,
+        "date": datetime.date.today().isoformat(),
+    }
+
+
+async def build_report_context(db: AsyncSession):
+    farm_name = (await db.execute(select(models.Farm.name).order_by(models.Farm.id).limit(1))).scalar()
+    return {
+        "farm": {"name": farm_name or "Farm"},
+        "livestock": await build_livestock_payload(db),
+        "date": datetime.date.today().isoformat(),
+    }
 
-    payload = []
-    for a in q.all():
-        payload.append({
-            "id": a.id,
-            "tag_number": a.tag_number or "",
-            "species": getattr(a.species, "name", "") if getattr(a, "species", None) else "",
-            "sex": a.sex or "",
-            "category": getattr(a.category, "name", "") if getattr(a, "category", None) else "",
-            "dob": a.dob.isoformat() if getattr(a, "dob", None) else "",
-            "owner": getattr(a.owner, "name", "") if getattr(a, "owner", None) else "",
-            "status": a.availability or "",
-            "notes": a.notes or "",
-            # optionally include events/movements if you want them in the report:
-            "events": [
-                {
-                    "event_type": ev.event_type,
-                    "event_date": ev.event_date.isoformat() if ev.event_date else None,
-                    "notes": ev.notes,
-                }
-                for ev in sorted(a.events, key=lambda e: e.event_date or datetime.date.min)
-            ],
-            "movements": [
-                {
-                    "movement_type": mv.movement_type,
-                    "movement_date": mv.movement_date.isoformat() if mv.movement_date else None,
-                    "source": mv.source,
-                    "destination": mv.destination,
-                    "notes": mv.notes,
-                }
-                for mv in sorted(a.movements, key=lambda m: m.movement_date or datetime.date.min)
-            ],
-        })
-    return payload
+
+def _pdf_response(path: str, background=None):
+    return FileResponse(path, media_type="application/pdf", headers=PDF_HEADERS, background=background)
 
 
 @router.get("/livestock", summary="Download livestock report (PDF)")
-def livestock_report(db: Session = Depends(get_db)):
+async def livestock_report(db: AsyncSession = Depends(database.get_async_db)):
     """
-    Returns a generated A4 PDF (WeasyPrint) listing livestock.
-    Uses templates/livestock_report.html in backend/templates/.
+    Returns an A4 PDF (WeasyPrint) listing livestock, from templates/livestock_report.html.
+    Served from the report cache when the herd is unchanged; otherwise rendered
+    in the process pool while this request waits without holding a thread, and
+    the cache is trimmed once the PDF has been sent.
     """
-    # load template
-    template_name = "livestock_report.html"
+    key = report_render.cache_key(await report_version(db))
+    path = report_render.cached(key)
+    if path:
+        return _pdf_response(path)
+    context = await build_report_context(db)
     try:
-        template = env.get_template(template_name)
+        path = await asyncio.wrap_future(report_render.submit(key, context))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Template load error: {e}")
-
-    # query DB and assemble payload
-    livestock = build_livestock_payload(db)
-
-    # fetch farm info if you have a Farm model; else fallback
-    farm = {"name": "Farm"}  # replace with a DB fetch if available
-
-    # Embed logo as base64 so it works inside Docker
-    logo_rel = os.path.join(BASE_DIR, "static", "logo.png")
-    logo_data_uri = ""
-    if os.path.exists(logo_rel):
-        with open(logo_rel, "rb") as f:
-            logo_b64 = base64.b64encode(f.read()).decode("ascii")
-        logo_data_uri = f"data:image/png;base64,{logo_b64}"
-
-    html = template.render(
-        farm=farm,
-        livestock=livestock,
-        date=datetime.date.today().isoformat(),
-        logo_path=logo_data_uri
-    )
+        raise HTTPException(status_code=500, detail=f"Report rendering failed: {e}")
+    return _pdf_response(path, background=BackgroundTask(report_render.evict))
+
+
+@router.post("/livestock/jobs", status_code=202, summary="Queue the livestock PDF")
+async def queue_livestock_report(background_tasks: BackgroundTasks, db: AsyncSession = Depends(database.get_async_db)):
+    """Start rendering (or reuse the cached PDF) and return a job id to poll."""
+    key = report_render.cache_key(await report_version(db))
+    if not report_render.cached(key):
+        report_render.submit(key, await build_report_context(db))
+        background_tasks.add_task(report_render.evict)
+    return report_render.status(key)
+
+
+@router.get("/livestock/jobs/{job_id}")
+def livestock_report_status(job_id: str):
+    return report_render.status(job_id)
 
-    # Convert HTML to PDF bytes
-    try:
-        pdf_bytes = HTML(string=html).write_pdf()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"WeasyPrint error: {e}")
 
-    # Stream the PDF back
-    return StreamingResponse(io.BytesIO(pdf_bytes),
-                            media_type="application/pdf",
-                            headers={"Content-Disposition": "attachment; filename=livestock_report.pdf"})
+@router.get("/livestock/jobs/{job_id}/pdf", summary="Download a rendered livestock PDF")
+def livestock_report_download(job_id: str):
+    if len(job_id) != 64 or any(c not in "0123456789abcdef" for c in job_id):
+        raise HTTPException(status_code=404, detail="Report not found")
+    path = report_render.cached(job_id)
+    if path:
+        return _pdf_response(path)
+    job = report_render.status(job_id)
+    if job["status"] == "running":
+        raise HTTPException(status_code=409, detail="Report is still rendering")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Report rendering failed: {job['error']}")
+    raise HTTPException(status_code=404, detail="Report not found")
@@ -5,20 +5,13 @@ from sqlalchemy.orm import Session
 from typing import List
 
 import models, schemas, database
+from database import get_db
 
 router = APIRouter(
     prefix="/purchases",
     tags=["Purchases"]
 )
 
-# Dependency to get DB session
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.post("/", response_model=schemas.PurchaseResponse)
 def create_purchase(purchase: schemas.PurchaseCreate, db: Session = Depends(get_db)):
@@ -3,20 +3,13 @@ from sqlalchemy.orm import Session
 from typing import List
 
 import models, schemas, database
+from database import get_db
 
 router = APIRouter(
     prefix="/owners",
     tags=["Owners"]
 )
 
-# --- DB dependency ---
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- Create Owner ---
 @router.post("/", response_model=schemas.OwnerResponse)
 def create_owner(owner: schemas.OwnerCreate, db: Session = Depends(get_db)):
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from collections import defaultdict
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-import models, schemas, database
+import models, schemas, database, pagination
 
 router = APIRouter(prefix="/purchases", tags=["Purchases"])
 
@@ -110,17 +113,61 @@ def create_purchase(purchase: schemas.PurchaseCreate, db: Session = Depends(data
 # READ (all purchases)
 # ------------------------
 @router.get("/", response_model=List[schemas.PurchaseResponse])
-def get_purchases(db: Session = Depends(database.get_db)):
-    purchases = db.query(models.Purchase).all()
-    responses = []
-
-    for purchase in purchases:
-        # --- Purchase Items ---
-        items = db.query(models.PurchaseItem).filter(
-            models.PurchaseItem.purchase_id == purchase.id
-        ).all()
-        items_responses = [
-            {
+def get_purchases(
+    response: Response,
+    vendor_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None, description="Only purchases on or after this date"),
+    date_to: Optional[date] = Query(None, description="Only purchases on or before this date"),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of the previous page's {pagination.NEXT_CURSOR_HEADER} header"),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Purchases, newest first. A page costs three queries whatever its size: the
+    purchases, their items (IN over the page's ids) and the events of the
+    page's animals (IN over their ids), each event listed once per purchase
+    however many of its items name the animal. Paged on (purchase_date, id), limit purchases at a time
+    (100 by default); the next cursor is sent in X-Next-Cursor.
+    """
+    P = models.Purchase
+
+    query = db.query(P)
+    if vendor_id is not None:
+        query = query.filter(P.vendor_id == vendor_id)
+    if date_from:
+        query = query.filter(P.purchase_date >= date_from)
+    if date_to:
+        query = query.filter(P.purchase_date <= date_to)
+    if cursor:
+        last_date, last_id = pagination.decode_cursor(cursor, 2, types=(date.fromisoformat, int))
+        query = query.filter(tuple_(P.purchase_date, P.id) < tuple_(last_date, last_id))
+    query = query.order_by(P.purchase_date.desc(), P.id.desc())
+
+    size = pagination.page_size(limit)
+    query = query.limit(size + 1)
+    purchases = query.all()
+
+    if len(purchases) > size:
+        purchases = purchases[:size]
+        last = purchases[-1]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_cursor(last.purchase_date, last.id)
+
+    page_ids = [p.id for p in purchases]
+    items_by_purchase = defaultdict(list)
+    purchases_by_animal = defaultdict(list)
+    events_by_purchase = defaultdict(list)
+    if page_ids:
+        # --- Purchase Items (one query for the page) ---
+        items = (
+            db.query(models.PurchaseItem)
+            .filter(models.PurchaseItem.purchase_id.in_(page_ids))
+            .order_by(models.PurchaseItem.id)
+            .all()
+        )
+        for item in items:
+            if item.livestock_id is not None and item.purchase_id not in purchases_by_animal[item.livestock_id]:
+                purchases_by_animal[item.livestock_id].append(item.purchase_id)
+            items_by_purchase[item.purchase_id].append({
                 "id": item.id,
                 "purchase_id": item.purchase_id,
                 "livestock_id": item.livestock_id,
@@ -134,19 +181,18 @@ def get_purchases(db: Session = Depends(database.get_db)):
                 "price": item.price,
                 "notes": item.notes,
                 "created_at": item.created_at,
-            }
-            for item in items
-        ]
-
-        # --- Livestock Events ---
-        livestock_ids = [item.livestock_id for item in items if item.livestock_id]
-        events_responses = []
-        if livestock_ids:
-            events = db.query(models.LivestockEvent).filter(
-                models.LivestockEvent.livestock_id.in_(livestock_ids)
-            ).all()
-            events_responses = [
-                {
+            })
+
+        # --- Livestock Events of the purchased animals (one query for the page) ---
+        events = (
+            db.query(models.LivestockEvent)
+            .filter(models.LivestockEvent.livestock_id.in_(list(purchases_by_animal)))
+            .order_by(models.LivestockEvent.id)
+            .all()
+        ) if purchases_by_animal else []
+        for ev in events:
+            for purchase_id in purchases_by_animal[ev.livestock_id]:
+                events_by_purchase[purchase_id].append({
                     "id": ev.id,
                     "livestock_id": ev.livestock_id,
                     "event_type": ev.event_type,
@@ -154,25 +200,21 @@ def get_purchases(db: Session = Depends(database.get_db)):
                     "purchase_id": ev.purchase_id,
                     "notes": ev.notes,
                     "created_at": ev.created_at,
-                }
-                for ev in events
-            ]
-
-        # --- Build Response ---
-        responses.append(
-            schemas.PurchaseResponse(
-                id=purchase.id,
-                reference=purchase.reference,
-                vendor_id=str(purchase.vendor_id),  # 🔑 cast to str
-                purchase_date=purchase.purchase_date,
-                total_cost=purchase.total_cost,
-                notes=purchase.notes,
-                items=items_responses,
-                events=events_responses,
-            )
-        )
+                })
 
-    return responses
+    return [
+        schemas.PurchaseResponse(
+            id=purchase.id,
+            reference=purchase.reference,
+            vendor_id=str(purchase.vendor_id),  # 🔑 cast to str
+            purchase_date=purchase.purchase_date,
+            total_cost=purchase.total_cost,
+            notes=purchase.notes,
+            items=items_by_purchase[purchase.id],
+            events=events_by_purchase[purchase.id],
+        )
+        for purchase in purchases
+    ]
 
 
 # ------------------------
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date
+from decimal import Decimal
 from database import get_db
 import models, schemas
+from routers.services import purchase_order_state
 
 router = APIRouter(prefix="/purchase-orders", tags=["purchase-orders"])
 
@@ -59,6 +62,74 @@ def get_all_orders(db: Session = Depends(get_db)):
     return orders
 
 
+# orders whose outstanding lines are still expected; drafts aren't placed yet
+OPEN_STATUSES = (models.PurchaseOrderStatus.ordered, models.PurchaseOrderStatus.partial)
+
+
+def _open_lines(item_id: Optional[int] = None, vendor_id: Optional[int] = None):
+    """PO lines still to be received; the predicate matches ix_purchase_order_items_open."""
+    POI, PO = models.PurchaseOrderItem, models.PurchaseOrder
+    stmt = (
+        select(
+            POI.id, POI.order_id, POI.item_id, POI.quantity, POI.quantity_received,
+            PO.vendor_id, PO.status, PO.expected_delivery_date,
+        )
+        .join(PO, PO.id == POI.order_id)
+        .where(POI.quantity_received < POI.quantity, PO.status.in_(OPEN_STATUSES))
+    )
+    if item_id is not None:
+        stmt = stmt.where(POI.item_id == item_id)
+    if vendor_id is not None:
+        stmt = stmt.where(PO.vendor_id == vendor_id)
+    return stmt
+
+
+# 📦 Open LPO lines (expected inbound, line by line)
+@router.get("/open-lines", response_model=List[schemas.OpenPurchaseOrderLine])
+def get_open_lines(item_id: Optional[int] = None, vendor_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Lines of ordered/partial LPOs not yet fully received, soonest expected first."""
+    lines = _open_lines(item_id, vendor_id).subquery()
+    rows = db.execute(
+        select(
+            lines.c.order_id,
+            lines.c.id.label("line_id"),
+            lines.c.vendor_id,
+            models.Vendor.name.label("vendor_name"),
+            lines.c.status,
+            lines.c.expected_delivery_date,
+            lines.c.item_id,
+            models.InventoryItem.name.label("item_name"),
+            lines.c.quantity,
+            lines.c.quantity_received,
+            (lines.c.quantity - lines.c.quantity_received).label("outstanding"),
+        )
+        .join(models.InventoryItem, models.InventoryItem.id == lines.c.item_id)
+        .outerjoin(models.Vendor, models.Vendor.id == lines.c.vendor_id)
+        .order_by(lines.c.expected_delivery_date.asc().nulls_last(), lines.c.order_id, lines.c.id)
+    ).mappings()
+    return [{**row, "status": row["status"].value} for row in rows]
+
+
+# 📦 Inbound stock per item
+@router.get("/inbound", response_model=List[schemas.InboundStock])
+def get_inbound_stock(item_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Outstanding quantity per item over all open LPO lines."""
+    lines = _open_lines(item_id).subquery()
+    rows = db.execute(
+        select(
+            lines.c.item_id,
+            models.InventoryItem.name.label("item_name"),
+            func.sum(lines.c.quantity - lines.c.quantity_received).label("outstanding"),
+            func.count(func.distinct(lines.c.order_id)).label("open_orders"),
+            func.min(lines.c.expected_delivery_date).label("next_expected_date"),
+        )
+        .join(models.InventoryItem, models.InventoryItem.id == lines.c.item_id)
+        .group_by(lines.c.item_id, models.InventoryItem.name)
+        .order_by(lines.c.item_id)
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
 # 🔍 3️⃣ Get one LPO by ID
 @router.get("/{order_id}", response_model=schemas.PurchaseOrderResponse)
 def get_order(order_id: int, db: Session = Depends(get_db)):
@@ -72,17 +143,33 @@ def get_order(order_id: int, db: Session = Depends(get_db)):
 # ✏️ 4️⃣ Update LPO (details + items)
 @router.put("/{order_id}", response_model=schemas.PurchaseOrderResponse)
 def update_order(order_id: int, update_data: schemas.PurchaseOrderCreate, db: Session = Depends(get_db)):
-    """Update an existing purchase order (including replacing items)."""
-    order = db.query(models.PurchaseOrder).filter(models.PurchaseOrder.id == order_id).first()
+    """
+    Update an existing purchase order (including replacing items). The order
+    is locked like a receipt locks it. Changed items can't be saved once
+    anything has been received against the order (409): replacing the lines
+    would zero quantity_received and reopen goods already in stock; the same
+    items sent back unchanged are fine. partial/received are then re-derived
+    from the lines.
+    """
+    order = purchase_order_state.lock_order(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
+    current = [(line.item_id, line.quantity, Decimal(line.unit_price)) for line in sorted(order.items, key=lambda l: l.id)]
+    replace_items = bool(update_data.items) and current != [
+        (item.item_id, item.quantity, Decimal(item.unit_price)) for item in update_data.items
+    ]
+    if replace_items and any(line.quantity_received for line in order.items):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Order {order_id} has received goods; its items can no longer be changed",
+        )
 
     # ✅ Update main fields
     for key, value in update_data.dict(exclude={"items"}, exclude_unset=True).items():
         setattr(order, key, value)
 
-    # ✅ Replace all items if new ones provided
-    if update_data.items:
+    # ✅ Replace all items if they changed
+    if replace_items:
         db.query(models.PurchaseOrderItem).filter(models.PurchaseOrderItem.order_id == order.id).delete()
         total = 0
         for item in update_data.items:
@@ -97,6 +184,9 @@ def update_order(order_id: int, update_data: schemas.PurchaseOrderCreate, db: Se
             ))
         order.total_amount = total
 
+    db.flush()
+    db.refresh(order)
+    purchase_order_state.roll_up_status(order, [(line.quantity, line.quantity_received) for line in order.items])
     db.commit()
     db.refresh(order)
     return order
@@ -1,49 +1,45 @@
 from fastapi import APIRouter, Depends,HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 import models, database
-from datetime import datetime
+from datetime import date, datetime, time, timedelta, timezone
 from typing import List, Optional
+from database import get_db
+from routers.services import stock_ledger
 
 
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 # ================================
 # Existing endpoints
 # ================================
+# Read-only reports run as `async def` on AsyncSession so waiting on Postgres
+# doesn't hold a threadpool slot.
 @router.get("/inventory")
-def inventory_report(db: Session = Depends(get_db)):
-    total = db.query(func.count(models.Livestock.id)).scalar()
+async def inventory_report(db: AsyncSession = Depends(database.get_async_db)):
+    total = (await db.execute(select(func.count(models.Livestock.id)))).scalar()
 
-    species_data = (
-        db.query(
+    species_data = await db.execute(
+        select(
             models.Species.id.label("species_id"),
             models.Species.name.label("species_name"),
             func.count(models.Livestock.id).label("count"),
         )
         .join(models.Livestock, models.Livestock.species_id == models.Species.id)
         .group_by(models.Species.id, models.Species.name)
-        .all()
     )
 
-    owner_data = (
-        db.query(
+    owner_data = await db.execute(
+        select(
             models.Owner.id.label("owner_id"),
             models.Owner.name.label("owner_name"),
             func.count(models.Livestock.id).label("count"),
         )
         .join(models.Livestock, models.Livestock.owner_id == models.Owner.id)
         .group_by(models.Owner.id, models.Owner.name)
-        .all()
     )
 
     return {
@@ -54,13 +50,13 @@ def inventory_report(db: Session = Depends(get_db)):
 
 
 @router.get("/health-events-summary")
-def health_events_summary(
-    date_from: str = Query(None),
-    date_to: str = Query(None),
-    db: Session = Depends(get_db),
+async def health_events_summary(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     q = (
-        db.query(
+        select(
             models.HealthEventType.id.label("event_type_id"),
             models.HealthEventType.name.label("event_type_name"),
             func.count(models.HealthEvent.id).label("count"),
@@ -72,47 +68,47 @@ def health_events_summary(
     )
 
     if date_from:
-        q = q.filter(models.HealthEvent.date >= date_from)
+        q = q.where(models.HealthEvent.date >= date_from)
     if date_to:
-        q = q.filter(models.HealthEvent.date <= date_to)
+        q = q.where(models.HealthEvent.date <= date_to)
 
-    q = q.group_by(models.HealthEventType.id, models.HealthEventType.name).all()
-    return [dict(row._mapping) for row in q]
+    q = q.group_by(models.HealthEventType.id, models.HealthEventType.name)
+    return [dict(row._mapping) for row in await db.execute(q)]
 
 
 @router.get("/disease-incidence")
-def disease_incidence(
-    date_from: str = Query(None),
-    date_to: str = Query(None),
-    db: Session = Depends(get_db),
+async def disease_incidence(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     q = (
-        db.query(
+        select(
             models.Disease.id.label("disease_id"),
             models.Disease.name.label("disease_name"),
             func.count(models.HealthEvent.id).label("count"),
         )
         .join(models.HealthEvent, models.HealthEvent.disease_id == models.Disease.id)
-        .filter(models.HealthEvent.disease_id.isnot(None))
+        .where(models.HealthEvent.disease_id.isnot(None))
     )
 
     if date_from:
-        q = q.filter(models.HealthEvent.date >= date_from)
+        q = q.where(models.HealthEvent.date >= date_from)
     if date_to:
-        q = q.filter(models.HealthEvent.date <= date_to)
+        q = q.where(models.HealthEvent.date <= date_to)
 
-    q = q.group_by(models.Disease.id, models.Disease.name).all()
-    return [dict(row._mapping) for row in q]
+    q = q.group_by(models.Disease.id, models.Disease.name)
+    return [dict(row._mapping) for row in await db.execute(q)]
 
 
 # ================================
 # New: Health report endpoints
 # ================================
 @router.get("/health-report")
-def health_report(
-    date_from: str = Query(None),
-    date_to: str = Query(None),
-    db: Session = Depends(get_db),
+async def health_report(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """
     Returns:
@@ -120,7 +116,7 @@ def health_report(
       - sick_animals: list of livestock with disease info
     """
     q = (
-        db.query(
+        select(
             models.Livestock.id.label("livestock_id"),
             models.Livestock.tag_number.label("tag_number"),
             models.Species.name.label("species"),
@@ -136,120 +132,44 @@ def health_report(
     )
 
     if date_from:
-        q = q.filter(models.HealthEvent.date >= date_from)
+        q = q.where(models.HealthEvent.date >= date_from)
     if date_to:
-        q = q.filter(models.HealthEvent.date <= date_to)
+        q = q.where(models.HealthEvent.date <= date_to)
 
-    sick_animals = [dict(row._mapping) for row in q.all()]
+    sick_animals = [dict(row._mapping) for row in await db.execute(q)]
     return {
         "total_sick": len(sick_animals),
         "sick_animals": sick_animals,
     }
 
 
-@router.get("/health-report")
-def health_report(
-    date_from: str = Query(None),
-    date_to: str = Query(None),
-    db: Session = Depends(get_db),
-):
-    """
-    Returns:
-      - total_sick: number of animals with health events
-      - sick_animals: list of livestock with disease info (if available)
-    """
-    q = (
-        db.query(
-            models.Livestock.id.label("livestock_id"),
-            models.Livestock.tag_number.label("tag_number"),
-            models.Species.name.label("species"),
-            models.Owner.name.label("owner"),
-            models.Disease.name.label("disease"),
-            models.HealthEvent.date.label("event_date"),
-            models.HealthEvent.notes.label("notes"),
-        )
-        .join(models.HealthEvent, models.HealthEvent.livestock_id == models.Livestock.id)
-        .outerjoin(models.Disease, models.HealthEvent.disease_id == models.Disease.id)  # 👈 outer join, disease optional
-        .join(models.Species, models.Livestock.species_id == models.Species.id)
-        .join(models.Owner, models.Livestock.owner_id == models.Owner.id)
-    )
-
-    if date_from:
-        q = q.filter(models.HealthEvent.date >= date_from)
-    if date_to:
-        q = q.filter(models.HealthEvent.date <= date_to)
-
-    animals = [dict(row._mapping) for row in q.all()]
-
-    return {
-        "total_sick": len(animals),
-        "sick_animals": animals,
-    }
-@router.get("/health-report")
-def health_report(
-    date_from: str = Query(None),
-    date_to: str = Query(None),
-    db: Session = Depends(get_db),
-):
-    """
-    Returns:
-      - total_sick: number of animals with health events
-      - sick_animals: list of livestock with disease info (if available)
-    """
-    q = (
-        db.query(
-            models.Livestock.id.label("livestock_id"),
-            models.Livestock.tag_number.label("tag_number"),
-            models.Species.name.label("species"),
-            models.Owner.name.label("owner"),
-            models.Disease.name.label("disease"),
-            models.HealthEvent.date.label("event_date"),
-            models.HealthEvent.notes.label("notes"),
-        )
-        .join(models.HealthEvent, models.HealthEvent.livestock_id == models.Livestock.id)
-        .outerjoin(models.Disease, models.HealthEvent.disease_id == models.Disease.id)  # 👈 outer join, disease optional
-        .join(models.Species, models.Livestock.species_id == models.Species.id)
-        .join(models.Owner, models.Livestock.owner_id == models.Owner.id)
-    )
-
-    if date_from:
-        q = q.filter(models.HealthEvent.date >= date_from)
-    if date_to:
-        q = q.filter(models.HealthEvent.date <= date_to)
-
-    animals = [dict(row._mapping) for row in q.all()]
-
-    return {
-        "total_sick": len(animals),
-        "sick_animals": animals,
-    }
-
 @router.get("/stock-balance")
-def stock_balance_report(
+async def stock_balance_report(
     store_id: int = None,
     item_id: int = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     try:
         query = (
-            db.query(
+            select(
                 models.InventoryItem.id.label("item_id"),
                 models.InventoryItem.name.label("item_name"),
                 models.Store.id.label("store_id"),
                 models.Store.name.label("store_name"),
-                models.StoreInventory.quantity.label("quantity_on_hand"),
-                models.StoreInventory.avg_cost.label("avg_cost"),
+                models.StockOnHand.quantity.label("quantity_on_hand"),
+                models.StockOnHand.avg_cost.label("avg_cost"),
             )
-            .join(models.StoreInventory, models.InventoryItem.id == models.StoreInventory.item_id)
-            .join(models.Store, models.Store.id == models.StoreInventory.store_id)
+            .join(models.StockOnHand, models.InventoryItem.id == models.StockOnHand.item_id)
+            .join(models.Store, models.Store.id == models.StockOnHand.location_id)
+            .where(models.StockOnHand.item_type == "inventory_item")
         )
 
         if store_id:
-            query = query.filter(models.StoreInventory.store_id == store_id)
+            query = query.where(models.StockOnHand.location_id == store_id)
         if item_id:
-            query = query.filter(models.StoreInventory.item_id == item_id)
+            query = query.where(models.StockOnHand.item_id == item_id)
 
-        rows = query.all()
+        rows = (await db.execute(query)).all()
 
         return [
             {
@@ -266,17 +186,51 @@ def stock_balance_report(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching stock balance: {str(e)}")
 
+
+@router.get("/stock-balance/as-of")
+async def stock_balance_as_of(
+    at: Optional[datetime] = Query(None, description="Balances after every movement up to this timestamp (UTC if naive)"),
+    on: Optional[date] = Query(None, description="Balances at the close of this day (UTC), e.g. a month end"),
+    store_id: int = None,
+    item_id: int = None,
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    Quantity and value per store and item at a point in time, from the
+    nearest earlier ledger checkpoint plus the movements after it.
+    """
+    if (at is None) == (on is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of 'at' or 'on'")
+    if on is not None:
+        at = datetime.combine(on, time.max)
+    elif at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    rows = (await db.execute(stock_ledger.stock_as_of(at, store_id, item_id))).all()
+    return [
+        {
+            "item_id": r.item_id,
+            "item_name": r.item_name,
+            "store_id": r.store_id,
+            "store_name": r.store_name,
+            "quantity_on_hand": float(r.quantity),
+            "avg_cost": float(r.value / r.quantity) if r.quantity else 0.0,
+            "total_value": float(r.value),
+        }
+        for r in rows
+    ]
+
 @router.get("/stock-movements")
-def stock_movements_report(
+async def stock_movements_report(
     location_id: int = None,  # store/boma
     item_id: int = None,
-    date_from: str = None,
-    date_to: str = None,
-    db: Session = Depends(get_db)
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(database.get_async_db)
 ):
     try:
         query = (
-            db.query(
+            select(
                 models.InventoryMovement.id,
                 models.InventoryMovement.item_id,
                 models.InventoryItem.name.label("item_name"),
@@ -291,13 +245,17 @@ def stock_movements_report(
         )
 
         if location_id:
-            query = query.filter(models.InventoryMovement.location_id == location_id)
+            query = query.where(models.InventoryMovement.location_id == location_id)
         if item_id:
-            query = query.filter(models.InventoryMovement.item_id == item_id)
+            query = query.where(models.InventoryMovement.item_id == item_id)
         if date_from and date_to:
-            query = query.filter(models.InventoryMovement.created_at.between(date_from, date_to))
+            # created_at is a timestamp; include the whole of date_to
+            query = query.where(
+                models.InventoryMovement.created_at >= date_from,
+                models.InventoryMovement.created_at < date_to + timedelta(days=1),
+            )
 
-        movements = query.order_by(models.InventoryMovement.created_at.desc()).all()
+        movements = (await db.execute(query.order_by(models.InventoryMovement.created_at.desc()))).all()
 
         return [
             {
@@ -0,0 +1,140 @@
+# services/exports.py
+"""
+Streaming table exports (CSV, NDJSON, Parquet).
+
+Rows come off a server-side cursor in partitions of EXPORT_BATCH_SIZE
+(yield_per), and each partition is encoded and handed to the response before
+the next one is fetched, so memory stays flat and the first bytes go out
+before the whole table has been read.
+
+Each stream opens its own read session: the request's session is closed
+before a StreamingResponse body has finished.
+"""
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import Iterator
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, Select
+from sqlalchemy.types import TypeEngine
+
+import database
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _partitions(stmt: Select):
+    with database.ReadSessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            yield rows
+
+
+def _json_default(value):
+    # dates as ISO strings, Decimals as strings so no precision is lost
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+# ---- Encoders ----
+def stream_csv(stmt: Select) -> Iterator[bytes]:
+    columns = list(stmt.selected_columns.keys())
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield buf.getvalue().encode()  # header before the query runs
+
+    for rows in _partitions(stmt):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+
+
+def stream_ndjson(stmt: Select) -> Iterator[bytes]:
+    columns = list(stmt.selected_columns.keys())
+    for rows in _partitions(stmt):
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows
+        ).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(pa, type_: TypeEngine):
+    if isinstance(type_, Boolean):
+        return pa.bool_()
+    if isinstance(type_, Integer):
+        return pa.int64()
+    if isinstance(type_, Numeric) and type_.asdecimal and type_.precision is not None:
+        return pa.decimal128(type_.precision, type_.scale or 0)
+    if isinstance(type_, Numeric):
+        return pa.float64()
+    if isinstance(type_, DateTime):
+        return pa.timestamp("us")
+    if isinstance(type_, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def stream_parquet(stmt: Select) -> Iterator[bytes]:
+    """One row group per partition; the schema comes from the column types."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c.key, _arrow_type(pa, c.type)) for c in stmt.selected_columns])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for rows in _partitions(stmt):
+            columns = list(zip(*rows))
+            writer.write_batch(pa.record_batch([
+                pa.array(values, type=field.type) for values, field in zip(columns, schema)
+            ], schema=schema))
+            yield sink.drain()
+    yield sink.drain()  # footer
+
+
+ENCODERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,305 @@
+# services/import_jobs.py
+"""
+Background CSV/Excel imports, run in a thread pool inside each API process.
+
+Every job records the process that owns it (WORKER_ID) and a heartbeat_at
+that the owner refreshes every HEARTBEAT_INTERVAL while the job is queued or
+running. A job whose heartbeat is older than STALE_AFTER lost its process
+(restart, crash, OOM kill); any live worker's sweep marks it failed and
+deletes its spooled upload. Jobs of live siblings keep beating and are left
+alone, however the workers are started or restarted.
+"""
+import csv
+import importlib
+import io
+import logging
+import os
+import re
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+JOB_DIR = os.getenv("IMPORT_JOB_DIR", os.path.join(tempfile.gettempdir(), "farm-import-jobs"))
+JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+HEARTBEAT_INTERVAL = int(os.getenv("IMPORT_JOB_HEARTBEAT", "30"))  # seconds
+STALE_AFTER = 4 * HEARTBEAT_INTERVAL  # no heartbeat for this long: the owner is gone
+
+LIVE_STATUSES = ("queued", "running")
+
+# owner stamp for this process's jobs; the uuid tells a restarted pid apart
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+logger = logging.getLogger(__name__)
+
+# uploads are parsed and written here, off the request threads
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="import-job")
+_heartbeat: Optional[threading.Thread] = None
+_heartbeat_lock = threading.Lock()
+_heartbeat_stop = threading.Event()
+
+# kind -> (module, function) of the streaming importer (same signature as
+# import_livestock_upload). Resolved on first use so pandas stays out of
+# workers that never run an import.
+HANDLERS = {
+    "livestock": ("routers.services.livestock_import", "import_livestock_upload"),
+    "inventory_items": ("routers.services.inventory_import", "import_inventory_item_upload"),
+}
+
+
+def _handler(kind: str):
+    module, name = HANDLERS[kind]
+    return getattr(importlib.import_module(module), name)
+
+
+# ---- Utility helpers ----
+def _db_now():
+    # one clock (the database's) for every heartbeat write and staleness check
+    return func.timezone("utc", func.now())
+
+
+def _spool_path(job_id: int, ext: str) -> str:
+    return os.path.join(JOB_DIR, f"job-{job_id}{ext}")
+
+
+_SPOOL_NAME = re.compile(r"^job-(\d+)\.")
+
+
+def _count_rows(path: str, filename: str) -> Optional[int]:
+    """Cheap row estimate for ETA: newline count for CSV, sheet dimensions for XLSX."""
+    name = (filename or "").lower()
+    try:
+        if name.endswith(".csv"):
+            lines = 0
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    lines += block.count(b"\n")
+            return max(lines - 1, 0)
+        if name.endswith(".xlsx"):
+            from openpyxl import load_workbook
+
+            wb = load_workbook(path, read_only=True)
+            try:
+                max_row = wb.active.max_row
+            finally:
+                wb.close()
+            return max(max_row - 1, 0) if max_row else None
+    except Exception:
+        return None
+    return None
+
+
+def _error_report(results) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["row", "key", "status", "detail"])
+    for r in results:
+        if r["status"] == "accepted":
+            continue
+        writer.writerow([r["row"], r.get("tag_number") or r.get("name") or "", r["status"], r.get("detail", "")])
+    return buf.getvalue()
+
+
+def job_to_dict(job: models.ImportJob) -> Dict[str, Any]:
+    eta = None
+    if job.status == "running" and job.started_at and job.rows_total and job.rows_done:
+        elapsed = (datetime.utcnow() - job.started_at).total_seconds()
+        remaining = max(job.rows_total - job.rows_done, 0)
+        eta = round(elapsed / job.rows_done * remaining, 1)
+    elif job.status == "completed":
+        eta = 0.0
+
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "filename": job.filename,
+        "status": job.status,
+        "rows_total": job.rows_total,
+        "rows_done": job.rows_done,
+        "rows_failed": job.rows_failed,
+        "rows_skipped": job.rows_skipped,
+        "eta_seconds": eta,
+        "error": job.error,
+        "has_error_report": bool(job.error_report),
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+# ---- Job lifecycle ----
+def submit_job(db: Session, kind: str, fileobj, filename: str) -> models.ImportJob:
+    """
+    Spool the upload to JOB_DIR, record a queued ImportJob and hand it to the
+    worker pool. Returns immediately.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown import kind: {kind}")
+    name = (filename or "").lower()
+    if not name.endswith((".csv", ".xls", ".xlsx")):
+        raise ValueError("Invalid file type. Upload CSV or Excel.")
+
+    start_heartbeat()
+    job = models.ImportJob(kind=kind, filename=filename, status="queued", worker=WORKER_ID, heartbeat_at=_db_now())
+    db.add(job)
+    db.flush()  # the id names the spool file; nothing is visible to sweeps until commit
+
+    os.makedirs(JOB_DIR, exist_ok=True)
+    path = _spool_path(job.id, os.path.splitext(name)[1])
+    try:
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, 1 << 20)
+        job.rows_total = _count_rows(path, filename)
+        db.commit()
+    except Exception:
+        db.rollback()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    db.refresh(job)
+
+    _executor.submit(run_job, job.id, path)
+    return job
+
+
+def run_job(job_id: int, path: str):
+    """
+    Worker entry point. The import runs in its own session and commits once;
+    progress is committed separately so GET /jobs/{id} sees it while running.
+    """
+    progress_db = SessionLocal()
+    work_db = SessionLocal()
+    try:
+        job = progress_db.get(models.ImportJob, job_id)
+        if job.status != "queued":
+            return  # failed by a sweep that took this process for dead
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        progress_db.commit()
+
+        def on_chunk(chunk):
+            job.rows_done += chunk["rows"]
+            job.rows_failed += chunk["errors"]
+            job.rows_skipped += chunk["skipped"]
+            progress_db.commit()
+
+        try:
+            with open(path, "rb") as f:
+                summary = _handler(job.kind)(work_db, f, job.filename, include_accepted=False, on_chunk=on_chunk)
+            work_db.commit()
+        except Exception as e:
+            work_db.rollback()
+            job.status = "failed"
+            job.error = str(e)
+            # the import commits once, so none of the counted rows were kept
+            job.rows_done = job.rows_failed = job.rows_skipped = 0
+        else:
+            job.status = "completed"
+            job.rows_total = summary["rows"]
+            job.error_report = _error_report(summary["results"]) if summary["results"] else None
+
+        job.finished_at = datetime.utcnow()
+        progress_db.commit()
+    finally:
+        work_db.close()
+        progress_db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def sweep_orphaned_jobs() -> int:
+    """
+    Fail queued/running jobs whose owner stopped beating (or, for jobs from
+    before heartbeats, that are older than STALE_AFTER) and delete spooled
+    uploads no live job will read. Returns the number of jobs failed.
+    """
+    J = models.ImportJob
+    stale = _db_now() - timedelta(seconds=STALE_AFTER)
+    with SessionLocal() as db:
+        failed = db.execute(
+            update(J)
+            .where(
+                J.status.in_(LIVE_STATUSES),
+                or_(J.heartbeat_at < stale, and_(J.heartbeat_at.is_(None), J.created_at < stale)),
+            )
+            .values(
+                status="failed",
+                error="Interrupted: the server running this import stopped; upload the file again.",
+                rows_done=0,
+                rows_failed=0,
+                rows_skipped=0,
+                finished_at=datetime.utcnow(),
+            )
+            .returning(J.id)
+        ).scalars().all()
+        live = set(db.execute(select(J.id).where(J.status.in_(LIVE_STATUSES))).scalars())
+        db.commit()
+
+    # the age check covers a job flushed but not yet committed by submit_job
+    cutoff = time.time() - STALE_AFTER
+    try:
+        spooled = list(os.scandir(JOB_DIR))
+    except FileNotFoundError:
+        spooled = []
+    for entry in spooled:
+        match = _SPOOL_NAME.match(entry.name)
+        if not match or int(match.group(1)) in live:
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+    return len(failed)
+
+
+def _beat():
+    with SessionLocal() as db:
+        db.execute(
+            update(models.ImportJob)
+            .where(models.ImportJob.worker == WORKER_ID, models.ImportJob.status.in_(LIVE_STATUSES))
+            .values(heartbeat_at=_db_now())
+        )
+        db.commit()
+
+
+def _heartbeat_loop():
+    while True:
+        try:
+            _beat()
+            failed = sweep_orphaned_jobs()
+            if failed:
+                logger.warning("marked %s interrupted import jobs as failed", failed)
+        except Exception:
+            logger.exception("import job heartbeat failed")
+        if _heartbeat_stop.wait(HEARTBEAT_INTERVAL):
+            return
+
+
+def start_heartbeat():
+    """Start this process's heartbeat/sweep thread (idempotent); the first pass runs at once."""
+    global _heartbeat
+    with _heartbeat_lock:
+        if _heartbeat is None or not _heartbeat.is_alive():
+            _heartbeat_stop.clear()
+            _heartbeat = threading.Thread(target=_heartbeat_loop, name="import-job-heartbeat", daemon=True)
+            _heartbeat.start()
+
+
+def shutdown():
+    _heartbeat_stop.set()
@@ -0,0 +1,142 @@
+# services/inventory_import.py
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+from sqlalchemy import Integer, func, insert, select
+from sqlalchemy.orm import Session
+
+import models
+from routers.services.livestock_import import BATCH_SIZE, CHUNK_SIZE, _chunks, _existing_values, stream_upload
+
+REQUIRED_COLUMNS = ["name", "type_id", "unit_id"]
+OPTIONAL_COLUMNS = ["cost_price", "reorder_level", "notes"]
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalise an inventory item sheet with vectorized pandas operations."""
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    df = df.dropna(how="all").copy()
+    for col in OPTIONAL_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+
+    df["name"] = df["name"].fillna("").astype(str).str.strip()
+    df["name_key"] = df["name"].str.lower()
+    for col in ("type_id", "unit_id"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    for col in ("cost_price", "reorder_level"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    notes = df["notes"].fillna("").astype(str).str.strip()
+    df["notes"] = notes.where(notes != "", None)
+    return df
+
+
+def import_inventory_item_frame(
+    db: Session,
+    df: pd.DataFrame,
+    seen_names: Optional[set] = None,
+    include_accepted: bool = True,
+) -> Dict[str, Any]:
+    """
+    Create every valid row of a prepared frame as an InventoryItem.
+    Names are matched case-insensitively against existing items in one probe;
+    rows are inserted in batches. The caller owns the transaction.
+    """
+    started = time.perf_counter()
+    results: Dict[int, Dict[str, Any]] = {}
+    seen_names = set() if seen_names is None else seen_names
+
+    keys = df["name_key"]
+    existing = set(
+        db.execute(
+            select(func.lower(models.InventoryItem.name)).where(
+                func.lower(models.InventoryItem.name).in_(keys[keys != ""].unique().tolist())
+            )
+        ).scalars()
+    )
+    type_ids = _existing_values(db, models.InventoryType.id, [int(v) for v in df["type_id"].dropna().unique()], Integer)
+    unit_ids = _existing_values(db, models.Unit.id, [int(v) for v in df["unit_id"].dropna().unique()], Integer)
+
+    duplicated_in_file = (keys.duplicated(keep="first") | keys.isin(seen_names)) & (keys != "")
+    seen_names.update(keys[keys != ""])
+
+    created = 0
+    pending = []
+    for row in df.itertuples():
+        row_no = int(row.Index) + 2
+        name = row.name
+
+        if not name:
+            results[row_no] = {"row": row_no, "name": None, "status": "error", "detail": "Missing name"}
+            continue
+        if duplicated_in_file[row.Index]:
+            results[row_no] = {"row": row_no, "name": name, "status": "skipped", "detail": "Duplicate name in file"}
+            continue
+        if row.name_key in existing:
+            results[row_no] = {"row": row_no, "name": name, "status": "skipped", "detail": "Item already exists"}
+            continue
+        if pd.isna(row.type_id) or int(row.type_id) not in type_ids:
+            results[row_no] = {"row": row_no, "name": name, "status": "error", "detail": f"Unknown type_id {row.type_id}"}
+            continue
+        if pd.isna(row.unit_id) or int(row.unit_id) not in unit_ids:
+            results[row_no] = {"row": row_no, "name": name, "status": "error", "detail": f"Unknown unit_id {row.unit_id}"}
+            continue
+
+        pending.append((row_no, {
+            "name": name,
+            "type_id": int(row.type_id),
+            "unit_id": int(row.unit_id),
+            "cost_price": None if pd.isna(row.cost_price) else round(float(row.cost_price), 2),
+            "reorder_level": None if pd.isna(row.reorder_level) else float(row.reorder_level),
+            "notes": row.notes,
+            "quantity_on_hand": 0,
+            "created_at": datetime.utcnow(),
+        }))
+
+    row_by_name = {values["name"]: row_no for row_no, values in pending}
+    for batch in _chunks([values for _, values in pending], BATCH_SIZE):
+        inserted = db.execute(
+            insert(models.InventoryItem).returning(models.InventoryItem.id, models.InventoryItem.name),
+            batch,
+        ).all()
+        created += len(inserted)
+        if include_accepted:
+            for r in inserted:
+                row_no = row_by_name[r.name]
+                results[row_no] = {"row": row_no, "name": r.name, "status": "accepted", "item_id": r.id}
+
+    elapsed = time.perf_counter() - started
+    rows = [results[k] for k in sorted(results)]
+    total = len(rows) if include_accepted else len(rows) + created
+
+    return {
+        "rows": total,
+        "created": created,
+        "skipped": sum(1 for r in rows if r["status"] == "skipped"),
+        "errors": sum(1 for r in rows if r["status"] == "error"),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(total / elapsed, 1) if elapsed > 0 else None,
+        "results": rows,
+    }
+
+
+def import_inventory_item_upload(
+    db: Session,
+    fileobj,
+    filename: str,
+    include_accepted: bool = True,
+    chunksize: int = CHUNK_SIZE,
+    on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Stream an inventory item sheet chunk by chunk inside the caller's transaction."""
+    seen_names: set = set()
+    return stream_upload(
+        fileobj, filename, prepare_frame,
+        lambda df: import_inventory_item_frame(db, df, seen_names=seen_names, include_accepted=include_accepted),
+        chunksize=chunksize, on_chunk=on_chunk,
+    )
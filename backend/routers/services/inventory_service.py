@@ -1,13 +1,30 @@
 # services/inventory_service.py
+"""
+The costing engine: weighted-average (WAVG) valuation over StockOnHand, with
+CostHistory layers kept for traceability and the InventoryMovement ledger
+written alongside. Receipts, transfers and issues all go through here.
+
+Nothing in this module begins or commits a transaction: the caller owns it,
+so several engine calls (e.g. both legs of a transfer) commit or roll back
+together. Row locks taken here are held until the caller commits.
+"""
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update
-from sqlalchemy.exc import NoResultFound
+from collections import defaultdict
+from sqlalchemy import Integer, Numeric, bindparam, column, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 import models
 from datetime import date, datetime
 
-DECIMAL_CTX = Decimal("0.0001")  # rounding context for calculations
+INVENTORY_ITEM = "inventory_item"
+LIVESTOCK = "livestock"
+
+COST_PLACES = 4
+QUANTITY_PLACES = 3  # StockOnHand, layers and the ledger store Numeric(14, 3)
+# open layers examined per FIFO round; doubles while an outflow still needs more
+FIFO_PAGE_SIZE = 64
+
 
 # ---- Utility helpers ----
 def _to_decimal(value) -> Decimal:
@@ -17,260 +34,565 @@ def _to_decimal(value) -> Decimal:
         return value
     return Decimal(str(value))
 
-def _round(value: Decimal, places: int = 4) -> Decimal:
+def _round(value: Decimal, places: int = COST_PLACES) -> Decimal:
     q = Decimal(1).scaleb(-places)
     return value.quantize(q, rounding=ROUND_HALF_UP)
 
+
+def _quantity(value) -> Decimal:
+    """A quantity at the precision it's stored with, so checks and writes agree with the balance."""
+    return _round(_to_decimal(value), QUANTITY_PLACES)
+
+
+def _at_location(location_column, location_id: Optional[int]):
+    # = / IS NULL rather than IS NOT DISTINCT FROM, which Postgres can't use as an index condition
+    return location_column.is_(None) if location_id is None else location_column == location_id
+
+
+def _rows(name: str, columns: List[Tuple[str, Any]], rows: List[tuple]):
+    """
+    rows as a relation to select from or join: unnest() over one array
+    parameter per column. The SQL doesn't change with the number of rows, so
+    it's compiled once and cached, unlike a literal VALUES list.
+    """
+    data = list(zip(*rows)) if rows else [()] * len(columns)
+    return (
+        func.unnest(*[bindparam(None, list(values), type_=ARRAY(type_)) for (_, type_), values in zip(columns, data)])
+        .table_valued(*[column(col, type_) for col, type_ in columns])
+        .render_derived(name=name)
+    )
+
+
 # ---- StockOnHand helpers ----
 def get_or_create_stock_on_hand(session: Session, item_type: str, item_id: int, location_id: Optional[int] = None) -> models.StockOnHand:
     """
-    Return a locked StockOnHand row (SELECT ... FOR UPDATE) or create it.
-    item_type: 'livestock' or 'inventory_item'
+    Return the StockOnHand row locked FOR UPDATE, creating it first if needed.
+    Creation is INSERT ... ON CONFLICT DO NOTHING, so two writers racing to
+    create the same row don't fail; both end up waiting on the one lock.
     """
     stmt = select(models.StockOnHand).where(
         models.StockOnHand.item_type == item_type,
         models.StockOnHand.item_id == item_id,
-        models.StockOnHand.location_id == location_id
-    ).with_for_update()
+        _at_location(models.StockOnHand.location_id, location_id),
+    ).with_for_update().execution_options(populate_existing=True)  # a cached row must show the locked values
     soh = session.execute(stmt).scalars().first()
     if soh:
         return soh
 
-    soh = models.StockOnHand(
-        item_type=item_type,
+    session.execute(
+        insert(models.StockOnHand)
+        .values(item_type=item_type, item_id=item_id, location_id=location_id,
+                quantity=0, avg_cost=0, last_updated=datetime.utcnow())
+        .on_conflict_do_nothing(constraint="uix_stock_on_hand_item_location")
+    )
+    return session.execute(stmt).scalars().one()
+
+
+def _record_movement(session: Session, item_type: str, item_id: int, location_id: Optional[int], qty: Decimal,
+                     unit_cost: Decimal, movement_type: str, reference_type: Optional[str], reference_id: Optional[int]):
+    """InventoryMovement ledger row; livestock has no ledger here. created_at is stamped by the database."""
+    if item_type != INVENTORY_ITEM:
+        return
+    session.add(models.InventoryMovement(
         item_id=item_id,
         location_id=location_id,
-        quantity=Decimal("0"),
-        avg_cost=Decimal("0"),
+        quantity=qty,
+        unit_cost=unit_cost,
+        movement_type=movement_type,
+        reference_type=reference_type,
+        reference_id=reference_id,
+    ))
+
+
+def _bump_item_quantity(session: Session, item_type: str, item_id: int, delta: Decimal):
+    if item_type != INVENTORY_ITEM or delta == 0:
+        return
+    session.execute(
+        update(models.InventoryItem)
+        .where(models.InventoryItem.id == item_id)
+        .values(quantity_on_hand=models.InventoryItem.quantity_on_hand + delta)
     )
-    session.add(soh)
-    session.flush()  # assign id
-    return soh
+
 
 # ---- Inflow (WAVG) ----
-def apply_inflow(
+def _wavg(cur_qty: Decimal, cur_avg: Decimal, lines: List[Tuple[Decimal, Optional[Decimal]]]) -> Tuple[Decimal, List[Tuple[Decimal, Decimal]]]:
+    """New average after adding lines to a balance, and the lines with their unit cost filled in."""
+    # value what's already on hand; a negative balance carries no value
+    total_qty = max(cur_qty, Decimal("0"))
+    total_value = total_qty * cur_avg
+    priced = []
+    for qty, cost in lines:
+        unit_cost = _round(cur_avg if cost is None else cost)
+        total_qty += qty
+        total_value += qty * unit_cost
+        priced.append((qty, unit_cost))
+    return (_round(total_value / total_qty) if total_qty > 0 else cur_avg), priced
+
+
+def apply_inflows(
     session: Session,
     item_type: str,
     item_id: int,
     location_id: Optional[int],
-    qty,
-    unit_cost,
+    lines: Iterable[Tuple[Any, Any]],
+    movement_type: str = "RECEIPT",
     ref_table: Optional[str] = None,
     ref_id: Optional[int] = None,
-    user_id: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Apply an inflow using Weighted Average logic.
-    - qty: positive number
-    - unit_cost: cost per unit for this inflow (currency)
-    Returns a dict with updated soh values and created cost_history row id.
+    Apply several inflows of one (item, location) under a single row lock.
+    lines: (qty, unit_cost) pairs; qty > 0, unit_cost None means "at the
+    current average" (quantity grows, average unchanged).
+    Writes one CostHistory layer and one ledger movement per line.
     """
-    qty = _to_decimal(qty)
-    unit_cost = _to_decimal(unit_cost)
-
-    if qty <= 0:
-        raise ValueError("qty must be > 0 for inflow")
-    if unit_cost < 0:
-        raise ValueError("unit_cost must be >= 0")
-
-    with session.begin():
-        soh = get_or_create_stock_on_hand(session, item_type, item_id, location_id)
-        cur_qty = _to_decimal(soh.quantity)
-        cur_avg = _to_decimal(soh.avg_cost)
-
-        # Weighted average formula
-        total_existing_cost = cur_qty * cur_avg
-        new_total_qty = cur_qty + qty
-        new_avg = Decimal("0")
-        if new_total_qty > 0:
-            new_avg = (total_existing_cost + qty * unit_cost) / new_total_qty
-
-        # Round values for storage
-        new_avg = _round(new_avg, 4)
-        soh.quantity = new_total_qty
-        soh.avg_cost = new_avg
-        soh.last_updated = datetime.utcnow()
-        session.add(soh)
-        session.flush()
-
-        # Insert CostHistory immutable inflow row
-        total_cost = _round(qty * unit_cost, 4)
-        ch = models.CostHistory(
+    lines = [(_quantity(qty), None if cost is None else _to_decimal(cost)) for qty, cost in lines]
+    if not lines:
+        raise ValueError("no inflow lines")
+    for qty, cost in lines:
+        if qty <= 0:
+            raise ValueError("qty must be > 0 for inflow")
+        if cost is not None and cost < 0:
+            raise ValueError("unit_cost must be >= 0")
+
+    soh = get_or_create_stock_on_hand(session, item_type, item_id, location_id)
+    cur_qty = _to_decimal(soh.quantity)
+    cur_avg = _to_decimal(soh.avg_cost)
+    new_avg, priced = _wavg(cur_qty, cur_avg, lines)
+
+    received = Decimal("0")
+    layers = []
+    for qty, unit_cost in priced:
+        received += qty
+        layers.append(models.CostHistory(
             item_type=item_type,
             item_id=item_id,
+            location_id=location_id,
             reference_type=ref_table,
             reference_id=ref_id,
             quantity=qty,
-            unit_cost=_round(unit_cost, 4),
-            total_cost=total_cost,
+            unit_cost=unit_cost,
+            total_cost=_round(qty * unit_cost),
             remaining_qty=qty,
             created_at=datetime.utcnow(),
-        )
-        session.add(ch)
-        session.flush()
-
-        # Optionally, create an inventory_movement record for audit
-        # Use your existing InventoryMovement model if you want to record inflows for inventory_items.
-        # For livestock-type inflows we could still write into a dedicated inventory_movements table or reuse existing one.
-        if item_type == "inventory_item":
-            im = models.InventoryMovement(
-                item_id=item_id,
-                movement_type="in",
-                quantity=qty,
-                ref_table=ref_table,
-                ref_id=ref_id,
-                source_type="inflow",
-                date=date.today(),
-                notes=f"Inflow WAVG unit_cost={unit_cost}",
-                created_at=datetime.utcnow()
-            )
-            session.add(im)
+        ))
+        _record_movement(session, item_type, item_id, location_id, qty, unit_cost, movement_type, ref_table, ref_id)
+
+    soh.avg_cost = new_avg
+    soh.quantity = cur_qty + received
+    soh.last_updated = datetime.utcnow()
+    session.add_all(layers)
+    _bump_item_quantity(session, item_type, item_id, received)
+    session.flush()
 
     return {
         "stock_on_hand_id": soh.id,
         "item_type": item_type,
         "item_id": item_id,
-        "new_quantity": float(soh.quantity),
-        "new_avg_cost": float(soh.avg_cost),
-        "cost_history_id": ch.id
+        "location_id": location_id,
+        "received_quantity": received,
+        "new_quantity": _to_decimal(soh.quantity),
+        "new_avg_cost": _to_decimal(soh.avg_cost),
+        "cost_history_ids": [layer.id for layer in layers],
     }
 
 
-# ---- Outflow (uses avg for valuation; consumes CostHistory FIFO for traceability) ----
+def apply_inflow(
+    session: Session,
+    item_type: str,
+    item_id: int,
+    location_id: Optional[int],
+    qty,
+    unit_cost,
+    movement_type: str = "RECEIPT",
+    ref_table: Optional[str] = None,
+    ref_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Single-line apply_inflows."""
+    return apply_inflows(session, item_type, item_id, location_id, [(qty, unit_cost)],
+                         movement_type=movement_type, ref_table=ref_table, ref_id=ref_id)
+
+
+# ---- Outflow (valued at the average; consumes CostHistory FIFO for traceability) ----
+def _consume_layers(session: Session, item_type: str, location_id: Optional[int], needs: Dict[int, Decimal]) -> Dict[int, Decimal]:
+    """
+    Draw needs[item_id] down from each item's oldest open layers at one
+    location and return the cost taken per item.
+
+    Each round is one UPDATE ... FROM ... RETURNING for all items: a LATERAL
+    page of the next FIFO_PAGE_SIZE open layers per item, a running sum over
+    remaining_qty (per item) picks the layers needed and how much to take from
+    each, and only those rows are written. Large issues against many small
+    layers take more rounds (the page doubles each time); the layer count no
+    longer matters for ordinary issues.
+
+    No per-layer locks: every writer of a (item, location)'s layers holds its
+    StockOnHand row lock first.
+    """
+    ch = models.CostHistory.__table__
+    removed = {item_id: Decimal("0") for item_id in needs}
+    outstanding = {item_id: qty for item_id, qty in needs.items() if qty > 0}
+    after_ids = dict.fromkeys(outstanding, 0)
+    page_size = FIFO_PAGE_SIZE
+
+    while outstanding:
+        want = _rows(
+            "want",
+            [("item_id", Integer), ("need", Numeric(14, 3)), ("after_id", Integer)],
+            [(item_id, qty, after_ids[item_id]) for item_id, qty in outstanding.items()],
+        )
+        page = (
+            select(ch.c.id, ch.c.item_id, ch.c.remaining_qty)
+            .where(
+                ch.c.item_type == item_type,
+                ch.c.item_id == want.c.item_id,
+                _at_location(ch.c.location_id, location_id),
+                ch.c.remaining_qty > 0,
+                ch.c.id > want.c.after_id,
+            )
+            .order_by(ch.c.id)
+            .limit(page_size)
+            .lateral("page")
+        )
+        running = (
+            select(
+                page.c.id,
+                page.c.item_id,
+                page.c.remaining_qty,
+                want.c.need,
+                func.sum(page.c.remaining_qty).over(partition_by=page.c.item_id, order_by=page.c.id).label("running"),
+            )
+            .select_from(want)
+            .join(page, true())
+            .subquery("running")
+        )
+        already_taken = running.c.running - running.c.remaining_qty
+        needed = (
+            select(
+                running.c.id,
+                func.least(running.c.remaining_qty, running.c.need - already_taken).label("take"),
+            )
+            .where(already_taken < running.c.need)
+            .subquery("needed")
+        )
+        consumed = session.execute(
+            update(ch)
+            .where(ch.c.id == needed.c.id)
+            .values(remaining_qty=ch.c.remaining_qty - needed.c.take)
+            .returning(ch.c.id, ch.c.item_id, ch.c.unit_cost, needed.c.take)
+        ).all()
+
+        progressed = set()
+        for row in consumed:
+            removed[row.item_id] += row.take * row.unit_cost
+            outstanding[row.item_id] -= row.take
+            after_ids[row.item_id] = max(after_ids[row.item_id], row.id)
+            progressed.add(row.item_id)
+        for item_id in list(outstanding):
+            if outstanding[item_id] <= 0:
+                del outstanding[item_id]
+            elif item_id not in progressed:
+                # quantity was checked against StockOnHand, so the layers are out of step
+                raise ValueError(f"Not enough cost_history remaining_qty to consume requested quantity of item {item_id}")
+        page_size *= 2
+
+    return removed
+
+
 def apply_outflow(
     session: Session,
     item_type: str,
     item_id: int,
     location_id: Optional[int],
     qty,
+    movement_type: str = "ISSUE",
     ref_table: Optional[str] = None,
     ref_id: Optional[int] = None,
-    user_id: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Apply an outflow. Returns a dict:
-      { 'removed_total_cost': Decimal, 'used_avg_cost': Decimal, 'remaining_quantity': Decimal }
-    The function:
-      - locks SOH row
-      - ensures sufficient quantity
-      - reduces SOH.quantity (WAVG stays same)
-      - consumes cost_history rows oldest-first and reduces remaining_qty
+    Take qty out of one (item, location) under its row lock. Raises ValueError
+    on insufficient stock. The average cost is unchanged; the outflow is valued
+    at it (total_cost) and the FIFO layer cost is returned alongside.
+    Callers with several lines for the same key should pass the summed qty.
     """
-    qty = _to_decimal(qty)
+    qty = _quantity(qty)
     if qty <= 0:
         raise ValueError("qty must be > 0 for outflow")
 
-    with session.begin():
-        soh = get_or_create_stock_on_hand(session, item_type, item_id, location_id)
-        cur_qty = _to_decimal(soh.quantity)
-        cur_avg = _to_decimal(soh.avg_cost)
-
-        if cur_qty < qty:
-            raise ValueError(f"Insufficient stock: have {cur_qty}, need {qty}")
-
-        # reduce SOH quantity
-        soh.quantity = cur_qty - qty
-        soh.last_updated = datetime.utcnow()
-        session.add(soh)
-        session.flush()
-
-        # consume cost_history FIFO
-        removed_total = Decimal("0")
-        remaining_to_consume = qty
-
-        # select cost_history rows oldest-first that have remaining_qty > 0
-        ch_rows = session.query(models.CostHistory).filter(
-            models.CostHistory.item_type == item_type,
-            models.CostHistory.item_id == item_id,
-            models.CostHistory.remaining_qty > 0
-        ).order_by(models.CostHistory.created_at.asc()).with_for_update().all()
-
-        for ch in ch_rows:
-            if remaining_to_consume <= 0:
-                break
-            available = _to_decimal(ch.remaining_qty)
-            unit_cost = _to_decimal(ch.unit_cost)
-            if available <= 0:
-                continue
-            if available <= remaining_to_consume:
-                removed_total += available * unit_cost
-                remaining_to_consume -= available
-                ch.remaining_qty = Decimal("0")
-            else:
-                # partial consume
-                removed_total += remaining_to_consume * unit_cost
-                ch.remaining_qty = available - remaining_to_consume
-                remaining_to_consume = Decimal("0")
-            session.add(ch)
-
-        if remaining_to_consume > 0:
-            # this should not happen because we checked soh.quantity earlier,
-            # but guard in case cost_history is inconsistent
-            raise ValueError("Not enough cost_history remaining_qty to consume requested quantity")
-
-        # Create inventory_movement audit record for inventory_item only
-        if item_type == "inventory_item":
-            im = models.InventoryMovement(
-                item_id=item_id,
-                movement_type="out",
-                quantity=qty,
-                ref_table=ref_table,
-                ref_id=ref_id,
-                source_type="outflow",
-                date=date.today(),
-                notes=f"Outflow qty={qty}",
-                created_at=datetime.utcnow()
-            )
-            session.add(im)
+    soh = get_or_create_stock_on_hand(session, item_type, item_id, location_id)
+    cur_qty = _to_decimal(soh.quantity)
+    cur_avg = _to_decimal(soh.avg_cost)
+    if cur_qty < qty:
+        raise ValueError(f"Insufficient stock for item {item_id}: have {cur_qty}, need {qty}")
+
+    soh.quantity = cur_qty - qty
+    soh.last_updated = datetime.utcnow()
+    layer_cost = _consume_layers(session, item_type, location_id, {item_id: qty})[item_id]
+    _record_movement(session, item_type, item_id, location_id, -qty, cur_avg, movement_type, ref_table, ref_id)
+    _bump_item_quantity(session, item_type, item_id, -qty)
+    session.flush()
 
     return {
         "item_type": item_type,
         "item_id": item_id,
-        "removed_total_cost": float(_round(removed_total,4)),
-        "used_avg_cost": float(_round(cur_avg,4)),
-        "new_quantity": float(soh.quantity)
+        "location_id": location_id,
+        "quantity": qty,
+        "unit_cost": cur_avg,
+        "total_cost": _round(qty * cur_avg),
+        "layer_cost": _round(layer_cost),
+        "new_quantity": _to_decimal(soh.quantity),
     }
 
 
+# ---- Set-based helpers (many items in one statement) ----
+def _lock_stock_on_hand(session: Session, item_ids: List[int], location_ids: List[int], now: datetime) -> Dict[Tuple[int, int], Any]:
+    """
+    StockOnHand rows for every (item, location) pair, created if missing and
+    then locked in one SELECT ... ORDER BY item_id, location_id FOR UPDATE
+    (the order single-item calls lock in, so concurrent writers queue instead
+    of deadlocking). Keyed by (item_id, location_id).
+    """
+    soh = models.StockOnHand.__table__
+    locations = sorted(set(location_ids))
+    keys = _rows("key", [("item_id", Integer), ("location_id", Integer)],
+                 [(item_id, location_id) for item_id in item_ids for location_id in locations])
+    session.execute(
+        insert(soh)
+        .from_select(
+            ["item_type", "item_id", "location_id", "quantity", "avg_cost", "last_updated"],
+            select(literal(INVENTORY_ITEM), keys.c.item_id, keys.c.location_id, literal(0), literal(0), literal(now)),
+        )
+        .on_conflict_do_nothing(constraint="uix_stock_on_hand_item_location")
+    )
+    return {
+        (row.item_id, row.location_id): row
+        for row in session.execute(
+            select(soh.c.id, soh.c.item_id, soh.c.location_id, soh.c.quantity, soh.c.avg_cost)
+            .where(
+                soh.c.item_type == INVENTORY_ITEM,
+                soh.c.item_id.in_(item_ids),
+                soh.c.location_id.in_(locations),
+            )
+            .order_by(soh.c.item_id, soh.c.location_id)
+            .with_for_update()
+        )
+    }
+
+
+def _write_balances(session: Session, balances: List[Tuple[int, Decimal, Decimal]], now: datetime):
+    """(stock_on_hand id, quantity, avg_cost) rows in one UPDATE ... FROM unnest(...)."""
+    soh = models.StockOnHand.__table__
+    new_balances = _rows("balance", [("id", Integer), ("quantity", Numeric(14, 3)), ("avg_cost", Numeric(14, 4))], balances)
+    session.execute(
+        update(soh)
+        .where(soh.c.id == new_balances.c.id)
+        .values(quantity=new_balances.c.quantity, avg_cost=new_balances.c.avg_cost, last_updated=now)
+    )
+
+
+# ---- Receipt (many items into one location) ----
+def receive_lines(
+    session: Session,
+    location_id: int,
+    lines: Iterable[Tuple[int, Any, Any]],
+    movement_type: str = "RECEIPT",
+    ref_table: Optional[str] = None,
+    ref_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    apply_inflows for many inventory items at one location as one set of
+    writes. lines: (item_id, qty, unit_cost); unit_cost None means "at the
+    current average". Returns one {item_id, quantity, unit_cost} per line, in
+    input order.
+
+    Locks like transfer_lines, then the InventoryItem rows in id order, and
+    writes balances, layers, movements and quantity_on_hand with a fixed
+    number of statements. The items must exist.
+    """
+    lines = [(int(item_id), _quantity(qty), None if cost is None else _to_decimal(cost)) for item_id, qty, cost in lines]
+    if not lines:
+        raise ValueError("no receipt lines")
+    received: Dict[int, Decimal] = defaultdict(Decimal)
+    for item_id, qty, cost in lines:
+        if qty <= 0:
+            raise ValueError("qty must be > 0 for inflow")
+        if cost is not None and cost < 0:
+            raise ValueError("unit_cost must be >= 0")
+        received[item_id] += qty
+
+    now = datetime.utcnow()
+    item_ids = sorted(received)
+    stock = _lock_stock_on_hand(session, item_ids, [location_id], now)
+
+    priced = [
+        (item_id, qty, _round(_to_decimal(stock[(item_id, location_id)].avg_cost) if cost is None else cost))
+        for item_id, qty, cost in lines
+    ]
+    inflows: Dict[int, List[Tuple[Decimal, Decimal]]] = defaultdict(list)
+    for item_id, qty, cost in priced:
+        inflows[item_id].append((qty, cost))
+    balances = []
+    for item_id in item_ids:
+        row = stock[(item_id, location_id)]
+        new_avg, _ = _wavg(_to_decimal(row.quantity), _to_decimal(row.avg_cost), inflows[item_id])
+        balances.append((row.id, _to_decimal(row.quantity) + received[item_id], new_avg))
+    _write_balances(session, balances, now)
+
+    session.execute(insert(models.CostHistory), [
+        {"item_type": INVENTORY_ITEM, "item_id": item_id, "location_id": location_id,
+         "reference_type": ref_table, "reference_id": ref_id, "quantity": qty, "unit_cost": cost,
+         "total_cost": _round(qty * cost), "remaining_qty": qty, "created_at": now}
+        for item_id, qty, cost in priced
+    ])
+    session.execute(insert(models.InventoryMovement), [
+        {"item_id": item_id, "location_id": location_id, "quantity": qty, "unit_cost": cost,
+         "movement_type": movement_type, "reference_type": ref_table, "reference_id": ref_id}
+        for item_id, qty, cost in priced
+    ])
+
+    items = models.InventoryItem.__table__
+    session.execute(select(items.c.id).where(items.c.id.in_(item_ids)).order_by(items.c.id).with_for_update()).all()
+    deltas = _rows("delta", [("id", Integer), ("quantity", Numeric(14, 3))], [(item_id, received[item_id]) for item_id in item_ids])
+    session.execute(
+        update(items)
+        .where(items.c.id == deltas.c.id)
+        .values(quantity_on_hand=items.c.quantity_on_hand + deltas.c.quantity)
+    )
+
+    return [{"item_id": item_id, "quantity": qty, "unit_cost": cost} for item_id, qty, cost in priced]
+
+
+# ---- Transfer ----
+def transfer_lines(
+    session: Session,
+    source_location_id: int,
+    destination_location_id: int,
+    lines: Iterable[Tuple[int, Any, Any]],
+    out_movement_type: str = "ISSUE_OUT",
+    in_movement_type: str = "ISSUE_IN",
+    ref_table: Optional[str] = None,
+    ref_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Move many inventory items between two locations as one set of writes.
+    lines: (item_id, qty, unit_cost); unit_cost None means "at the source
+    average". Each line leaves the source at the source average and lands at
+    the destination at its unit cost (WAVG there). Returns one
+    {item_id, quantity, unit_cost} per line, in input order.
+
+    The statement count doesn't grow with the number of lines: every touched
+    StockOnHand row is created if missing and then locked in one
+    SELECT ... ORDER BY item_id, location_id FOR UPDATE (the same order single
+    item calls lock in, so concurrent transfers queue instead of deadlocking);
+    balances are written by one UPDATE ... FROM unnest(...), the source
+    layers are consumed in one FIFO pass, and layers and movements are bulk
+    inserted. InventoryItem.quantity_on_hand is untouched, a transfer nets
+    to zero.
+    """
+    if source_location_id == destination_location_id:
+        raise ValueError("Source and destination must be different")
+    lines = [(int(item_id), _quantity(qty), None if cost is None else _to_decimal(cost)) for item_id, qty, cost in lines]
+    if not lines:
+        raise ValueError("no transfer lines")
+    needs: Dict[int, Decimal] = defaultdict(Decimal)
+    for item_id, qty, cost in lines:
+        if qty <= 0:
+            raise ValueError("qty must be > 0 for transfer")
+        if cost is not None and cost < 0:
+            raise ValueError("unit_cost must be >= 0")
+        needs[item_id] += qty
+
+    now = datetime.utcnow()
+    item_ids = sorted(needs)
+    stock = _lock_stock_on_hand(session, item_ids, [source_location_id, destination_location_id], now)
+
+    for item_id in item_ids:
+        have = _to_decimal(stock[(item_id, source_location_id)].quantity)
+        if have < needs[item_id]:
+            raise ValueError(f"Insufficient stock for item {item_id}: have {have}, need {needs[item_id]}")
+
+    source_avg = {item_id: _to_decimal(stock[(item_id, source_location_id)].avg_cost) for item_id in item_ids}
+    priced = [(item_id, qty, _round(source_avg[item_id] if cost is None else cost)) for item_id, qty, cost in lines]
+
+    inflows: Dict[int, List[Tuple[Decimal, Decimal]]] = defaultdict(list)
+    for item_id, qty, cost in priced:
+        inflows[item_id].append((qty, cost))
+    balances = []
+    for item_id in item_ids:
+        src = stock[(item_id, source_location_id)]
+        dst = stock[(item_id, destination_location_id)]
+        new_avg, _ = _wavg(_to_decimal(dst.quantity), _to_decimal(dst.avg_cost), inflows[item_id])
+        balances.append((src.id, _to_decimal(src.quantity) - needs[item_id], src.avg_cost))
+        balances.append((dst.id, _to_decimal(dst.quantity) + needs[item_id], new_avg))
+    _write_balances(session, balances, now)
+
+    _consume_layers(session, INVENTORY_ITEM, source_location_id, needs)
+    session.execute(insert(models.CostHistory), [
+        {"item_type": INVENTORY_ITEM, "item_id": item_id, "location_id": destination_location_id,
+         "reference_type": ref_table, "reference_id": ref_id, "quantity": qty, "unit_cost": cost,
+         "total_cost": _round(qty * cost), "remaining_qty": qty, "created_at": now}
+        for item_id, qty, cost in priced
+    ])
+    session.execute(insert(models.InventoryMovement), [
+        {"item_id": item_id, "location_id": location_id, "quantity": signed_qty, "unit_cost": unit_cost,
+         "movement_type": movement_type, "reference_type": ref_table, "reference_id": ref_id}
+        for item_id, qty, cost in priced
+        for location_id, signed_qty, unit_cost, movement_type in (
+            (source_location_id, -qty, source_avg[item_id], out_movement_type),
+            (destination_location_id, qty, cost, in_movement_type),
+        )
+    ])
+
+    return [{"item_id": item_id, "quantity": qty, "unit_cost": cost} for item_id, qty, cost in priced]
+
+
+def transfer(
+    session: Session,
+    item_id: int,
+    source_location_id: int,
+    destination_location_id: int,
+    qty,
+    unit_cost=None,
+    out_movement_type: str = "ISSUE_OUT",
+    in_movement_type: str = "ISSUE_IN",
+    ref_table: Optional[str] = None,
+    ref_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Single-line transfer_lines."""
+    return transfer_lines(session, source_location_id, destination_location_id, [(item_id, qty, unit_cost)],
+                          out_movement_type=out_movement_type, in_movement_type=in_movement_type,
+                          ref_table=ref_table, ref_id=ref_id)[0]
+
+
 # ---- Journal entry creator ----
 def create_journal_entry(session: Session, journal_date: Optional[date], description: str, lines: List[Dict[str, Any]], ref_type: Optional[str]=None, ref_id: Optional[int]=None, user_id: Optional[int]=None) -> int:
     """
     lines: list of dicts: {'account_code': 'INV-MEAT', 'debit': Decimal(...), 'credit': Decimal(...), 'narration': '...'}
     Returns created journal_entry.id
     """
-    with session.begin():
-        je = models.JournalEntry(
-            journal_date = journal_date or date.today(),
-            description = description,
-            reference_type = ref_type,
-            reference_id = ref_id,
-            created_by = user_id,
-            created_at = datetime.utcnow()
+    total_debit = sum((_round(_to_decimal(l.get("debit", 0))) for l in lines), Decimal("0"))
+    total_credit = sum((_round(_to_decimal(l.get("credit", 0))) for l in lines), Decimal("0"))
+    if total_debit != total_credit:
+        raise ValueError(f"Journal not balanced: debit={total_debit} credit={total_credit}")
+
+    je = models.JournalEntry(
+        journal_date = journal_date or date.today(),
+        description = description,
+        reference_type = ref_type,
+        reference_id = ref_id,
+        created_by = user_id,
+        created_at = datetime.utcnow()
+    )
+    je.lines = [
+        models.JournalLine(
+            account_code = l["account_code"],
+            debit = _round(_to_decimal(l.get("debit", 0))),
+            credit = _round(_to_decimal(l.get("credit", 0))),
+            narration = l.get("narration")
         )
-        session.add(je)
-        session.flush()
-
-        # Add lines
-        total_debit = Decimal("0")
-        total_credit = Decimal("0")
-        for l in lines:
-            debit = _to_decimal(l.get("debit", 0))
-            credit = _to_decimal(l.get("credit", 0))
-            jl = models.JournalLine(
-                journal_entry_id = je.id,
-                account_code = l["account_code"],
-                debit = _round(debit,4),
-                credit = _round(credit,4),
-                narration = l.get("narration")
-            )
-            total_debit += debit
-            total_credit += credit
-            session.add(jl)
-
-        # Basic balancing check (optional extra safety)
-        if _round(total_debit,4) != _round(total_credit,4):
-            raise ValueError(f"Journal not balanced: debit={total_debit} credit={total_credit}")
-
+        for l in lines
+    ]
+    session.add(je)
+    session.flush()
     return je.id
 
 
@@ -287,117 +609,91 @@ def process_slaughter(
     """
     Convert one live animal into a meat inventory item.
     Steps:
-      1) Read livestock stock_on_hand (must have qty >= 1)
-      2) Outflow 1 unit of livestock (consume its book value)
-      3) Inflow meat_inventory_item_id with qty=carcass_qty and unit_cost = livestock_book_value / carcass_qty
-      4) Create journal entry moving book value from INV-LIVESTOCK -> INV-MEAT (and optionally processing fee)
-      5) Mark livestock availability 'slaughtered' and create Exit record
+      1) Outflow 1 unit of livestock (consume its book value)
+      2) Inflow meat_inventory_item_id with qty=carcass_qty and unit_cost = book value / carcass_qty
+      3) Create journal entry moving book value from INV-LIVESTOCK -> INV-MEAT (and optionally processing fee)
+      4) Mark livestock availability 'slaughtered' and create Exit record
     """
-    carcass_qty = _to_decimal(carcass_qty)
+    carcass_qty = _quantity(carcass_qty)
     processing_fee = _to_decimal(processing_fee or 0)
 
     if carcass_qty <= 0:
         raise ValueError("carcass_qty must be > 0")
 
-    with session.begin():
-        # 1) get livestock SOH (lock)
-        soh = get_or_create_stock_on_hand(session, "livestock", livestock_id, location_id)
-        if _to_decimal(soh.quantity) < 1:
-            raise ValueError(f"Livestock {livestock_id} not available (have {_to_decimal(soh.quantity)})")
-
-        # compute livestock book value (we assume avg_cost stored as per-head book value)
-        livestock_book_value = _to_decimal(soh.avg_cost)
-
-        # 2) outflow livestock (1 head)
-        out_result = apply_outflow(
-            session=session,
-            item_type="livestock",
-            item_id=livestock_id,
-            location_id=location_id,
-            qty=1,
-            ref_table="slaughter",
-            ref_id=livestock_id,
-            user_id=user_id
-        )
-        removed_total_cost = _to_decimal(out_result["removed_total_cost"])
-
-        # Note: removed_total_cost should match livestock_book_value (or be very close).
-        # If not identical, we still allocate removed_total_cost to meat.
-        total_value_to_allocate = removed_total_cost + processing_fee
-
-        # 3) compute meat unit cost
-        meat_unit_cost = (total_value_to_allocate / carcass_qty) if carcass_qty > 0 else Decimal("0")
-        meat_unit_cost = _round(meat_unit_cost, 4)
-
-        # 4) inflow meat inventory
-        inflow_result = apply_inflow(
-            session=session,
-            item_type="inventory_item",
-            item_id=meat_inventory_item_id,
-            location_id=location_id,
-            qty=carcass_qty,
-            unit_cost=meat_unit_cost,
-            ref_table="slaughter",
-            ref_id=livestock_id,
-            user_id=user_id
-        )
-
-        # 5) create exit record for livestock (optional if your app uses Exit)
-        exit_rec = models.Exit(
-            livestock_id = livestock_id,
-            exit_type = "slaughter",
-            reason = f"Slaughtered into inventory {meat_inventory_item_id}",
-            created_at = datetime.utcnow()
-        )
-        session.add(exit_rec)
+    # 1) outflow livestock (1 head); raises if the animal isn't on hand
+    out_result = apply_outflow(
+        session=session,
+        item_type=LIVESTOCK,
+        item_id=livestock_id,
+        location_id=location_id,
+        qty=1,
+        ref_table="slaughter",
+        ref_id=livestock_id,
+    )
+    removed_total_cost = out_result["total_cost"]
+    total_value_to_allocate = removed_total_cost + processing_fee
+
+    # 2) inflow meat inventory
+    meat_unit_cost = _round(total_value_to_allocate / carcass_qty)
+    apply_inflow(
+        session=session,
+        item_type=INVENTORY_ITEM,
+        item_id=meat_inventory_item_id,
+        location_id=location_id,
+        qty=carcass_qty,
+        unit_cost=meat_unit_cost,
+        ref_table="slaughter",
+        ref_id=livestock_id,
+    )
 
-        # 6) mark livestock availability / lifecycle event / event_date
-        session.query(models.Livestock).filter(models.Livestock.id == livestock_id).update({
-            "availability": "slaughtered",
-            "lifecycle_event": "slaughter",
-            "event_date": date.today()
-        })
+    # 3) exit record + lifecycle fields
+    exit_rec = models.Exit(
+        livestock_id = livestock_id,
+        exit_type = "slaughter",
+        reason = f"Slaughtered into inventory {meat_inventory_item_id}",
+        created_at = datetime.utcnow()
+    )
+    session.add(exit_rec)
+    session.execute(
+        update(models.Livestock)
+        .where(models.Livestock.id == livestock_id)
+        .values(availability="slaughtered", lifecycle_event="slaughter", event_date=date.today())
+    )
 
-        # 7) create journal entry to move book value from livestock inventory -> meat inventory
-        lines = []
-        # Debit Meat inventory (increase asset)
-        lines.append({
+    # 4) journal entry moving book value from livestock inventory -> meat inventory
+    lines = [
+        {
             "account_code": "INV-MEAT",  # replace with your actual account codes
-            "debit": float(total_value_to_allocate),
+            "debit": total_value_to_allocate,
             "credit": 0,
             "narration": f"Add meat stock from livestock {livestock_id}"
-        })
-        # Credit Livestock inventory (decrease asset)
-        lines.append({
+        },
+        {
             "account_code": "INV-LIVESTOCK",
             "debit": 0,
-            "credit": float(removed_total_cost),
+            "credit": removed_total_cost,
             "narration": f"Remove livestock {livestock_id} from inventory"
+        },
+    ]
+    # the processing fee is capitalised into the meat; it's owed to cash/AP
+    if processing_fee > 0:
+        lines.append({
+            "account_code": "CASH-OR-AP",
+            "debit": 0,
+            "credit": processing_fee,
+            "narration": "Processing fee for slaughter"
         })
-        # If processing_fee exists, record it as expense (debit processing expense, credit AP/Cash)
-        if processing_fee > 0:
-            lines.append({
-                "account_code": "PROCESSING-EXP",
-                "debit": float(processing_fee),
-                "credit": 0,
-                "narration": "Processing fee for slaughter"
-            })
-            lines.append({
-                "account_code": "CASH-OR-AP",
-                "debit": 0,
-                "credit": float(processing_fee),
-                "narration": "Processing fee payment"
-            })
-
-        je_id = create_journal_entry(
-            session=session,
-            journal_date = date.today(),
-            description = f"Slaughter livestock {livestock_id} -> meat_item {meat_inventory_item_id}",
-            lines = lines,
-            ref_type = "slaughter",
-            ref_id = livestock_id,
-            user_id = user_id
-        )
+
+    je_id = create_journal_entry(
+        session=session,
+        journal_date = date.today(),
+        description = f"Slaughter livestock {livestock_id} -> meat_item {meat_inventory_item_id}",
+        lines = lines,
+        ref_type = "slaughter",
+        ref_id = livestock_id,
+        user_id = user_id
+    )
+    session.flush()
 
     return {
         "livestock_id": livestock_id,
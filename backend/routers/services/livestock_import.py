@@ -0,0 +1,316 @@
+# services/livestock_import.py
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import Integer, String, any_, bindparam, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+import models
+
+REQUIRED_COLUMNS = ["tag_number", "species_id", "category_id", "owner_id", "location_id", "sex", "dob", "castrated"]
+
+# column -> model whose ids the column must reference
+REFERENCE_COLUMNS = {
+    "species_id": models.Species,
+    "category_id": models.Category,
+    "owner_id": models.Owner,
+    "location_id": models.Location,
+}
+
+BATCH_SIZE = 1000  # rows per multi-row INSERT
+CHUNK_SIZE = 5000  # rows parsed from the upload at a time
+
+TRUE_VALUES = {"true", "1", "1.0", "yes", "y", "t"}
+
+
+# ---- Utility helpers ----
+def _existing_values(db: Session, column, values: List, value_type) -> set:
+    """Return the subset of `values` already present in `column` (single round trip)."""
+    if not values:
+        return set()
+    param = bindparam("values", value=list(values), type_=ARRAY(value_type))
+    return set(db.execute(select(column).where(column == any_(param))).scalars())
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def iter_upload_frames(fileobj, filename: str, chunksize: int = CHUNK_SIZE):
+    """
+    Yield the uploaded sheet as DataFrames of at most `chunksize` rows.
+    CSV is parsed with pandas' chunked reader and XLSX with openpyxl's read-only
+    row iterator, so the whole file is never held in memory. Legacy .xls has no
+    streaming reader and is loaded in one piece.
+    Frame indexes continue across chunks so row numbers stay file-relative.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        # read tags as text so a blank cell in a chunk doesn't turn "1001" into "1001.0"
+        yield from pd.read_csv(fileobj, chunksize=chunksize, dtype={"tag_number": str})
+    elif name.endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [str(h).strip() if h is not None else "" for h in header]
+            start, buffer = 0, []
+            for values in rows:
+                buffer.append(values[:len(header)])
+                if len(buffer) >= chunksize:
+                    yield pd.DataFrame(buffer, columns=header, index=range(start, start + len(buffer)))
+                    start, buffer = start + len(buffer), []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header, index=range(start, start + len(buffer)))
+        finally:
+            wb.close()
+    elif name.endswith(".xls"):
+        yield pd.read_excel(fileobj)
+    else:
+        raise ValueError("Invalid file type. Upload CSV or Excel.")
+
+
+def stream_upload(
+    fileobj,
+    filename: str,
+    prepare: Callable[[pd.DataFrame], pd.DataFrame],
+    import_frame: Callable[[pd.DataFrame], Dict[str, Any]],
+    chunksize: int = CHUNK_SIZE,
+    on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Feed each chunk of an upload through prepare then import_frame and sum
+    the per-chunk summaries (rows/created/skipped/errors plus results).
+    import_frame carries any cross-chunk state (seen tags/names) itself.
+    on_chunk, if given, receives each chunk's summary (used for progress).
+    """
+    started = time.perf_counter()
+    summary = {"rows": 0, "created": 0, "skipped": 0, "errors": 0, "results": []}
+
+    for frame in iter_upload_frames(fileobj, filename, chunksize):
+        chunk = import_frame(prepare(frame))
+        for key in ("rows", "created", "skipped", "errors"):
+            summary[key] += chunk[key]
+        summary["results"].extend(chunk["results"])
+        if on_chunk:
+            on_chunk(chunk)
+
+    elapsed = time.perf_counter() - started
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = round(summary["rows"] / elapsed, 1) if elapsed > 0 else None
+    return summary
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalise an uploaded sheet with vectorized pandas operations.
+    Keeps the original index so results can point back at spreadsheet rows.
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    df = df.dropna(how="all").copy()
+
+    df["tag_number"] = df["tag_number"].fillna("").astype(str).str.strip()
+    for col in REFERENCE_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+
+    sex = df["sex"].fillna("").astype(str).str.strip().str.capitalize()
+    df["sex"] = sex.where(sex != "", None)
+
+    raw_dob = df["dob"]
+    df["dob"] = pd.to_datetime(raw_dob, errors="coerce")
+    df["dob_invalid"] = df["dob"].isna() & raw_dob.notna() & (raw_dob.astype(str).str.strip() != "")
+
+    castrated = df["castrated"]
+    if castrated.dtype == bool:
+        df["castrated"] = castrated
+    elif pd.api.types.is_numeric_dtype(castrated):
+        # 1/0 with a blank cell is read as float, and "1.0" isn't a TRUE_VALUE
+        df["castrated"] = castrated.fillna(0) != 0
+    else:
+        df["castrated"] = castrated.fillna("").astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+
+    return df
+
+
+# ---- Set-based import ----
+def import_livestock_frame(
+    db: Session,
+    df: pd.DataFrame,
+    source: str = "bulk-upload",
+    seen_tags: Optional[set] = None,
+    include_accepted: bool = False,
+) -> Dict[str, Any]:
+    """
+    Register every valid row of a prepared frame (see prepare_frame).
+
+    One tag-existence probe and one id probe per reference table for the whole
+    frame, then Livestock, 'registered' events and IN movements are written with
+    multi-row INSERTs of BATCH_SIZE rows. Nothing is committed here: the caller
+    owns the transaction.
+
+    seen_tags carries tags from earlier frames of the same file so duplicates
+    across chunks are reported as such; it is updated in place.
+
+    Returns counts and throughput, with per-row results for skipped and error
+    rows only; include_accepted=True lists accepted rows as well.
+    """
+    started = time.perf_counter()
+
+    results: Dict[int, Dict[str, Any]] = {}
+    tags = df["tag_number"]
+    seen_tags = set() if seen_tags is None else seen_tags
+
+    existing_tags = _existing_values(db, models.Livestock.tag_number, tags[tags != ""].unique().tolist(), String)
+    known_ids = {
+        col: _existing_values(db, model.id, [int(v) for v in df[col].dropna().unique()], Integer)
+        for col, model in REFERENCE_COLUMNS.items()
+    }
+
+    duplicated_in_file = (tags.duplicated(keep="first") | tags.isin(seen_tags)) & (tags != "")
+    seen_tags.update(tags[tags != ""])
+
+    created = 0
+    pending = []
+    for row in df.itertuples():
+        row_no = int(row.Index) + 2  # header is spreadsheet row 1
+        tag = row.tag_number
+
+        if not tag:
+            results[row_no] = {"row": row_no, "tag_number": None, "status": "error", "detail": "Missing tag_number"}
+            continue
+        if duplicated_in_file[row.Index]:
+            results[row_no] = {"row": row_no, "tag_number": tag, "status": "skipped", "detail": "Duplicate tag in file"}
+            continue
+        if tag in existing_tags:
+            results[row_no] = {"row": row_no, "tag_number": tag, "status": "skipped", "detail": "Tag already registered"}
+            continue
+        if row.dob_invalid:
+            results[row_no] = {"row": row_no, "tag_number": tag, "status": "error", "detail": "Invalid dob"}
+            continue
+
+        values = {}
+        unknown = None
+        for col in REFERENCE_COLUMNS:
+            value = getattr(row, col)
+            value = None if pd.isna(value) else int(value)
+            if value is not None and value not in known_ids[col]:
+                unknown = f"Unknown {col} {value}"
+                break
+            values[col] = value
+        if unknown:
+            results[row_no] = {"row": row_no, "tag_number": tag, "status": "error", "detail": unknown}
+            continue
+
+        pending.append((row_no, {
+            "tag_number": tag,
+            **values,
+            "sex": row.sex,
+            "dob": None if pd.isna(row.dob) else row.dob.date(),
+            "castrated": bool(row.castrated),
+            "availability": "active",
+        }))
+
+    today = datetime.utcnow().date()
+    now = datetime.utcnow()
+    row_by_tag = {values["tag_number"]: row_no for row_no, values in pending}
+
+    # Core inserts skip the livestock_state mapper listeners, so the
+    # current-state columns are written together with the animal
+    for _, values in pending:
+        values.update(
+            last_event_type="registered",
+            last_event_date=today,
+            last_movement_type="IN",
+            last_movement_date=today,
+            current_location=str(values["location_id"]),
+        )
+
+    for batch in _chunks([values for _, values in pending], BATCH_SIZE):
+        # executemany + RETURNING is sent as multi-row INSERT ... VALUES (...), (...) RETURNING
+        inserted = db.execute(
+            insert(models.Livestock)
+            .returning(models.Livestock.id, models.Livestock.tag_number, models.Livestock.location_id),
+            batch,
+        ).all()
+
+        db.execute(insert(models.LivestockEvent), [
+            {
+                "livestock_id": r.id,
+                "event_type": "registered",
+                "event_date": today,
+                "notes": "Bulk registration",
+                "created_at": now,
+            }
+            for r in inserted
+        ])
+        db.execute(insert(models.LivestockMovement), [
+            {
+                "livestock_id": r.id,
+                "movement_type": "IN",
+                "source": source,
+                "destination": str(r.location_id),
+                "movement_date": today,
+                "notes": f"Bulk registered {r.tag_number}",
+            }
+            for r in inserted
+        ])
+
+        created += len(inserted)
+        if include_accepted:
+            for r in inserted:
+                row_no = row_by_tag[r.tag_number]
+                results[row_no] = {"row": row_no, "tag_number": r.tag_number, "status": "accepted", "livestock_id": r.id}
+
+    elapsed = time.perf_counter() - started
+    rows = [results[k] for k in sorted(results)]
+    total = len(rows) if include_accepted else len(rows) + created
+
+    return {
+        "rows": total,
+        "created": created,
+        "skipped": sum(1 for r in rows if r["status"] == "skipped"),
+        "errors": sum(1 for r in rows if r["status"] == "error"),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(total / elapsed, 1) if elapsed > 0 else None,
+        "results": rows,
+    }
+
+
+def import_livestock_upload(
+    db: Session,
+    fileobj,
+    filename: str,
+    source: str = "bulk-upload",
+    include_accepted: bool = False,
+    chunksize: int = CHUNK_SIZE,
+    on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream an uploaded CSV/XLSX through prepare_frame and import_livestock_frame
+    one chunk at a time, all inside the caller's transaction.
+    on_chunk, if given, receives each chunk's summary (used for progress).
+    Raises ValueError for unsupported files or missing columns.
+
+    Memory is one chunk of rows plus O(distinct tags in the file): seen_tags
+    keeps every tag to catch duplicates across chunks, and results keep only
+    skipped and error rows unless include_accepted (then O(rows)).
+    """
+    seen_tags: set = set()
+    return stream_upload(
+        fileobj, filename, prepare_frame,
+        lambda df: import_livestock_frame(
+            db, df, source=source, seen_tags=seen_tags, include_accepted=include_accepted
+        ),
+        chunksize=chunksize, on_chunk=on_chunk,
+    )
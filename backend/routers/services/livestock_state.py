@@ -0,0 +1,115 @@
+# services/livestock_state.py
+"""
+Keeps the denormalized current-state columns on Livestock (last_event_*,
+last_movement_*, current_location) in step with the event and movement logs.
+
+ORM writes are covered by the mapper listeners below, which update the animal
+inside the same flush/transaction. Core bulk inserts (see livestock_import)
+bypass mapper events and must set the columns themselves.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import event, or_, select, update
+
+import models
+
+L = models.Livestock
+E = models.LivestockEvent
+M = models.LivestockMovement
+
+
+# ---- Incremental updates (called per inserted row) ----
+def _apply_event(connection, target):
+    # a back-dated event must not replace a newer one
+    connection.execute(
+        update(L)
+        .where(L.id == target.livestock_id)
+        .where(or_(L.last_event_date.is_(None), L.last_event_date <= target.event_date))
+        .values(last_event_type=target.event_type, last_event_date=target.event_date)
+    )
+
+
+def _apply_movement(connection, target):
+    connection.execute(
+        update(L)
+        .where(L.id == target.livestock_id)
+        .where(or_(L.last_movement_date.is_(None), L.last_movement_date <= target.movement_date))
+        .values(
+            last_movement_type=target.movement_type,
+            last_movement_date=target.movement_date,
+            current_location=None if target.destination is None else str(target.destination),
+        )
+    )
+
+
+# ---- Full recompute ----
+def refresh_current_state(connection, livestock_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the current-state columns from the logs with two set-based
+    UPDATEs (DISTINCT ON per animal). Restricted to livestock_ids if given,
+    otherwise every animal is refreshed (backfill). Returns animals touched.
+    """
+    ids = None if livestock_ids is None else list(livestock_ids)
+    if ids == []:
+        return 0
+
+    last_event = select(E.livestock_id, E.event_type, E.event_date)
+    last_move = select(M.livestock_id, M.movement_type, M.movement_date, M.destination)
+    if ids is not None:
+        last_event = last_event.where(E.livestock_id.in_(ids))
+        last_move = last_move.where(M.livestock_id.in_(ids))
+    last_event = (
+        last_event.distinct(E.livestock_id)
+        .order_by(E.livestock_id, E.event_date.desc(), E.id.desc())
+        .subquery()
+    )
+    last_move = (
+        last_move.distinct(M.livestock_id)
+        .order_by(M.livestock_id, M.movement_date.desc(), M.id.desc())
+        .subquery()
+    )
+
+    # clear first so animals whose last log row was deleted don't keep stale values
+    clear = update(L).values(
+        last_event_type=None, last_event_date=None,
+        last_movement_type=None, last_movement_date=None, current_location=None,
+    )
+    if ids is not None:
+        clear = clear.where(L.id.in_(ids))
+    touched = connection.execute(clear).rowcount
+
+    connection.execute(
+        update(L)
+        .where(L.id == last_event.c.livestock_id)
+        .values(last_event_type=last_event.c.event_type, last_event_date=last_event.c.event_date)
+    )
+    connection.execute(
+        update(L)
+        .where(L.id == last_move.c.livestock_id)
+        .values(
+            last_movement_type=last_move.c.movement_type,
+            last_movement_date=last_move.c.movement_date,
+            current_location=last_move.c.destination,
+        )
+    )
+    return touched
+
+
+# ---- Mapper listeners ----
+@event.listens_for(E, "after_insert")
+def _event_inserted(mapper, connection, target):
+    _apply_event(connection, target)
+
+
+@event.listens_for(M, "after_insert")
+def _movement_inserted(mapper, connection, target):
+    _apply_movement(connection, target)
+
+
+@event.listens_for(E, "after_update")
+@event.listens_for(E, "after_delete")
+@event.listens_for(M, "after_update")
+@event.listens_for(M, "after_delete")
+def _log_changed(mapper, connection, target):
+    # edits and deletes can move "latest" backwards; recompute the one animal
+    refresh_current_state(connection, [target.livestock_id])
@@ -0,0 +1,39 @@
+# services/purchase_order_state.py
+"""
+Shared by receiving (inventory_receipts) and PO edits (purchase_orders):
+both lock the PO row first, so a receipt and an edit of the same order
+apply one after the other, and both derive partial/received from the
+lines' received quantities the same way.
+"""
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import models
+
+Status = models.PurchaseOrderStatus
+
+
+def lock_order(db: Session, order_id: int) -> Optional[models.PurchaseOrder]:
+    """The PO row FOR UPDATE, or None if there is no such order."""
+    return db.execute(
+        select(models.PurchaseOrder).where(models.PurchaseOrder.id == order_id).with_for_update()
+    ).scalar_one_or_none()
+
+
+def roll_up_status(order: models.PurchaseOrder, lines: Iterable[Tuple[int, Optional[int]]]):
+    """
+    Set order.status from its (quantity, quantity_received) lines: received
+    when every line is covered, partial when anything was received. An order
+    with nothing received can't be partial/received and drops back to
+    ordered; draft and ordered are otherwise left as the user set them.
+    """
+    lines = [(quantity, received or 0) for quantity, received in lines]
+    status = Status(order.status) if isinstance(order.status, str) else order.status
+    if lines and all(received >= quantity for quantity, received in lines):
+        order.status = Status.received
+    elif any(received for _, received in lines):
+        order.status = Status.partial
+    elif status in (Status.partial, Status.received):
+        order.status = Status.ordered
@@ -0,0 +1,221 @@
+# services/report_render.py
+"""
+PDF rendering for /reports/livestock, off the request path.
+
+Renders run in a process pool: WeasyPrint is CPU-bound and would otherwise
+hold the GIL of an API worker. Each pool process compiles the Jinja template
+and encodes the logo once, in the pool initializer.
+
+Finished PDFs are cached on disk under a key hashed from the herd's data
+version (see livestock_report.report_version) plus the template and logo, so
+an unchanged herd is served from cache by every API worker sharing
+REPORT_CACHE_DIR without reading the herd. A cache hit touches the PDF, so
+its mtime is when it was last served. After a response that started a
+render, evict() drops PDFs unused for REPORT_CACHE_MAX_AGE and all but the
+newest REPORT_CACHE_MAX_FILES, sparing anything served in the last
+REPORT_CACHE_IN_USE_GRACE seconds: another request may still be streaming
+it. This module must not import database/models: spawned pool processes
+import it on their own.
+"""
+import base64
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEMPLATES_DIR = os.path.join(BACKEND_DIR, "templates")
+TEMPLATE_NAME = "livestock_report.html"
+LOGO_PATH = os.path.join(BACKEND_DIR, "static", "logo.png")
+
+CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "farm-report-cache"))
+RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+CACHE_MAX_AGE = int(os.getenv("REPORT_CACHE_MAX_AGE", "86400"))  # seconds
+CACHE_MAX_FILES = int(os.getenv("REPORT_CACHE_MAX_FILES", "50"))
+CACHE_IN_USE_GRACE = int(os.getenv("REPORT_CACHE_IN_USE_GRACE", "300"))  # seconds
+FAILURE_TTL = 600  # seconds a failed render stays reportable if nobody polls it
+
+_executor: Optional[ProcessPoolExecutor] = None
+# reentrant: a future that is already done runs its callback inside submit()
+_lock = threading.RLock()
+# cache key -> render in flight; finished renders live on disk
+_jobs: Dict[str, Future] = {}
+# cache key -> (error, monotonic time) of a failed render, until status() reports it
+_failed: Dict[str, Tuple[str, float]] = {}
+
+# per pool process, set by _init_worker
+_template = None
+_logo_data_uri = ""
+
+
+# ---- Assets ----
+def _read_bytes(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+@lru_cache(maxsize=1)
+def asset_digest() -> str:
+    """Hash of the template and logo; part of every cache key."""
+    digest = hashlib.sha256()
+    digest.update(_read_bytes(os.path.join(TEMPLATES_DIR, TEMPLATE_NAME)))
+    digest.update(_read_bytes(LOGO_PATH))
+    return digest.hexdigest()
+
+
+def _init_worker():
+    global _template, _logo_data_uri
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape(["html", "xml"]))
+    _template = env.get_template(TEMPLATE_NAME)
+    logo = _read_bytes(LOGO_PATH)
+    # embedded as a data URI so it works inside Docker
+    _logo_data_uri = f"data:image/png;base64,{base64.b64encode(logo).decode('ascii')}" if logo else ""
+
+
+def _render(key: str, context: Dict[str, Any]) -> str:
+    """Pool entry point: render context to CACHE_DIR/<key>.pdf and return the path."""
+    from weasyprint import HTML
+
+    html = _template.render(logo_path=_logo_data_uri, **context)
+    path = cache_path(key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    HTML(string=html).write_pdf(tmp)
+    os.replace(tmp, path)  # readers never see a half-written file
+    return path
+
+
+# ---- Cache ----
+def cache_key(version: Dict[str, Any]) -> str:
+    raw = json.dumps(version, sort_keys=True, default=str, separators=(",", ":")).encode()
+    return hashlib.sha256(asset_digest().encode() + raw).hexdigest()
+
+
+def cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.pdf")
+
+
+def cached(key: str) -> Optional[str]:
+    """The PDF's path if it's cached, touched so evict() leaves it alone while it's served."""
+    path = cache_path(key)
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def evict():
+    """
+    Drop PDFs unused for CACHE_MAX_AGE, then the least recently used beyond
+    CACHE_MAX_FILES; also stale temp files. Nothing touched within
+    CACHE_IN_USE_GRACE is removed. Meant to run after a response is sent.
+    """
+    now = time.time()
+    cutoff, in_use = now - CACHE_MAX_AGE, now - CACHE_IN_USE_GRACE
+    pdfs = []
+    try:
+        entries = list(os.scandir(CACHE_DIR))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            mtime = entry.stat().st_mtime
+            if mtime < min(cutoff, in_use):
+                os.remove(entry.path)
+            elif entry.name.endswith(".pdf"):
+                pdfs.append((mtime, entry.path))
+        except OSError:
+            pass  # removed by another worker's pass
+    pdfs.sort(reverse=True)
+    for mtime, path in pdfs[CACHE_MAX_FILES:]:
+        if mtime >= in_use:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# ---- Queue ----
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: API workers hold threads and open DB sockets
+        _executor = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def submit(key: str, context: Dict[str, Any]) -> Future:
+    """
+    Future resolving to the PDF path for key. Served from cache when present;
+    concurrent requests for the same key share one render.
+    """
+    with _lock:
+        path = cached(key)
+        if path:
+            done: Future = Future()
+            done.set_result(path)
+            return done
+
+        future = _jobs.get(key)
+        if future is not None and not future.done():
+            return future
+
+        _failed.pop(key, None)
+        now = time.monotonic()
+        for stale in [k for k, (_, at) in _failed.items() if now - at > FAILURE_TTL]:
+            del _failed[stale]
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        try:
+            future = _get_executor().submit(_render, key, context)
+        except BrokenProcessPool:
+            # a render process that died (OOM, segfault) poisons the pool; start a fresh one
+            shutdown()
+            future = _get_executor().submit(_render, key, context)
+        _jobs[key] = future
+        future.add_done_callback(lambda f: _finished(key, f))
+        return future
+
+
+def _finished(key: str, future: Future):
+    # successes are on disk; a failure is kept (as text) until status() reports it once
+    with _lock:
+        if _jobs.get(key) is future:
+            del _jobs[key]
+        if not future.cancelled() and future.exception() is not None:
+            _failed[key] = (str(future.exception()), time.monotonic())
+
+
+def status(key: str) -> Dict[str, Any]:
+    if cached(key):
+        return {"id": key, "status": "ready", "error": None}
+    with _lock:
+        if key in _jobs:
+            return {"id": key, "status": "running", "error": None}
+        failure = _failed.pop(key, None)
+    if failure is not None:
+        return {"id": key, "status": "failed", "error": failure[0]}
+    return {"id": key, "status": "unknown", "error": None}
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
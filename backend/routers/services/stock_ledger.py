@@ -0,0 +1,175 @@
+# services/stock_ledger.py
+"""
+Stock levels from the inventory_movements ledger without summing all of it.
+
+A StockCheckpoint holds quantity and value per (store, item) over every
+movement up to through_movement_id. Levels are read as that checkpoint plus
+the movements after it (the tail), so a read only touches the checkpoint rows
+and the tail, however long the ledger gets. Checkpoints are rolled forward
+periodically (checkpoint_stock_ledger.py from cron, or
+POST /inventory/stock/checkpoints); each new one is the previous one plus the
+tail. The ledger is append-only; if movements are edited or deleted, take a
+rebuild checkpoint.
+
+Movement ids are handed out before commit, so a transaction still in flight
+can hold an id below MAX(id). Taking a checkpoint locks inventory_movements
+IN SHARE MODE: it waits for in-flight writers and holds new ones off until
+the checkpoint commits, so MAX(id) is a real boundary. Only the tail is
+summed under the lock.
+
+The same boundary holds in time: movements and checkpoints are stamped with
+clock_timestamp() when the row is written, which for a blocked writer is
+after the checkpoint commits. A movement is in a checkpoint exactly when it
+is older than the checkpoint, which is what stock_as_of relies on.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, literal, not_, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+import models
+
+C = models.StockCheckpoint
+B = models.StockCheckpointBalance
+M = models.InventoryMovement
+Item = models.InventoryItem
+
+CHECKPOINTS_KEPT = 3
+LEDGER_CLOCK = text("(clock_timestamp() AT TIME ZONE 'utc')")
+
+# value a movement carries in or out; legacy rows without a cost count as 0
+_movement_value = M.quantity * func.coalesce(M.unit_cost, 0)
+
+
+def _latest_checkpoint(before_id: Optional[int] = None):
+    latest = select(C.id, C.through_movement_id)
+    if before_id is not None:
+        latest = latest.where(C.id < before_id)
+    return latest.order_by(C.id.desc()).limit(1).cte("latest")
+
+
+def _checkpoint_plus_tail(store_id: Optional[int] = None, latest=None):
+    """(location_id, item_id, quantity, value) rows: latest checkpoint balances, then every later movement."""
+    latest = _latest_checkpoint() if latest is None else latest
+    snapshot = select(B.location_id, B.item_id, B.quantity, B.value).join(latest, B.checkpoint_id == latest.c.id)
+    after_id = func.coalesce(select(latest.c.through_movement_id).scalar_subquery(), 0)
+    tail = select(M.location_id, M.item_id, M.quantity, _movement_value).where(M.id > after_id)
+    if store_id is not None:
+        snapshot = snapshot.where(B.location_id == store_id)
+        tail = tail.where(M.location_id == store_id)
+    return union_all(snapshot, tail).subquery("ledger")
+
+
+def stock_levels(db: Session, store_id: Optional[int] = None) -> List[dict]:
+    """
+    Quantity per item, at one store or summed over all of them, in one query.
+    Items that ever moved are listed even at zero, as the ledger sum did.
+    """
+    ledger = _checkpoint_plus_tail(store_id)
+    rows = db.execute(
+        select(
+            Item.id.label("item_id"),
+            Item.name.label("item_name"),
+            func.sum(ledger.c.quantity).label("quantity_on_hand"),
+        )
+        .join(ledger, ledger.c.item_id == Item.id)
+        .group_by(Item.id, Item.name)
+        .order_by(Item.id)
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
+def stock_as_of(at: datetime, store_id: Optional[int] = None, item_id: Optional[int] = None):
+    """
+    Statement for quantity and value per (store, item) after every movement
+    up to `at` (UTC): the last checkpoint taken at or before `at`, plus the
+    movements after it stamped no later than `at`. Those all sit below the
+    next checkpoint's through_movement_id, so the replay is an id range no
+    longer than one checkpoint interval, whatever the ledger's length.
+    Rows that net to nothing are left out.
+    """
+    base = (
+        select(C.id, C.through_movement_id)
+        .where(C.created_at <= at)
+        .order_by(C.id.desc())
+        .limit(1)
+        .cte("base")
+    )
+    next_through = (
+        select(C.through_movement_id).where(C.created_at > at).order_by(C.id).limit(1).scalar_subquery()
+    )
+    snapshot = select(B.location_id, B.item_id, B.quantity, B.value).join(base, B.checkpoint_id == base.c.id)
+    replay = select(M.location_id, M.item_id, M.quantity, _movement_value).where(
+        M.id > func.coalesce(select(base.c.through_movement_id).scalar_subquery(), 0),
+        M.id <= func.coalesce(next_through, select(func.max(M.id)).scalar_subquery()),
+        M.created_at <= at,
+    )
+    if store_id is not None:
+        snapshot = snapshot.where(B.location_id == store_id)
+        replay = replay.where(M.location_id == store_id)
+    if item_id is not None:
+        snapshot = snapshot.where(B.item_id == item_id)
+        replay = replay.where(M.item_id == item_id)
+    ledger = union_all(snapshot, replay).subquery("ledger")
+
+    quantity = func.sum(ledger.c.quantity)
+    value = func.sum(ledger.c.value)
+    return (
+        select(
+            ledger.c.location_id.label("store_id"),
+            models.Store.name.label("store_name"),
+            ledger.c.item_id,
+            Item.name.label("item_name"),
+            quantity.label("quantity"),
+            value.label("value"),
+        )
+        .join(Item, Item.id == ledger.c.item_id)
+        .outerjoin(models.Store, models.Store.id == ledger.c.location_id)
+        .group_by(ledger.c.location_id, models.Store.name, ledger.c.item_id, Item.name)
+        .having(or_(quantity != 0, value != 0))
+        .order_by(ledger.c.location_id, ledger.c.item_id)
+    )
+
+
+def create_checkpoint(db: Session, keep: int = CHECKPOINTS_KEPT, rebuild: bool = False) -> models.StockCheckpoint:
+    """
+    Roll the latest checkpoint forward to the current end of the ledger.
+    rebuild=True re-sums the whole ledger instead, for after movements were
+    edited or deleted behind a checkpoint.
+
+    Keeps the newest `keep` checkpoints plus the last one of every month, so
+    as-of reports always have a checkpoint within a month of their date.
+    Commits: the SHARE lock on inventory_movements blocks writers until then.
+    """
+    db.execute(text("LOCK TABLE inventory_movements IN SHARE MODE"))
+    through = db.execute(select(func.coalesce(func.max(M.id), 0))).scalar_one()
+
+    checkpoint = models.StockCheckpoint(through_movement_id=through, created_at=LEDGER_CLOCK)
+    db.add(checkpoint)
+    db.flush()
+
+    # ids start at 1, so "before 1" is no checkpoint at all: the tail is the whole ledger
+    ledger = _checkpoint_plus_tail(latest=_latest_checkpoint(before_id=1 if rebuild else checkpoint.id))
+    db.execute(
+        insert(B).from_select(
+            ["checkpoint_id", "location_id", "item_id", "quantity", "value"],
+            select(
+                literal(checkpoint.id), ledger.c.location_id, ledger.c.item_id,
+                func.sum(ledger.c.quantity), func.sum(ledger.c.value),
+            )
+            .group_by(ledger.c.location_id, ledger.c.item_id),
+        )
+    )
+    checkpoint.balance_count = db.execute(
+        select(func.count()).select_from(B).where(B.checkpoint_id == checkpoint.id)
+    ).scalar_one()
+
+    newest = select(C.id).order_by(C.id.desc()).limit(max(keep, 1))
+    month_ends = select(func.max(C.id)).group_by(func.date_trunc("month", C.created_at))
+    db.execute(
+        delete(C).where(not_(or_(C.id.in_(newest.scalar_subquery()), C.id.in_(month_ends.scalar_subquery()))))
+    )  # balances go with them (ON DELETE CASCADE)
+    db.commit()
+    db.refresh(checkpoint)
+    return checkpoint
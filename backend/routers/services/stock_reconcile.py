@@ -0,0 +1,205 @@
+# services/stock_reconcile.py
+"""
+Reconciles the cached stock balances against the inventory_movements ledger,
+which is the source of truth:
+
+- stock_on_hand.quantity per (item, store) against the ledger sum there
+- inventory_items.quantity_on_hand against the item's ledger total
+- open cost_history layers per (item, store) against stock_on_hand (reported
+  only: a wrong layer set can't be rebuilt from quantities alone)
+
+Work is split into item-id partitions (reconcile_partition) so
+reconcile_stock.py can run them across a process pool; each partition is
+one short transaction.
+
+Until 0010 the ledger stored quantities as integers and rounded fractional
+movements, so where a key still has such rows (pre_fractional, see 0013)
+the cached balance is the exact figure and the ledger is not: differences
+under one unit there are reported but never repaired. Every other key must
+match the ledger exactly.
+
+Report mode reads under one REPEATABLE READ snapshot, so a movement that
+commits mid-check can't show up as a false discrepancy. Repair mode locks the
+partition's stock_on_hand rows (item, store order, as the costing engine
+does) and then its items before reading, so no engine write for those keys
+is in flight while balances are overwritten.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlalchemy import Boolean, Integer, Numeric, bindparam, cast, exists, func, null, or_, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+
+import database
+import models
+from routers.services.inventory_service import INVENTORY_ITEM
+
+M = models.InventoryMovement
+S = models.StockOnHand
+CH = models.CostHistory
+Item = models.InventoryItem
+
+# on keys with pre-0010 ledger rows, differences smaller than this may be that rounding
+ROUNDING_TOLERANCE = Decimal("1")
+
+
+def _rounding_only(a, b, pre_fractional: bool) -> bool:
+    return pre_fractional and abs(Decimal(a) - Decimal(b)) < ROUNDING_TOLERANCE
+
+
+def _store_balances(lo: int, hi: int):
+    """
+    Per (item, store): ledger qty/value and whether any of it is pre-0010,
+    stock_on_hand row and qty, open layer qty; mismatches only.
+    """
+    ledger = (
+        select(M.item_id, M.location_id, func.sum(M.quantity).label("qty"),
+               func.sum(M.quantity * func.coalesce(M.unit_cost, 0)).label("value"),
+               func.bool_or(M.pre_fractional).label("pre_fractional"))
+        .where(M.item_id >= lo, M.item_id < hi)
+        .group_by(M.item_id, M.location_id)
+    )
+    soh = (
+        select(S.item_id, S.location_id, S.id, S.quantity)
+        .where(S.item_type == INVENTORY_ITEM, S.item_id >= lo, S.item_id < hi)
+    )
+    layers = (
+        select(CH.item_id, CH.location_id, func.sum(CH.remaining_qty).label("qty"))
+        .where(CH.item_type == INVENTORY_ITEM, CH.remaining_qty > 0, CH.item_id >= lo, CH.item_id < hi)
+        .group_by(CH.item_id, CH.location_id)
+    )
+    ledger, soh, layers = ledger.subquery(), soh.subquery(), layers.subquery()
+    no_id, no_qty, no_flag = cast(null(), Integer), cast(null(), Numeric), cast(null(), Boolean)
+    keyed = union_all(
+        select(ledger.c.item_id, ledger.c.location_id, ledger.c.qty.label("ledger_qty"), ledger.c.value.label("ledger_value"),
+               ledger.c.pre_fractional, no_id.label("soh_id"), no_qty.label("soh_qty"), no_qty.label("layer_qty")),
+        select(soh.c.item_id, soh.c.location_id, no_qty, no_qty, no_flag, soh.c.id, soh.c.quantity, no_qty),
+        select(layers.c.item_id, layers.c.location_id, no_qty, no_qty, no_flag, no_id, no_qty, layers.c.qty),
+    ).subquery("keyed")
+
+    ledger_qty = func.coalesce(func.sum(keyed.c.ledger_qty), 0)
+    soh_qty = func.coalesce(func.sum(keyed.c.soh_qty), 0)
+    layer_qty = func.coalesce(func.sum(keyed.c.layer_qty), 0)
+    return (
+        select(
+            keyed.c.item_id, keyed.c.location_id,
+            ledger_qty.label("ledger_qty"),
+            func.coalesce(func.sum(keyed.c.ledger_value), 0).label("ledger_value"),
+            func.coalesce(func.bool_or(keyed.c.pre_fractional), False).label("pre_fractional"),
+            func.max(keyed.c.soh_id).label("soh_id"),
+            soh_qty.label("soh_qty"),
+            layer_qty.label("layer_qty"),
+        )
+        .group_by(keyed.c.item_id, keyed.c.location_id)
+        .having(or_(ledger_qty != soh_qty, soh_qty != layer_qty))
+        .order_by(keyed.c.item_id, keyed.c.location_id)
+    )
+
+
+def _item_totals(lo: int, hi: int):
+    """Items whose quantity_on_hand differs from their ledger total, and whether any of it is pre-0010."""
+    ledger_qty = func.coalesce(
+        select(func.sum(M.quantity)).where(M.item_id == Item.id).scalar_subquery(), 0
+    )
+    pre_fractional = exists().where(M.item_id == Item.id, M.pre_fractional)
+    return (
+        select(Item.id.label("item_id"), Item.quantity_on_hand, ledger_qty.label("ledger_qty"),
+               pre_fractional.label("pre_fractional"))
+        .where(Item.id >= lo, Item.id < hi, Item.quantity_on_hand != ledger_qty)
+        .order_by(Item.id)
+    )
+
+
+def reconcile_partition(lo: int, hi: int, repair: bool = False) -> Dict[str, Any]:
+    """
+    Check items with lo <= id < hi; with repair, set stock_on_hand quantities
+    and item totals to the ledger, except where they differ only by pre-0010
+    rounding.
+    Runs in a pool process, so it opens its own session and returns plain data.
+    """
+    with database.SessionLocal() as db:
+        if repair:
+            db.execute(
+                select(S.id).where(S.item_type == INVENTORY_ITEM, S.item_id >= lo, S.item_id < hi)
+                .order_by(S.item_id, S.location_id).with_for_update()
+            ).all()
+            db.execute(select(Item.id).where(Item.id >= lo, Item.id < hi).order_by(Item.id).with_for_update()).all()
+        else:
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        stores = db.execute(_store_balances(lo, hi)).mappings().all()
+        items = db.execute(_item_totals(lo, hi)).mappings().all()
+
+        checked_stores = []
+        for row in stores:
+            rounding = row["ledger_qty"] != row["soh_qty"] and _rounding_only(
+                row["ledger_qty"], row["soh_qty"], row["pre_fractional"]
+            )
+            # a repaired stock_on_hand is the ledger, so that's what the layers must match
+            balance = row["ledger_qty"] if repair and not rounding else row["soh_qty"]
+            checked_stores.append({
+                **row,
+                "balance_ok": row["ledger_qty"] == row["soh_qty"],
+                "rounding": rounding,
+                "layers_ok": balance == row["layer_qty"],
+            })
+
+        result = {
+            "partition": [lo, hi],
+            "stores": checked_stores,
+            "items": [
+                {**row, "rounding": _rounding_only(row["ledger_qty"], row["quantity_on_hand"], row["pre_fractional"])}
+                for row in items
+            ],
+            "repaired_stores": 0,
+            "repaired_items": 0,
+        }
+        if repair:
+            result["repaired_stores"] = _repair_store_balances(db, [r for r in result["stores"] if not (r["balance_ok"] or r["rounding"])])
+            result["repaired_items"] = _repair_item_totals(db, [r for r in result["items"] if not r["rounding"]])
+            db.commit()
+        else:
+            db.rollback()
+    return result
+
+
+def _repair_store_balances(db, rows: List[dict]) -> int:
+    existing = [{"b_id": r["soh_id"], "b_qty": r["ledger_qty"]} for r in rows if r["soh_id"] is not None]
+    if existing:
+        db.execute(
+            update(S.__table__).where(S.__table__.c.id == bindparam("b_id"))
+            .values(quantity=bindparam("b_qty"), last_updated=datetime.utcnow()),
+            existing,
+        )
+    # ledger stock with no stock_on_hand row: start it at the ledger's own average
+    missing = [
+        {
+            "item_type": INVENTORY_ITEM, "item_id": r["item_id"], "location_id": r["location_id"],
+            "quantity": r["ledger_qty"],
+            "avg_cost": (Decimal(r["ledger_value"]) / r["ledger_qty"]).quantize(Decimal("0.0001")) if r["ledger_qty"] else 0,
+        }
+        for r in rows if r["soh_id"] is None
+    ]
+    if missing:
+        db.execute(insert(S).values(missing).on_conflict_do_nothing(constraint="uix_stock_on_hand_item_location"))
+    return len(existing) + len(missing)
+
+
+def _repair_item_totals(db, rows: List[dict]) -> int:
+    if rows:
+        db.execute(
+            update(Item.__table__).where(Item.__table__.c.id == bindparam("b_id"))
+            .values(quantity_on_hand=bindparam("b_qty")),
+            [{"b_id": r["item_id"], "b_qty": r["ledger_qty"]} for r in rows],
+        )
+    return len(rows)
+
+
+def partitions(partition_size: int) -> List[List[int]]:
+    """[lo, hi) item-id ranges covering every inventory item."""
+    with database.SessionLocal() as db:
+        lo, hi = db.execute(select(func.min(Item.id), func.max(Item.id))).one()
+    if lo is None:
+        return []
+    return [[start, min(start + partition_size, hi + 1)] for start in range(lo, hi + 1, partition_size)]
@@ -2,17 +2,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 import models, database, schemas
+from database import get_db
 
 router = APIRouter(prefix="/species", tags=["Species"])
 
-# Dependency
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- Create species ---
 @router.post("/", response_model=schemas.Species)
 def create_species(species: schemas.SpeciesCreate, db: Session = Depends(get_db)):
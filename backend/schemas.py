@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr , model_validator,condecimal
+from pydantic import BaseModel, EmailStr , Field, model_validator,condecimal
 from datetime import date, datetime
-from typing import Optional, List,Literal
+from typing import Annotated, Optional, List,Literal
 from decimal import Decimal
 
 class UserCreate(BaseModel):
@@ -97,12 +97,28 @@ class LivestockResponse(LivestockBase):
     id: int
     latest_event: Optional["LivestockEventResponse"] = None
     availability: str
+    last_event_type: Optional[str] = None
+    last_event_date: Optional[date] = None
+    last_movement_type: Optional[str] = None
+    last_movement_date: Optional[date] = None
+    current_location: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class LivestockCount(BaseModel):
+    """Active animals sharing one species/category/owner/location."""
+    species_id: Optional[int]
+    category_id: Optional[int]
+    owner_id: Optional[int]
+    location_id: Optional[int]
+    count: int
+
+
 # ------------------ Diseases ------------------ #
+
+
 class DiseaseBase(BaseModel):
     name: str
     description: Optional[str] = None
@@ -505,6 +521,11 @@ class ExitResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class ExitListResponse(ExitResponse):
+    livestock_tag: Optional[str] = None
+    event_date: Optional[date] = None
+    notes: Optional[str] = None
+
 
 class FarmBase(BaseModel):
     name: str
@@ -547,8 +568,9 @@ class LivestockHistoryResponse(BaseModel):
     status: Optional[str]
     last_movement: Optional[LivestockMovementSummary]
     last_event: Optional[LivestockEventSummary]
-    events: List[LivestockEventSummary]
-    movements: List[LivestockMovementSummary]
+    # left out (null) in summary mode
+    events: Optional[List[LivestockEventSummary]] = None
+    movements: Optional[List[LivestockMovementSummary]] = None
 
     class Config:
         orm_mode = True
@@ -690,6 +712,7 @@ class PurchaseOrderItemResponse(PurchaseOrderItemBase):
     id: int
     item: InventoryItemResponse  # include nested item
     quantity: int
+    quantity_received: int = 0
     unit_price: float
     class Config:
         orm_mode = True
@@ -714,6 +737,26 @@ class PurchaseOrderResponse(PurchaseOrderBase):
     class Config:
         orm_mode = True  
 
+class OpenPurchaseOrderLine(BaseModel):
+    order_id: int
+    line_id: int
+    vendor_id: Optional[int]
+    vendor_name: Optional[str]
+    status: str
+    expected_delivery_date: Optional[date]
+    item_id: int
+    item_name: str
+    quantity: int
+    quantity_received: int
+    outstanding: int
+
+class InboundStock(BaseModel):
+    item_id: int
+    item_name: str
+    outstanding: int
+    open_orders: int
+    next_expected_date: Optional[date]
+
 class StoreCreate(BaseModel):
     name: str
     location: Optional[str] = None
@@ -762,9 +805,13 @@ class StockResponse(BaseModel):
            from_attributes = True
 
 
+# stock quantities are stored to 3 places; finer input is refused rather than silently drifting
+StockQuantity = Annotated[Decimal, Field(max_digits=14, decimal_places=3)]
+
+
 class IssueItemCreate(BaseModel):
     item_id: int
-    quantity: float
+    quantity: StockQuantity
     cost_price: Optional[float] = None  # optional override; otherwise last cost used
 
 class IssueCreate(BaseModel):
@@ -808,3 +855,21 @@ class IssueStockRequest(BaseModel):
     received_by: Optional[str] = None
     notes: Optional[str] = None
     items: List[IssueItem]
+
+
+# ---------------- Import Jobs ----------------
+class ImportJobResponse(BaseModel):
+    id: int
+    kind: str
+    filename: Optional[str] = None
+    status: str
+    rows_total: Optional[int] = None
+    rows_done: int
+    rows_failed: int
+    rows_skipped: int
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    has_error_report: bool = False
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
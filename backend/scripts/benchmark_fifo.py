@@ -0,0 +1,83 @@
+"""
+Issue latency against items with many open FIFO cost layers.
+
+    python scripts/benchmark_fifo.py                     # 100, 1000, 10000 layers
+    python scripts/benchmark_fifo.py --layers 10000 50000 --issues 50 --qty 2
+
+Run from backend/ with DATABASE_URL set. For each layer count it writes that
+many small inflow layers for a scratch key, then times apply_outflow for a
+handful of small issues. Everything runs in one transaction per layer count
+that is rolled back, so the database is left as it was.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from routers.services import inventory_service  # noqa: E402
+
+ITEM_TYPE = "benchmark"  # no ledger/InventoryItem writes for non-inventory item types
+ITEM_ID = 0
+LOCATION_ID = 0
+
+
+def run(layers: int, issues: int, issue_qty: Decimal):
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(models.CostHistory),
+            [
+                {
+                    "item_type": ITEM_TYPE, "item_id": ITEM_ID, "location_id": LOCATION_ID,
+                    "reference_type": "benchmark", "quantity": 1, "unit_cost": 1 + i % 7,
+                    "total_cost": 1 + i % 7, "remaining_qty": 1,
+                }
+                for i in range(layers)
+            ],
+        )
+        db.execute(
+            insert(models.StockOnHand).values(
+                item_type=ITEM_TYPE, item_id=ITEM_ID, location_id=LOCATION_ID,
+                quantity=layers, avg_cost=4,  # every layer holds one unit
+            )
+        )
+        db.flush()
+        inventory_service.apply_outflow(db, ITEM_TYPE, ITEM_ID, LOCATION_ID, issue_qty)  # warm-up, untimed
+
+        timings = []
+        for _ in range(issues):
+            started = time.perf_counter()
+            inventory_service.apply_outflow(db, ITEM_TYPE, ITEM_ID, LOCATION_ID, issue_qty)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--layers", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--issues", type=int, default=10, help="issues timed per layer count")
+    parser.add_argument("--qty", type=Decimal, default=Decimal("5"), help="units per issue")
+    args = parser.parse_args()
+    if min(args.layers) < (args.issues + 1) * args.qty:
+        parser.error("each layer holds one unit; need layers >= (issues + 1) * qty")
+
+    print(f"{'layers':>8}  {'median ms':>10}  {'p95 ms':>8}  {'max ms':>8}")
+    for layers in args.layers:
+        timings = sorted(run(layers, args.issues, args.qty))
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{layers:>8}  {statistics.median(timings):>10.2f}  {p95:>8.2f}  {timings[-1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measure what one API worker pays at boot: wall time to `import main` and the
+resulting resident memory, each in a fresh interpreter.
+
+    python scripts/benchmark_startup.py            # 5 runs
+    python scripts/benchmark_startup.py --runs 10 --json
+
+Run from backend/. Importing main no longer touches the database, so no
+DATABASE_URL is required. Heavy optional libraries that ended up loaded are
+listed so regressions (an eager pandas/weasyprint import) are easy to spot.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "weasyprint", "jinja2", "pyarrow", "reportlab"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main  # noqa: F401
+elapsed = time.perf_counter() - started
+
+rss_kb = None
+with open("/proc/self/status") as f:
+    for line in f:
+        if line.startswith("VmRSS:"):
+            rss_kb = int(line.split()[1])
+if rss_kb is None:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({
+    "import_seconds": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "heavy_loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_once():
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    times = [s["import_seconds"] for s in samples]
+    rss = [s["rss_mb"] for s in samples]
+    summary = {
+        "runs": args.runs,
+        "import_seconds_median": round(statistics.median(times), 3),
+        "import_seconds_min": round(min(times), 3),
+        "rss_mb_median": round(statistics.median(rss), 1),
+        "heavy_loaded": samples[-1]["heavy_loaded"],
+    }
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+    print(f"runs:            {summary['runs']}")
+    print(f"import main:     {summary['import_seconds_median']}s median ({summary['import_seconds_min']}s min)")
+    print(f"resident memory: {summary['rss_mb_median']} MB median")
+    print(f"heavy modules:   {', '.join(summary['heavy_loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
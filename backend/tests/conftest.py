@@ -0,0 +1,98 @@
+"""
+Fixtures for API tests against the database in DATABASE_URL (Postgres).
+
+Each test runs inside one outer transaction that is rolled back afterwards,
+so tests can write freely; the API's own commits become savepoints. Tests
+are skipped when the database can't be reached.
+"""
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import models  # noqa: E402
+import main  # noqa: E402
+
+
+@pytest.fixture
+def connection():
+    try:
+        conn = database.engine.connect()
+    except Exception as exc:
+        pytest.skip(f"database not reachable: {exc}")
+    outer = conn.begin()
+    try:
+        yield conn
+    finally:
+        outer.rollback()
+        conn.close()
+
+
+@pytest.fixture
+def db(connection):
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient whose requests all use the test's session (lifespan not run)."""
+    main.app.dependency_overrides[database.get_db] = lambda: db
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.pop(database.get_db, None)
+
+
+@pytest.fixture
+def statements(connection):
+    """SQL statements sent on the test's connection, in order."""
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        yield sent
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+
+# ---- Inventory fixtures ----
+@pytest.fixture
+def vendor(db):
+    vendor = models.Vendor(name="TEST-VENDOR")
+    db.add(vendor)
+    db.flush()
+    return vendor
+
+
+@pytest.fixture
+def store(db):
+    store = models.Store(name="TEST-STORE")
+    db.add(store)
+    db.flush()
+    return store
+
+
+@pytest.fixture
+def inventory_items(db):
+    """Two inventory items of a fresh type and unit, nothing on hand."""
+    item_type = models.InventoryType(name="TEST-TYPE")
+    unit = models.Unit(name="TEST-UNIT")
+    db.add_all([item_type, unit])
+    db.flush()
+    items = [models.InventoryItem(name=f"TEST-ITEM-{n}", type_id=item_type.id, unit_id=unit.id) for n in range(2)]
+    db.add_all(items)
+    db.flush()
+    return items
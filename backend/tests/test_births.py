@@ -0,0 +1,34 @@
+"""GET /births pages with a cursor; tampered cursors are a 400, not a 500."""
+from datetime import date
+
+import pytest
+
+import models
+import pagination
+
+
+def test_cursor_walks_every_birth(client, db):
+    for n in range(5):
+        db.add(models.Birth(tag_number=f"TEST-BIRTH-{n}", dob=date(2001, 2, 1 + n % 2), sex="F"))
+    db.flush()
+    window = {"date_from": "2001-02-01", "date_to": "2001-02-02", "limit": 2}
+
+    seen = []
+    response = client.get("/births/", params=window)
+    while True:
+        assert response.status_code == 200, response.text
+        seen += [row["tag_number"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get("/births/", params={**window, "cursor": cursor})
+
+    assert sorted(seen) == [f"TEST-BIRTH-{n}" for n in range(5)]
+
+
+@pytest.mark.parametrize("cursor", [pagination.encode_cursor("2001-13-40", 1), pagination.encode_cursor("2001-02-03", [1]), "%%%"])
+def test_tampered_cursor_is_rejected(client, cursor):
+    response = client.get("/births/", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
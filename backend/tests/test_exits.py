@@ -0,0 +1,76 @@
+"""GET /exits loads the register in a single statement, however many exits it lists."""
+from datetime import datetime, timedelta
+
+import pytest
+
+import models
+import pagination
+
+
+def _add_exits(db, count, created_at):
+    for n in range(count):
+        animal = models.Livestock(tag_number=f"TEST-EXIT-{created_at:%Y%m%d}-{n}", availability="inactive")
+        db.add(animal)
+        db.flush()
+        exit_ = models.Exit(livestock_id=animal.id, exit_type="death", reason="test", created_at=created_at)
+        db.add(exit_)
+        db.flush()
+        db.add(models.LivestockEvent(livestock_id=animal.id, event_type="death",
+                                     event_date=created_at.date(), exit_id=exit_.id, notes="exit event"))
+    db.flush()
+
+
+def _get(client, statements, **params):
+    statements.clear()
+    response = client.get("/exits/", params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+@pytest.mark.parametrize("count", [1, 5, 25])
+def test_one_statement_for_any_number_of_exits(client, db, statements, count):
+    day = datetime(2001, 2, 3, 12, 0)
+    _add_exits(db, count, day)
+
+    response = _get(client, statements, date_from=day.date().isoformat(), date_to=day.date().isoformat())
+
+    rows = response.json()
+    assert len(rows) == count
+    assert {row["event_date"] for row in rows} == {day.date().isoformat()}
+    assert all(row["livestock_tag"].startswith("TEST-EXIT-") for row in rows)
+    assert len(statements) == 1
+
+
+def test_one_statement_without_filters(client, db, statements):
+    _add_exits(db, 10, datetime(2001, 2, 3, 12, 0))
+
+    _get(client, statements)
+
+    assert len(statements) == 1
+
+
+def test_one_statement_per_page_with_cursor(client, db, statements):
+    day = datetime(2001, 2, 3, 12, 0)
+    _add_exits(db, 7, day)
+    window = {"date_from": day.date().isoformat(), "date_to": (day + timedelta(days=1)).date().isoformat()}
+
+    seen = []
+    response = _get(client, statements, limit=3, **window)
+    while True:
+        assert len(statements) == 1
+        seen += [row["id"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = _get(client, statements, limit=3, cursor=cursor, **window)
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.parametrize("values", [["x"], [[1]], [1, 2]])
+def test_tampered_cursor_is_rejected(client, values):
+    response = client.get("/exits/", params={"cursor": pagination.encode_cursor(*values)})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
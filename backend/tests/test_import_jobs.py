@@ -0,0 +1,92 @@
+"""Import job heartbeats: sweeps fail only jobs whose owner stopped beating."""
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+import models
+from routers.services import import_jobs
+
+
+@pytest.fixture
+def jobs(connection, monkeypatch, tmp_path):
+    """import_jobs with its sessions on the test's connection and JOB_DIR in tmp_path."""
+    monkeypatch.setattr(import_jobs, "SessionLocal",
+                        lambda: Session(bind=connection, join_transaction_mode="create_savepoint"))
+    monkeypatch.setattr(import_jobs, "JOB_DIR", str(tmp_path))
+    return import_jobs
+
+
+def _job(db, worker, heartbeat_age=None, created_age=0, status="running"):
+    now = datetime.utcnow()
+    job = models.ImportJob(
+        kind="livestock", filename="herd.csv", status=status, worker=worker, rows_done=10,
+        created_at=now - timedelta(seconds=created_age),
+        heartbeat_at=None if heartbeat_age is None else now - timedelta(seconds=heartbeat_age),
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def _spool(jobs, job, age):
+    path = jobs._spool_path(job.id, ".csv")
+    with open(path, "w") as f:
+        f.write("tag_number\n")
+    os.utime(path, (time.time() - age, time.time() - age))
+    return path
+
+
+def test_sweep_fails_only_stale_jobs(jobs, db):
+    long_ago = jobs.STALE_AFTER * 10
+    dead = _job(db, "gone:1:aaaa", heartbeat_age=long_ago, created_age=long_ago)
+    sibling = _job(db, "alive:2:bbbb", heartbeat_age=1, created_age=long_ago)
+    legacy = _job(db, None, created_age=long_ago, status="queued")
+    fresh_legacy = _job(db, None, created_age=1, status="queued")
+    db.commit()
+    dead_file, sibling_file = _spool(jobs, dead, long_ago), _spool(jobs, sibling, long_ago)
+
+    assert jobs.sweep_orphaned_jobs() == 2
+
+    for job in (dead, sibling, legacy, fresh_legacy):
+        db.refresh(job)
+    assert (dead.status, dead.rows_done) == ("failed", 0)
+    assert legacy.status == "failed"
+    assert (sibling.status, sibling.rows_done) == ("running", 10)
+    assert fresh_legacy.status == "queued"
+    assert not os.path.exists(dead_file)
+    assert os.path.exists(sibling_file)
+
+
+def test_beat_refreshes_only_own_jobs(jobs, db):
+    long_ago = jobs.STALE_AFTER * 10
+    own = _job(db, jobs.WORKER_ID, heartbeat_age=long_ago)
+    other = _job(db, "alive:2:bbbb", heartbeat_age=long_ago)
+    db.commit()
+
+    jobs._beat()
+
+    db.refresh(own)
+    db.refresh(other)
+    assert datetime.utcnow() - own.heartbeat_at < timedelta(minutes=1)
+    assert datetime.utcnow() - other.heartbeat_at > timedelta(seconds=long_ago - 60)
+
+
+def test_failed_import_reports_no_rows(jobs, db, monkeypatch):
+    job = _job(db, jobs.WORKER_ID, heartbeat_age=0, status="queued")
+    db.commit()
+    path = _spool(jobs, job, 0)
+
+    def handler(db, fileobj, filename, include_accepted, on_chunk):
+        on_chunk({"rows": 10, "errors": 1, "skipped": 2})
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(jobs, "_handler", lambda kind: handler)
+    jobs.run_job(job.id, path)
+
+    db.refresh(job)
+    assert (job.status, job.rows_done, job.rows_failed, job.rows_skipped) == ("failed", 0, 0, 0)
+    assert job.error == "database went away"
+    assert not os.path.exists(path)
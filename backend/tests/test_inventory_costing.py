@@ -0,0 +1,60 @@
+"""The costing engine: WAVG on receipt, outflows at the average with FIFO layers consumed, ledger and item totals kept alongside."""
+from decimal import Decimal
+
+import pytest
+
+import models
+from routers.services import inventory_service
+from routers.services.inventory_service import INVENTORY_ITEM
+
+
+def _soh(db, item, store):
+    return db.query(models.StockOnHand).filter_by(item_type=INVENTORY_ITEM, item_id=item.id, location_id=store.id).one()
+
+
+def test_receipts_average_and_issues_keep_the_average(db, store, inventory_items):
+    item = inventory_items[0]
+    inventory_service.apply_inflow(db, INVENTORY_ITEM, item.id, store.id, 10, "2")
+    received = inventory_service.apply_inflow(db, INVENTORY_ITEM, item.id, store.id, 30, "4")
+
+    issued = inventory_service.apply_outflow(db, INVENTORY_ITEM, item.id, store.id, 20)
+
+    assert received["new_avg_cost"] == Decimal("3.5000")
+    assert (issued["unit_cost"], issued["total_cost"]) == (Decimal("3.5000"), Decimal("70.0000"))
+    # FIFO layers: all 10 @ 2 and 10 of the 30 @ 4
+    assert issued["layer_cost"] == Decimal("60.0000")
+    soh = _soh(db, item, store)
+    assert (soh.quantity, soh.avg_cost) == (Decimal("20.000"), Decimal("3.5000"))
+    db.refresh(item)
+    assert item.quantity_on_hand == 20
+    movements = db.query(models.InventoryMovement.quantity, models.InventoryMovement.unit_cost).filter_by(
+        item_id=item.id).order_by(models.InventoryMovement.id).all()
+    assert movements == [(10, 2), (30, 4), (-20, Decimal("3.5"))]
+
+
+def test_outflow_beyond_the_balance_is_refused(db, store, inventory_items):
+    item = inventory_items[0]
+    inventory_service.apply_inflow(db, INVENTORY_ITEM, item.id, store.id, 5, "1")
+
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        inventory_service.apply_outflow(db, INVENTORY_ITEM, item.id, store.id, 6)
+
+
+def test_large_issue_consumes_layers_over_several_rounds(db, store, inventory_items, monkeypatch):
+    monkeypatch.setattr(inventory_service, "FIFO_PAGE_SIZE", 2)
+    item, other = inventory_items
+    for cost in range(1, 8):  # seven 1-unit layers costing 1..7
+        inventory_service.apply_inflow(db, INVENTORY_ITEM, item.id, store.id, 1, cost)
+    inventory_service.apply_inflow(db, INVENTORY_ITEM, other.id, store.id, 3, 10)
+
+    issued = inventory_service.apply_outflow(db, INVENTORY_ITEM, item.id, store.id, "6.5")
+
+    # pages of 2, 4 and 8: layers 1..6 emptied and half of layer 7 taken
+    assert issued["layer_cost"] == Decimal("24.5000")
+    remaining = [
+        qty for (qty,) in db.query(models.CostHistory.remaining_qty)
+        .filter_by(item_type=INVENTORY_ITEM, location_id=store.id, item_id=item.id)
+        .order_by(models.CostHistory.id)
+    ]
+    assert remaining == [0, 0, 0, 0, 0, 0, Decimal("0.500")]
+    assert db.query(models.CostHistory.remaining_qty).filter_by(item_id=other.id).scalar() == 3
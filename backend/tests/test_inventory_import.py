@@ -0,0 +1,28 @@
+"""Inventory item sheets stream chunk by chunk: counts add up and duplicates are caught across chunks."""
+import io
+
+import pytest
+
+pytest.importorskip("pandas")
+from routers.services import inventory_import  # noqa: E402
+
+
+def test_chunks_share_seen_names(db, inventory_items):
+    type_id, unit_id = inventory_items[0].type_id, inventory_items[0].unit_id
+    rows = [
+        f"TEST-NEW-1,{type_id},{unit_id}",
+        f"test-item-0,{type_id},{unit_id}",   # already exists
+        f"TEST-NEW-2,{type_id},{unit_id}",
+        f"test-new-1,{type_id},{unit_id}",    # duplicate of row 2, one chunk later
+        f"TEST-NEW-3,999999999,{unit_id}",
+    ]
+    data = io.BytesIO("\n".join(["name,type_id,unit_id", *rows]).encode())
+    chunks = []
+
+    summary = inventory_import.import_inventory_item_upload(
+        db, data, "items.csv", include_accepted=False, chunksize=2, on_chunk=chunks.append
+    )
+
+    assert len(chunks) == 3
+    assert (summary["rows"], summary["created"], summary["skipped"], summary["errors"]) == (5, 2, 2, 1)
+    assert [(r["row"], r["status"]) for r in summary["results"]] == [(3, "skipped"), (5, "skipped"), (6, "error")]
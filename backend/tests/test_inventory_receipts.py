@@ -0,0 +1,59 @@
+"""POST /inventory/receipts: Idempotency-Key replays, key reuse and receivable PO states."""
+from datetime import date
+
+import pytest
+
+import models
+
+
+def _receipt(store, items, quantity=4, **fields):
+    return {
+        "store_id": store.id,
+        "items": [{"item_id": item.id, "quantity_received": quantity, "cost_price": "2.50"} for item in items],
+        **fields,
+    }
+
+
+def _post(client, body, key=None):
+    return client.post("/inventory/receipts", json=body, headers={"Idempotency-Key": key} if key else {})
+
+
+def test_replayed_key_returns_the_original_receipt(client, db, store, inventory_items):
+    body = _receipt(store, inventory_items)
+
+    first = _post(client, body, key="TEST-KEY-1")
+    replay = _post(client, body, key="TEST-KEY-1")
+
+    assert first.status_code == replay.status_code == 200, replay.text
+    assert replay.json()["id"] == first.json()["id"]
+    assert db.query(models.GoodsReceipt).filter_by(idempotency_key="TEST-KEY-1").count() == 1
+    db.expire_all()
+    assert [item.quantity_on_hand for item in inventory_items] == [4, 4]
+
+
+def test_key_reused_for_another_receipt_is_a_conflict(client, db, store, inventory_items):
+    assert _post(client, _receipt(store, inventory_items), key="TEST-KEY-2").status_code == 200
+
+    response = _post(client, _receipt(store, inventory_items, quantity=5), key="TEST-KEY-2")
+
+    assert response.status_code == 409
+    db.expire_all()
+    assert [item.quantity_on_hand for item in inventory_items] == [4, 4]
+
+
+@pytest.mark.parametrize("status", [models.PurchaseOrderStatus.draft, models.PurchaseOrderStatus.received])
+def test_only_placed_orders_can_be_received(client, db, vendor, store, inventory_items, status):
+    item = inventory_items[0]
+    order = models.PurchaseOrder(vendor_id=vendor.id, order_date=date(2001, 2, 3), status=status, total_amount=25)
+    db.add(order)
+    db.flush()
+    db.add(models.PurchaseOrderItem(order_id=order.id, item_id=item.id, quantity=5,
+                                    quantity_received=5 if status == models.PurchaseOrderStatus.received else 0,
+                                    unit_price=5, subtotal=25))
+    db.commit()
+
+    response = _post(client, _receipt(store, [item], purchase_order_id=order.id))
+
+    assert response.status_code == 400
+    assert f"Purchase order {order.id}" in response.json()["detail"]
+    assert db.query(models.GoodsReceipt).filter_by(purchase_order_id=order.id).count() == 0
@@ -0,0 +1,88 @@
+"""POST /inventory/transfer moves stock at the stored 3-place precision and keeps layers in step with SOH."""
+from decimal import Decimal
+
+import pytest
+
+import models
+from routers.services import inventory_service
+
+
+@pytest.fixture
+def stores(db, store):
+    other = models.Store(name="TEST-STORE-2")
+    db.add(other)
+    db.flush()
+    return store, other
+
+
+def _transfer(client, stores, item, quantity):
+    source, destination = stores
+    return client.post("/inventory/transfer", json={
+        "source_store_id": source.id,
+        "destination_store_id": destination.id,
+        "items": [{"item_id": item.id, "quantity": quantity}],
+    })
+
+
+def _soh(db, item, store):
+    return db.query(models.StockOnHand).filter_by(item_type="inventory_item", item_id=item.id, location_id=store.id).one()
+
+
+def test_finer_than_stored_quantity_is_refused(client, db, stores, inventory_items):
+    response = _transfer(client, stores, inventory_items[0], 1.0005)
+
+    assert response.status_code == 422
+
+
+def test_engine_quantizes_before_checking_the_balance(db, stores, inventory_items):
+    source, destination = stores
+    item = inventory_items[0]
+    inventory_service.receive_lines(db, source.id, [(item.id, "2.5", "4")])
+
+    # half a thousandth over the balance rounds to exactly the balance
+    (moved,) = inventory_service.transfer_lines(db, source.id, destination.id, [(item.id, 2.5004, None)])
+
+    assert moved["quantity"] == Decimal("2.500")
+    assert _soh(db, item, source).quantity == 0
+    assert _soh(db, item, destination).quantity == Decimal("2.500")
+    open_layers = db.query(models.CostHistory).filter(
+        models.CostHistory.item_id == item.id,
+        models.CostHistory.location_id == source.id,
+        models.CostHistory.remaining_qty > 0,
+    ).count()
+    assert open_layers == 0
+
+
+def test_fractional_transfer_through_the_api(client, db, stores, inventory_items):
+    source, destination = stores
+    item = inventory_items[0]
+    inventory_service.receive_lines(db, source.id, [(item.id, "3", "2")])
+
+    response = _transfer(client, stores, item, 1.25)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["items"] == [{"item_id": item.id, "quantity": 1.25, "cost_price": 2.0}]
+    db.expire_all()
+    assert (_soh(db, item, source).quantity, _soh(db, item, destination).quantity) == (Decimal("1.750"), Decimal("1.250"))
+
+
+def test_multi_line_transfer_is_all_or_nothing(db, stores, inventory_items):
+    source, destination = stores
+    first, second = inventory_items
+    inventory_service.receive_lines(db, source.id, [(first.id, "5", "2"), (second.id, "1", "3")])
+
+    moved = inventory_service.transfer_lines(
+        db, source.id, destination.id, [(first.id, 2, None), (second.id, 1, None), (first.id, 3, "4")]
+    )
+
+    assert [(m["item_id"], m["quantity"], m["unit_cost"]) for m in moved] == [
+        (first.id, 2, Decimal("2.0000")), (second.id, 1, Decimal("3.0000")), (first.id, 3, Decimal("4.0000")),
+    ]
+    # 2 @ 2 and 3 @ 4 land at the destination
+    assert (_soh(db, first, destination).quantity, _soh(db, first, destination).avg_cost) == (5, Decimal("3.2000"))
+    assert _soh(db, first, source).quantity == 0
+
+    with pytest.raises(ValueError, match="Insufficient stock"):
+        inventory_service.transfer_lines(db, destination.id, source.id, [(second.id, 1, None), (first.id, 6, None)])
+    db.expire_all()
+    assert (_soh(db, second, destination).quantity, _soh(db, first, destination).quantity) == (1, 5)
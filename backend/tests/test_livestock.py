@@ -0,0 +1,19 @@
+"""GET /livestock: tampered cursors are a 400 in both keyset orders."""
+import pytest
+
+import pagination
+
+
+@pytest.mark.parametrize("order_by, values", [
+    ("id", ["x"]),
+    ("id", [[1]]),
+    ("tag_number", ["A1", "y"]),
+    ("tag_number", ["A1"]),
+])
+def test_tampered_cursor_is_rejected(client, order_by, values):
+    cursor = pagination.encode_cursor(*values)
+
+    response = client.get("/livestock/", params={"order_by": order_by, "cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,62 @@
+"""GET /livestock-history: summary by default, literal tag prefixes, /summary reachable, cursors checked."""
+from datetime import date
+
+import pytest
+
+import models
+import pagination
+
+
+def _add_animal(db, tag):
+    animal = models.Livestock(tag_number=tag, availability="active")
+    db.add(animal)
+    db.flush()
+    db.add(models.LivestockEvent(livestock_id=animal.id, event_type="weighing", event_date=date(2001, 2, 3)))
+    db.flush()
+    return animal
+
+
+def test_list_defaults_to_summary(client, db):
+    _add_animal(db, "TEST-HIST-1")
+
+    response = client.get("/livestock-history/", params={"tag": "TEST-HIST-"})
+
+    assert response.status_code == 200, response.text
+    (row,) = response.json()
+    assert row["last_event"]["event_type"] == "weighing"
+    assert not row.get("events")
+
+
+def test_tag_prefix_is_literal(client, db):
+    _add_animal(db, "TEST_HIST%A")
+    _add_animal(db, "TESTXHISTYB")
+
+    response = client.get("/livestock-history/", params={"tag": "TEST_HIST%"})
+
+    assert [row["tag_number"] for row in response.json()] == ["TEST_HIST%A"]
+
+
+def test_summary_route_is_not_a_tag(client, db):
+    _add_animal(db, "TEST-HIST-2")
+
+    response = client.get("/livestock-history/summary")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["total_livestock"] >= 1
+
+
+def test_full_history_by_tag(client, db):
+    _add_animal(db, "TEST-HIST-3")
+
+    response = client.get("/livestock-history/TEST-HIST-3")
+
+    assert response.status_code == 200, response.text
+    assert [ev["event_type"] for ev in response.json()["events"]] == ["weighing"]
+
+
+@pytest.mark.parametrize("cursor", [pagination.encode_cursor("x"), pagination.encode_cursor([1]), "%%%"])
+def test_tampered_cursor_is_rejected(client, cursor):
+    response = client.get("/livestock-history/", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,56 @@
+"""POST /livestock/bulk-upload reports counts plus skipped/error rows; accepted rows only on request; castrated flags parse."""
+import io
+
+import pytest
+
+import models
+
+pytest.importorskip("pandas")
+from routers.services import livestock_import  # noqa: E402
+
+HEADER = "tag_number,species_id,category_id,owner_id,location_id,sex,dob,castrated"
+
+
+def _upload(client, db, **params):
+    refs = [db.query(model.id).order_by(model.id).limit(1).scalar()
+            for model in (models.Species, models.Category, models.Owner, models.Location)]
+    if None in refs:
+        pytest.skip("needs a species, category, owner and location")
+    ids = ",".join(str(r) for r in refs)
+    rows = [
+        f"TEST-IMPORT-1,{ids},female,2023-01-01,false",
+        f"TEST-IMPORT-2,{ids},male,2023-01-01,true",
+        f"TEST-IMPORT-1,{ids},female,2023-01-01,false",  # duplicate in file
+        f"TEST-IMPORT-3,{ids},male,not-a-date,false",
+    ]
+    data = "\n".join([HEADER, *rows]).encode()
+    response = client.post("/livestock/bulk-upload", params=params, files={"file": ("herd.csv", data, "text/csv")})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_only_problem_rows_listed_by_default(client, db):
+    summary = _upload(client, db)
+
+    assert (summary["rows"], summary["created"], summary["skipped"], summary["errors"]) == (4, 2, 1, 1)
+    assert [(r["row"], r["status"]) for r in summary["results"]] == [(4, "skipped"), (5, "error")]
+
+
+def test_accepted_rows_on_request(client, db):
+    summary = _upload(client, db, include_accepted="true")
+
+    assert (summary["rows"], summary["created"]) == (4, 2)
+    assert [r["status"] for r in summary["results"]] == ["accepted", "accepted", "skipped", "error"]
+
+
+@pytest.mark.parametrize("cells, expected", [
+    (["1", ""], [True, False]),                  # read as float 1.0 / NaN
+    (["1", "0"], [True, False]),                 # read as int
+    (["true", ""], [True, False]),
+    (["yes", "no"], [True, False]),
+])
+def test_castrated_flags(cells, expected):
+    rows = [f"TEST-CAST-{n},1,1,1,1,male,2023-01-01,{cell}" for n, cell in enumerate(cells)]
+    (frame,) = livestock_import.iter_upload_frames(io.BytesIO("\n".join([HEADER, *rows]).encode()), "herd.csv")
+
+    assert livestock_import.prepare_frame(frame)["castrated"].tolist() == expected
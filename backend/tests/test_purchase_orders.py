@@ -0,0 +1,61 @@
+"""PUT /purchase-orders/{id} keeps received quantities and derives partial/received."""
+from datetime import date
+
+import models
+
+
+def _order(db, vendor, items, status, received=(0, 0)):
+    order = models.PurchaseOrder(vendor_id=vendor.id, order_date=date(2001, 2, 3), status=status, total_amount=50)
+    db.add(order)
+    db.flush()
+    db.add_all([
+        models.PurchaseOrderItem(order_id=order.id, item_id=item.id, quantity=5, quantity_received=got,
+                                 unit_price=5, subtotal=25)
+        for item, got in zip(items, received)
+    ])
+    db.flush()
+    return order
+
+
+def _body(vendor, items, quantities=(5, 5), **fields):
+    return {
+        "vendor_id": vendor.id,
+        "order_date": "2001-02-03",
+        "items": [{"item_id": item.id, "quantity": q, "unit_price": "5"} for item, q in zip(items, quantities)],
+        **fields,
+    }
+
+
+def test_received_order_refuses_changed_items(client, db, vendor, inventory_items):
+    order = _order(db, vendor, inventory_items, models.PurchaseOrderStatus.partial, received=(2, 0))
+
+    response = client.put(f"/purchase-orders/{order.id}", json=_body(vendor, inventory_items, (9, 5), status="partial"))
+
+    assert response.status_code == 409
+    db.expire_all()
+    assert [(line.quantity, line.quantity_received) for line in order.items] == [(5, 2), (5, 0)]
+
+
+def test_unchanged_items_keep_receipts(client, db, vendor, inventory_items):
+    order = _order(db, vendor, inventory_items, models.PurchaseOrderStatus.partial, received=(2, 0))
+
+    response = client.put(f"/purchase-orders/{order.id}",
+                          json=_body(vendor, inventory_items, status="ordered", notes="call before delivery"))
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["notes"] == "call before delivery"
+    assert body["status"] == "partial"
+    assert [line["quantity_received"] for line in body["items"]] == [2, 0]
+
+
+def test_items_replaced_before_any_receipt(client, db, vendor, inventory_items):
+    order = _order(db, vendor, inventory_items, models.PurchaseOrderStatus.ordered)
+
+    response = client.put(f"/purchase-orders/{order.id}", json=_body(vendor, inventory_items, (7, 3), status="received"))
+
+    assert response.status_code == 200, response.text
+    db.expire_all()
+    assert [line.quantity for line in order.items] == [7, 3]
+    # nothing has been received, so the order can't be marked received by hand
+    assert order.status == models.PurchaseOrderStatus.ordered
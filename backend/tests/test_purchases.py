@@ -0,0 +1,47 @@
+"""GET /purchases: events listed once per purchase; tampered cursors are a 400."""
+from datetime import date
+
+import pytest
+
+import models
+import pagination
+
+
+def _purchase_with_repeated_animal(db):
+    vendor = models.Vendor(name="TEST-VENDOR")
+    animal = models.Livestock(tag_number="TEST-PURCHASE-1", availability="active")
+    db.add_all([vendor, animal])
+    db.flush()
+    purchase = models.Purchase(vendor_id=vendor.id, purchase_date=date(2001, 2, 3), total_cost=0)
+    db.add(purchase)
+    db.flush()
+    line = dict(purchase_id=purchase.id, livestock_id=animal.id, tag_number=animal.tag_number,
+                species_id=1, category_id=1, owner_id=1, price=100)
+    # the same animal on two lines of one purchase
+    db.add_all([
+        models.PurchaseItem(**line),
+        models.PurchaseItem(**line),
+        models.LivestockEvent(livestock_id=animal.id, event_type="purchase", event_date=date(2001, 2, 3)),
+        models.LivestockEvent(livestock_id=animal.id, event_type="weighing", event_date=date(2001, 2, 4)),
+    ])
+    db.flush()
+    return vendor, purchase
+
+
+def test_events_listed_once_per_purchase(client, db):
+    vendor, purchase = _purchase_with_repeated_animal(db)
+
+    response = client.get("/purchases/", params={"vendor_id": vendor.id})
+
+    assert response.status_code == 200, response.text
+    (row,) = response.json()
+    assert len(row["items"]) == 2
+    assert [ev["event_type"] for ev in row["events"]] == ["purchase", "weighing"]
+
+
+@pytest.mark.parametrize("values", [("not-a-date", 1), ("2001-02-03", "x"), (None, 1)])
+def test_tampered_cursor_is_rejected(client, values):
+    response = client.get("/purchases/", params={"cursor": pagination.encode_cursor(*values)})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
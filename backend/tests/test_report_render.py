@@ -0,0 +1,50 @@
+"""Report cache eviction: least recently served PDFs go, recently served ones are never pulled mid-stream."""
+import os
+import time
+
+import pytest
+
+from routers.services import report_render
+
+HOUR = 3600
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_render, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(report_render, "CACHE_MAX_AGE", 24 * HOUR)
+    monkeypatch.setattr(report_render, "CACHE_IN_USE_GRACE", 300)
+    return report_render
+
+
+def _pdf(cache, key, age):
+    path = cache.cache_path(key)
+    with open(path, "wb") as f:
+        f.write(b"%PDF")
+    os.utime(path, (time.time() - age, time.time() - age))
+    return key
+
+
+def _left(cache):
+    return sorted(name[:-4] for name in os.listdir(cache.CACHE_DIR))
+
+
+def test_serving_a_pdf_keeps_it(cache):
+    _pdf(cache, "expired", 48 * HOUR)
+    _pdf(cache, "served", 48 * HOUR)
+
+    assert cache.cached("served")
+    cache.evict()
+
+    assert _left(cache) == ["served"]
+
+
+def test_only_pdfs_outside_the_grace_window_are_trimmed(cache, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_MAX_FILES", 1)
+    for key, age in (("newest", 0), ("streaming", 60), ("idle", 2 * HOUR)):
+        _pdf(cache, key, age)
+
+    cache.evict()
+
+    assert _left(cache) == ["newest", "streaming"]
+    assert cache.cached("idle") is None
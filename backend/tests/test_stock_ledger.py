@@ -0,0 +1,53 @@
+"""Stock levels read as the latest ledger checkpoint plus the movements after it; as-of valuation replays up to a time."""
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from routers.services import inventory_service, stock_ledger
+from routers.services.inventory_service import INVENTORY_ITEM
+
+
+def _levels(db, store):
+    return {row["item_id"]: row["quantity_on_hand"] for row in stock_ledger.stock_levels(db, store.id)}
+
+
+def test_levels_are_checkpoint_plus_tail(client, db, store, inventory_items):
+    first, second = inventory_items
+    inventory_service.receive_lines(db, store.id, [(first.id, 5, "2"), (second.id, 1, "1")])
+    checkpoint = stock_ledger.create_checkpoint(db)
+    inventory_service.receive_lines(db, store.id, [(first.id, 2, "2")])
+    inventory_service.apply_outflow(db, INVENTORY_ITEM, second.id, store.id, 1)
+
+    assert checkpoint.balance_count >= 2
+    # an item that moved and netted to zero is still listed
+    assert _levels(db, store) == {first.id: Decimal("7.000"), second.id: Decimal("0.000")}
+
+    stock_ledger.create_checkpoint(db)
+    assert _levels(db, store) == {first.id: Decimal("7.000"), second.id: Decimal("0.000")}
+    response = client.get(f"/inventory/stock/{store.id}")
+    assert response.status_code == 200, response.text
+    assert [(row["item_id"], row["quantity_on_hand"]) for row in response.json()] == [(first.id, 7), (second.id, 0)]
+
+
+def _ledger_now(db):
+    return db.execute(select(stock_ledger.LEDGER_CLOCK)).scalar_one()
+
+
+def _as_of(db, store, at):
+    return [(r.item_id, r.quantity, r.value) for r in db.execute(stock_ledger.stock_as_of(at, store.id))]
+
+
+def test_valuation_as_of_a_time(db, store, inventory_items):
+    item = inventory_items[0]
+    before = _ledger_now(db)
+    inventory_service.receive_lines(db, store.id, [(item.id, 4, "2")])
+    after_first = _ledger_now(db)
+    inventory_service.receive_lines(db, store.id, [(item.id, 6, "3")])
+    stock_ledger.create_checkpoint(db)
+    after_checkpoint = _ledger_now(db)
+    inventory_service.apply_outflow(db, INVENTORY_ITEM, item.id, store.id, 5)  # at the 2.6 average
+
+    assert _as_of(db, store, before) == []
+    assert _as_of(db, store, after_first) == [(item.id, 4, 8)]
+    assert _as_of(db, store, after_checkpoint) == [(item.id, 10, 26)]
+    assert _as_of(db, store, _ledger_now(db)) == [(item.id, 5, 13)]
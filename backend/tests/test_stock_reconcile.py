@@ -0,0 +1,49 @@
+"""Stock reconciliation repairs drift to the ledger; only keys with pre-0010 rows get the rounding tolerance."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+import database
+import models
+from routers.services import inventory_service, stock_reconcile
+from routers.services.inventory_service import INVENTORY_ITEM
+
+
+@pytest.fixture
+def reconcile(connection, monkeypatch):
+    """stock_reconcile with its sessions on the test's connection."""
+    monkeypatch.setattr(database, "SessionLocal",
+                        lambda: Session(bind=connection, join_transaction_mode="create_savepoint"))
+    return stock_reconcile
+
+
+def _drift(db, item, store, quantity):
+    db.execute(
+        update(models.StockOnHand)
+        .where(models.StockOnHand.item_type == INVENTORY_ITEM, models.StockOnHand.item_id == item.id,
+               models.StockOnHand.location_id == store.id)
+        .values(quantity=quantity)
+    )
+
+
+def test_small_drift_is_repaired_unless_the_ledger_is_pre_fractional(reconcile, db, store, inventory_items):
+    exact, legacy = inventory_items
+    inventory_service.receive_lines(db, store.id, [(exact.id, 5, "1"), (legacy.id, 3, "1")])
+    db.execute(update(models.InventoryMovement).where(models.InventoryMovement.item_id == legacy.id)
+               .values(pre_fractional=True))
+    _drift(db, exact, store, "5.4")
+    _drift(db, legacy, store, "3.4")
+    db.commit()
+
+    # repair mode: report mode's REPEATABLE READ can't be set on the test's open transaction
+    repaired = reconcile.reconcile_partition(exact.id, legacy.id + 1, repair=True)
+
+    assert [(r["item_id"], r["balance_ok"], r["rounding"]) for r in repaired["stores"]] == [
+        (exact.id, False, False), (legacy.id, False, True),
+    ]
+    assert repaired["repaired_stores"] == 1
+    quantities = dict(db.query(models.StockOnHand.item_id, models.StockOnHand.quantity)
+                      .filter(models.StockOnHand.location_id == store.id))
+    assert quantities == {exact.id: Decimal("5.000"), legacy.id: Decimal("3.400")}
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
+import { getAllPages } from "../services/api";
 
 export default function BirthForm({ onBirthCreated }) {
   const [dob, setDob] = useState("");
@@ -31,8 +32,8 @@ export default function BirthForm({ onBirthCreated }) {
 
   const loadLivestock = async () => {
     try {
-      const res = await axios.get("http://localhost:8000/livestock/");
-      setLivestockList(res.data);
+      const rows = await getAllPages("http://localhost:8000/livestock/", { fields: "id,tag_number,sex" }, axios);
+      setLivestockList(rows);
     } catch (err) {
       console.error("Failed to load animals", err);
     }
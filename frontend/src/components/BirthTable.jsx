@@ -2,6 +2,7 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
 import BaseTable from "./BaseTable";
+import { getAllPages } from "../services/api";
 
 export default function BirthTable({ refresh, onEdit }) {
   const [births, setBirths] = useState([]);
@@ -13,20 +14,20 @@ export default function BirthTable({ refresh, onEdit }) {
 
   const fetchData = async () => {
     try {
-      const [birthRes, sireRes, damRes, calfRes, ownerRes, locRes] =
+      const [birthRows, sireRes, damRes, calfRows, ownerRes, locRes] =
         await Promise.all([
-          axios.get("http://localhost:8000/births/"),
+          getAllPages("http://localhost:8000/births/", {}, axios),
           axios.get("http://localhost:8000/livestock/sires"),
           axios.get("http://localhost:8000/livestock/dams"),
-          axios.get("http://localhost:8000/livestock/"),
+          getAllPages("http://localhost:8000/livestock/", { fields: "id,tag_number" }, axios),
           axios.get("http://localhost:8000/owners/"),
           axios.get("http://localhost:8000/locations/"),
         ]);
 
-      setBirths(birthRes.data || []);
+      setBirths(birthRows);
       setSires(Object.fromEntries(sireRes.data.map((s) => [s.id, s.tag_number])));
       setDams(Object.fromEntries(damRes.data.map((d) => [d.id, d.tag_number])));
-      setCalves(Object.fromEntries(calfRes.data.map((c) => [c.id, c.tag_number])));
+      setCalves(Object.fromEntries(calfRows.map((c) => [c.id, c.tag_number])));
       setOwners(Object.fromEntries(ownerRes.data.map((o) => [o.id, o.name])));
       setLocations(Object.fromEntries(locRes.data.map((l) => [l.id, l.name])));
     } catch (err) {
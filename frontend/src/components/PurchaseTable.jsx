@@ -2,6 +2,7 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
 import BaseTable from "./BaseTable";
+import { getAllPages } from "../services/api";
 
 export default function PurchaseTable({ refresh, onEdit }) {
   const [purchases, setPurchases] = useState([]);
@@ -13,15 +14,15 @@ export default function PurchaseTable({ refresh, onEdit }) {
 
   const fetchAll = async () => {
     try {
-      const [purchaseRes, sp, cat, own, loc, ven] = await Promise.all([
-        axios.get("http://localhost:8000/purchases/"),
+      const [purchaseRows, sp, cat, own, loc, ven] = await Promise.all([
+        getAllPages("http://localhost:8000/purchases/", {}, axios),
         axios.get("http://localhost:8000/species/"),
         axios.get("http://localhost:8000/categories/"),
         axios.get("http://localhost:8000/owners/"),
         axios.get("http://localhost:8000/locations/"),
         axios.get("http://localhost:8000/vendors/"),
       ]);
-      setPurchases(purchaseRes.data || []);
+      setPurchases(purchaseRows);
       setSpecies(Object.fromEntries(sp.data.map((s) => [s.id, s.name])));
       setCategories(Object.fromEntries(cat.data.map((c) => [c.id, c.name])));
       setOwners(Object.fromEntries(own.data.map((o) => [o.id, o.name])));
@@ -2,6 +2,7 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
 import BaseTable from "./BaseTable";
+import { getAllPages } from "../services/api";
 
 export default function SaleTable({ refresh, onEdit }) {
   const [sales, setSales] = useState([]);
@@ -10,13 +11,13 @@ export default function SaleTable({ refresh, onEdit }) {
 
   const fetchSales = async () => {
     try {
-      const [saleRes, liveRes, buyerRes] = await Promise.all([
+      const [saleRes, liveRows, buyerRes] = await Promise.all([
         axios.get("http://localhost:8000/sales/"),
-        axios.get("http://localhost:8000/livestock/"),
+        getAllPages("http://localhost:8000/livestock/", { fields: "id,tag_number" }, axios),
         axios.get("http://localhost:8000/buyers/"),
       ]);
       setSales(saleRes.data || []);
-      setLivestock(Object.fromEntries(liveRes.data.map((l) => [l.id, l.tag_number])));
+      setLivestock(Object.fromEntries(liveRows.map((l) => [l.id, l.tag_number])));
       setBuyers(Object.fromEntries(buyerRes.data.map((b) => [b.id, b.name])));
     } catch (err) {
       console.error("Error fetching sales:", err);
@@ -16,7 +16,8 @@ import jsPDF from "jspdf";
 
 export default function ExecutiveDashboard({ setSidebarOpen }) {
   const [farm, setFarm] = useState(null);
-  const [livestock, setLivestock] = useState([]);
+  // active animals counted per species/category/owner/location (not the herd itself)
+  const [herdCounts, setHerdCounts] = useState([]);
   const [owners, setOwners] = useState([]);
   const [locations, setLocations] = useState([]);
   const [species, setSpecies] = useState([]);
@@ -61,7 +62,7 @@ export default function ExecutiveDashboard({ setSidebarOpen }) {
     try {
       const [
         farmRes,
-        livestockRes,
+        herdCountsRes,
         ownersRes,
         locationsRes,
         speciesRes,
@@ -70,7 +71,7 @@ export default function ExecutiveDashboard({ setSidebarOpen }) {
         livestockEventsRes,
       ] = await Promise.all([
         api.get("/farm"),
-        api.get("/livestock/"),
+        api.get("/livestock/counts"),
         api.get("/owners/"),
         api.get("/locations/"),
         api.get("/species/"),
@@ -80,7 +81,7 @@ export default function ExecutiveDashboard({ setSidebarOpen }) {
       ]);
 
       setFarm(farmRes.data);
-      setLivestock(livestockRes.data);
+      setHerdCounts(herdCountsRes.data);
       setOwners(ownersRes.data);
       setLocations(locationsRes.data);
       setSpecies(speciesRes.data);
@@ -103,36 +104,38 @@ export default function ExecutiveDashboard({ setSidebarOpen }) {
     fetchData();
   }, []);
 
-  const filteredLivestock = livestock.filter((a) => {
-    if (a.availability !== "active") return false;
+  const filteredCounts = herdCounts.filter((a) => {
     if (filter.species && a.species_id !== filter.species) return false;
     if (filter.owner && a.owner_id !== filter.owner) return false;
     if (filter.location && a.location_id !== filter.location) return false;
     return true;
   });
 
+  const countWhere = (match) =>
+    filteredCounts.reduce((total, a) => (match(a) ? total + a.count : total), 0);
+
   const locationData = locations.map((l) => ({
     name: l.name,
-    value: filteredLivestock.filter((a) => a.location_id === l.id).length,
+    value: countWhere((a) => a.location_id === l.id),
   }));
 
   const ownerData = owners.map((o) => ({
     name: o.name,
-    value: filteredLivestock.filter((a) => a.owner_id === o.id).length,
+    value: countWhere((a) => a.owner_id === o.id),
   }));
 
   const speciesData = species.map((s) => ({
     name: s.name,
-    value: filteredLivestock.filter((a) => a.species_id === s.id).length,
+    value: countWhere((a) => a.species_id === s.id),
   }));
 
   const categoryData = {};
-  filteredLivestock.forEach((l) => {
+  filteredCounts.forEach((l) => {
     const sp = species.find((s) => s.id === l.species_id)?.name || "Unknown";
     const cat = categories.find((c) => c.id === l.category_id)?.name || "Other";
 
     if (!categoryData[sp]) categoryData[sp] = {};
-    categoryData[sp][cat] = (categoryData[sp][cat] || 0) + 1;
+    categoryData[sp][cat] = (categoryData[sp][cat] || 0) + l.count;
   });
 
   const totalOwners = owners.length;
@@ -200,7 +203,7 @@ export default function ExecutiveDashboard({ setSidebarOpen }) {
         <div className="grid grid-cols-1 md:grid-cols-4 gap-6 mb-12">
           <div className="bg-white p-6 rounded-xl shadow text-center">
             <h3 className="text-gray-600 text-sm mb-1">Active Livestock</h3>
-            <p className="text-3xl font-bold text-blue-600">{filteredLivestock.length}</p>
+            <p className="text-3xl font-bold text-blue-600">{countWhere(() => true)}</p>
           </div>
           <div className="bg-white p-6 rounded-xl shadow text-center">
             <h3 className="text-gray-600 text-sm mb-1">Species Counts</h3>
@@ -1,6 +1,6 @@
 // src/pages/livestock/Livestock.jsx
 import React, { useState, useEffect } from "react";
-import api from "../services/api";
+import api, { getPage } from "../services/api";
 
 export default function Livestock() {
   const [formData, setFormData] = useState(initialForm());
@@ -12,6 +12,7 @@ export default function Livestock() {
   const [locations, setLocations] = useState([]);
   const [owners, setOwners] = useState([]);
   const [livestock, setLivestock] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
   function initialForm() {
     return {
@@ -49,10 +50,22 @@ export default function Livestock() {
     }
   };
 
+  // first page; further pages are appended by loadMore
   const fetchLivestock = async () => {
     try {
-      const res = await api.get("/livestock");
-      setLivestock(res.data);
+      const page = await getPage("/livestock");
+      setLivestock(page.rows);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error fetching livestock:", err);
+    }
+  };
+
+  const loadMore = async () => {
+    try {
+      const page = await getPage("/livestock", { cursor: nextCursor });
+      setLivestock((rows) => [...rows, ...page.rows]);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error("Error fetching livestock:", err);
     }
@@ -309,6 +322,13 @@ export default function Livestock() {
           )}
         </tbody>
       </table>
+      {nextCursor && (
+        <div className="text-center mt-4">
+          <button onClick={loadMore} className="text-[#5b4636] hover:underline">
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 
@@ -1,12 +1,13 @@
 // src/pages/LivestockTable.jsx
 import { useEffect, useState, useRef } from "react";
-import api from "../services/api";
+import api, { getPage } from "../services/api";
 import { Link } from "react-router-dom";
 import html2canvas from "html2canvas-pro";
 import jsPDF from "jspdf";
 
 export default function LivestockTable() {
   const [livestockList, setLivestockList] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [filteredList, setFilteredList] = useState([]);
   const [speciesList, setSpeciesList] = useState([]);
   const [ownerList, setOwnerList] = useState([]);
@@ -18,19 +19,40 @@ export default function LivestockTable() {
 
   const tableRef = useRef();
 
-  // Fetch all data
+  // species/owner filters are applied by the API; the list is paged
+  const livestockParams = () => ({
+    ...(filter.species && { species_id: filter.species }),
+    ...(filter.owner && { owner_id: filter.owner }),
+  });
+
+  const fetchLivestock = async () => {
+    const page = await getPage("/livestock", livestockParams());
+    setLivestockList(page.rows);
+    setNextCursor(page.nextCursor);
+  };
+
+  const loadMore = async () => {
+    try {
+      const page = await getPage("/livestock", { ...livestockParams(), cursor: nextCursor });
+      setLivestockList((rows) => [...rows, ...page.rows]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error fetching livestock:", err);
+      setError("Failed to fetch data.");
+    }
+  };
+
+  // Fetch lookups and the first page
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [livestockRes, speciesRes, ownersRes, categoriesRes] = await Promise.all([
-        api.get("/livestock"),
+      const [speciesRes, ownersRes, categoriesRes] = await Promise.all([
         api.get("/species"),
         api.get("/owners"),
         api.get("/categories"),
+        fetchLivestock(),
       ]);
 
-      setLivestockList(livestockRes.data);
-      setFilteredList(livestockRes.data);
       setSpeciesList(speciesRes.data);
       setOwnerList(ownersRes.data);
       setCategoriesList(categoriesRes.data);
@@ -46,7 +68,12 @@ export default function LivestockTable() {
     fetchData();
   }, []);
 
-  // Filter and search logic
+  // new filters start again from the first page
+  useEffect(() => {
+    if (!loading) fetchLivestock().catch(() => setError("Failed to fetch data."));
+  }, [filter]);
+
+  // Search over the loaded pages
   useEffect(() => {
     let list = livestockList;
 
@@ -61,16 +88,8 @@ export default function LivestockTable() {
       );
     }
 
-    if (filter.species) {
-      list = list.filter((a) => a.species_id === Number(filter.species));
-    }
-
-    if (filter.owner) {
-      list = list.filter((a) => a.owner_id === Number(filter.owner));
-    }
-
     setFilteredList(list);
-  }, [search, filter, livestockList, speciesList, ownerList]);
+  }, [search, livestockList, speciesList, ownerList]);
 
   // PDF download
   const handleDownloadPDF = async () => {
@@ -212,6 +231,13 @@ export default function LivestockTable() {
               ))}
             </tbody>
           </table>
+          {nextCursor && (
+            <div className="text-center mt-4">
+              <button onClick={loadMore} className="text-[#c5a46d] hover:underline">
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
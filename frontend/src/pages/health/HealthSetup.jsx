@@ -1,6 +1,7 @@
 // src/pages/health/HealthEvents.jsx
 import React, { useState, useEffect } from "react";
 import axios from "axios";
+import { getAllPages } from "../../services/api";
 
 export default function HealthEvents() {
   const [events, setEvents] = useState([]);
@@ -31,20 +32,20 @@ export default function HealthEvents() {
   const fetchDropdownData = async () => {
     try {
       const [
-        livestockRes,
+        livestockRows,
         eventTypesRes,
         diseasesRes,
         medicationsRes,
         vetsRes,
       ] = await Promise.all([
-        axios.get("http://localhost:8000/livestock"),
+        getAllPages("http://localhost:8000/livestock/", { fields: "id,tag_number,species_id" }, axios),
         axios.get("http://localhost:8000/eventtypes"),
         axios.get("http://localhost:8000/diseases"),
         axios.get("http://localhost:8000/medications"),
         axios.get("http://localhost:8000/vets"),
       ]);
 
-      setLivestock(livestockRes.data || []);
+      setLivestock(livestockRows);
       setEventTypes(eventTypesRes.data || []);
       setDiseases(diseasesRes.data || []);
       setMedications(medicationsRes.data || []);
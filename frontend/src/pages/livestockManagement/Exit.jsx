@@ -1,6 +1,7 @@
 // src/pages/health/ExitPage.jsx
 import React, { useState, useEffect } from "react";
 import axios from "axios";
+import { getAllPages } from "../../services/api";
 
 export default function ExitPage() {
   const [livestock, setLivestock] = useState([]);
@@ -28,8 +29,7 @@ export default function ExitPage() {
 
   const fetchRecords = async () => {
     try {
-      const res = await axios.get("http://localhost:8000/exits/");
-      setRecords(res.data || []);
+      setRecords(await getAllPages("http://localhost:8000/exits/", {}, axios));
     } catch {
       setRecords([]);
     }
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from "react";
-import api from "../../services/api";
+import { getAllPages } from "../../services/api";
 import ReportsSetupPage from "../../components/ReportsSetupPage";
 
 export default function HealthReport() {
@@ -15,8 +15,7 @@ export default function HealthReport() {
       const params = {};
       if (eventType) params.event_type_id = eventType;
 
-      const res = await api.get("/healthreports", { params });
-      setAnimals(res.data || []);
+      setAnimals(await getAllPages("/healthreports", params));
     } catch (err) {
       console.error("Error fetching health report:", err);
       setAnimals([]);
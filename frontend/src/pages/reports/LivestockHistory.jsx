@@ -2,40 +2,63 @@ import React, { useState, useEffect } from "react";
 import axios from "axios";
 import jsPDF from "jspdf";
 import "jspdf-autotable";
+import { getPage } from "../../services/api";
+
+const HISTORY_URL = "http://192.168.2.20:8000/livestock-history/";
 
 export default function LivestockReportsTable() {
-  const [livestock, setLivestock] = useState([]);
   const [filtered, setFiltered] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [search, setSearch] = useState("");
   const [expanded, setExpanded] = useState({});
+  const [histories, setHistories] = useState({});
   const [loading, setLoading] = useState(true);
   const [reportType, setReportType] = useState("History");
 
+  // Summary rows only (last event / movement); the server filters on the tag prefix.
   useEffect(() => {
-    loadLivestock();
-  }, []);
+    const timer = setTimeout(() => loadLivestock(search), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
 
-  const loadLivestock = async () => {
+  const loadLivestock = async (term) => {
     try {
-      const res = await axios.get("http://192.168.2.20:8000/livestock-history/");
-      setLivestock(res.data);
-      setFiltered(res.data);
+      const page = await getPage(HISTORY_URL, term ? { tag: term } : {}, axios);
+      setFiltered(page.rows);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Error loading livestock:", error);
     }
     setLoading(false);
   };
 
+  const loadMore = async () => {
+    try {
+      const page = await getPage(HISTORY_URL, { ...(search && { tag: search }), cursor: nextCursor }, axios);
+      setFiltered((rows) => [...rows, ...page.rows]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error loading livestock:", error);
+    }
+  };
+
   const handleSearch = (e) => {
-    const term = e.target.value.toLowerCase();
-    setSearch(term);
-    setFiltered(
-      livestock.filter((l) => l.tag_number.toLowerCase().includes(term))
-    );
+    setSearch(e.target.value);
   };
 
-  const toggle = (id) => {
-    setExpanded((prev) => ({ ...prev, [id]: !prev[id] }));
+  // Full events / movements for one animal, fetched the first time it is expanded.
+  const loadHistory = async (tag) => {
+    try {
+      const res = await axios.get(`${HISTORY_URL}${encodeURIComponent(tag)}`);
+      setHistories((prev) => ({ ...prev, [tag]: res.data }));
+    } catch (error) {
+      console.error("Error loading history:", error);
+    }
+  };
+
+  const toggle = (l) => {
+    if (!expanded[l.id] && !histories[l.tag_number]) loadHistory(l.tag_number);
+    setExpanded((prev) => ({ ...prev, [l.id]: !prev[l.id] }));
   };
 
   const downloadPDF = (report) => {
@@ -135,7 +158,7 @@ export default function LivestockReportsTable() {
       <div className="flex flex-col md:flex-row justify-between items-start md:items-center mb-6 gap-4">
         <input
           type="text"
-          placeholder="Search tag number..."
+          placeholder="Tag number starts with..."
           value={search}
           onChange={handleSearch}
           className="border rounded-lg px-3 py-2 w-full md:w-64 shadow-sm focus:ring-green-400 focus:border-green-400 transition"
@@ -168,7 +191,7 @@ export default function LivestockReportsTable() {
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap">
                     <button
-                      onClick={() => toggle(l.id)}
+                      onClick={() => toggle(l)}
                       className="text-blue-600 hover:underline font-semibold"
                     >
                       {expanded[l.id] ? "Hide" : "View"}
@@ -186,13 +209,13 @@ export default function LivestockReportsTable() {
                           <details className="mt-2">
                             <summary className="font-semibold cursor-pointer">Full Events</summary>
                             <ul className="list-disc ml-5">
-                              {l.events.map((e,i)=><li key={i}>{e.event_date}: {e.event_type} — {e.notes}</li>)}
+                              {(histories[l.tag_number]?.events || []).map((e,i)=><li key={i}>{e.event_date}: {e.event_type} — {e.notes}</li>)}
                             </ul>
                           </details>
                           <details className="mt-2">
                             <summary className="font-semibold cursor-pointer">Full Movements</summary>
                             <ul className="list-disc ml-5">
-                              {l.movements.map((m,i)=><li key={i}>{m.movement_date}: {m.movement_type} ({m.source} → {m.destination}) — {m.notes}</li>)}
+                              {(histories[l.tag_number]?.movements || []).map((m,i)=><li key={i}>{m.movement_date}: {m.movement_type} ({m.source} → {m.destination}) — {m.notes}</li>)}
                             </ul>
                           </details>
                         </div>
@@ -229,6 +252,13 @@ export default function LivestockReportsTable() {
           </tbody>
         </table>
       </div>
+      {nextCursor && (
+        <div className="text-center mt-4">
+          <button onClick={loadMore} className="text-blue-600 hover:underline font-semibold">
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 }
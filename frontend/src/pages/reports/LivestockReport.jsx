@@ -1,6 +1,6 @@
 // src/pages/reports/LivestockReport.jsx
 import React, { useEffect, useState } from "react";
-import api from "../../api";
+import api, { getAllPages } from "../../services/api";
 
 export default function LivestockReport() {
   const [livestock, setLivestock] = useState([]);
@@ -13,16 +13,16 @@ export default function LivestockReport() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [livestockRes, ownersRes, locationsRes, categoriesRes, eventsRes] =
+        const [livestockRows, ownersRes, locationsRes, categoriesRes, eventsRes] =
           await Promise.all([
-            api.get("/livestock/"),
+            getAllPages("/livestock/"),
             api.get("/owners/"),
             api.get("/locations/"),
             api.get("/categories/"),
             api.get("/livestock-events/"),
           ]);
 
-        setLivestock(livestockRes.data);
+        setLivestock(livestockRows);
         setOwners(ownersRes.data);
         setLocations(locationsRes.data);
         setCategories(categoriesRes.data);
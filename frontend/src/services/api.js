@@ -22,4 +22,25 @@ const api = axios.create({
   baseURL: detectBackendBaseURL(),
 });
 
+// List endpoints return one page (100 rows unless ?limit= says otherwise, at
+// most 500) and send the next page's cursor in the X-Next-Cursor header.
+export const MAX_PAGE_SIZE = 500;
+
+export async function getPage(url, params = {}, client = api) {
+  const res = await client.get(url, { params });
+  return { rows: res.data, nextCursor: res.headers["x-next-cursor"] || null };
+}
+
+// Every page, for screens that need the complete list (reports, lookups).
+export async function getAllPages(url, params = {}, client = api) {
+  const rows = [];
+  let cursor = null;
+  do {
+    const page = await getPage(url, { ...params, limit: MAX_PAGE_SIZE, ...(cursor && { cursor }) }, client);
+    rows.push(...page.rows);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return rows;
+}
+
 export default api;